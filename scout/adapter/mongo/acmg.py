@@ -111,3 +111,21 @@ class ACMGHandler(object):
         query = dict(variant_id=variant_obj["variant_id"])
         res = self.acmg_collection.find(query).sort([("created_at", pymongo.DESCENDING)])
         return res
+
+    def get_evaluations_by_variants(self, variant_ids):
+        """Return all evaluations for a group of variants, fetched with one query
+
+        Args:
+            variant_ids (iterable(str)): variant_id of the variants
+
+        Returns:
+            evaluations(dict): {<variant_id>: list(dict)}, newest evaluation first
+        """
+        evaluations = {variant_id: [] for variant_id in variant_ids}
+        if not evaluations:
+            return evaluations
+        query = {"variant_id": {"$in": list(evaluations)}}
+        res = self.acmg_collection.find(query).sort([("created_at", pymongo.DESCENDING)])
+        for evaluation_obj in res:
+            evaluations[evaluation_obj["variant_id"]].append(evaluation_obj)
+        return evaluations
@@ -83,6 +83,7 @@ class MongoAdapter(
         port = app.config.get("MONGO_PORT", 27017)
         dbname = app.config["MONGO_DBNAME"]
         log.info("connecting to database: %s:%s/%s", host, port, dbname)
+        self.gene_cache_dir = app.config.get("GENE_CACHE_DIR")
         self.setup(app.config["MONGO_DATABASE"])
 
     def setup(self, database):
@@ -104,6 +105,7 @@ class MongoAdapter(
         self.transcript_collection = database.transcript
         self.filter_collection = database.filter
         self.cytoband_collection = database.cytoband
+        self.dashboard_stats_collection = database.dashboard_stats
 
     def collections(self):
         """Return all collection names
@@ -113,5 +115,21 @@ class MongoAdapter(
         """
         return self.db.collection_names(include_system_collections=False)
 
+    def server_version(self):
+        """Return the version of the database server, the version is only fetched once
+
+        Returns:
+            version(list(int)): [<major>, <minor>, ...], empty if the version is not known
+        """
+        version = getattr(self, "_server_version", None)
+        if version is None:
+            try:
+                version = self.db.command("buildInfo").get("versionArray", [])
+            except Exception as err:
+                log.debug("Could not get the database server version: %s", err)
+                version = []
+            version = self._server_version = list(version)
+        return version
+
     def __str__(self):
         return "MongoAdapter(db={0})".format(self.db)
@@ -12,10 +12,43 @@ from scout.constants import ACMG_MAP
 from scout.exceptions import ConfigError, IntegrityError
 from scout.parse.case import parse_case
 from scout.parse.variant.ids import parse_document_id
-from scout.utils.algorithms import ui_score
+
+from .variant_events import SANGER_OPTIONS
 
 LOG = logging.getLogger(__name__)
 
+# Variant fields that are kept when a case is re-uploaded, with the verb of the events that set them
+VARIANT_ACTION_VERBS = {
+    "manual_rank": "manual_rank",
+    "dismiss_variant": "dismiss_variant",
+    "mosaic_tags": "mosaic_tags",
+    "cancer_tier": "cancer_tier",
+    "acmg_classification": "acmg",
+    "is_commented": "comment",
+}
+
+# Case fields that are shown in lists of cases, like the cases page of an institute
+CASE_OVERVIEW_PROJECTION = {
+    "display_name": 1,
+    "owner": 1,
+    "status": 1,
+    "track": 1,
+    "assignees": 1,
+    "needs_check": 1,
+    "is_migrated": 1,
+    "is_research": 1,
+    "rerun_requested": 1,
+    "analysis_date": 1,
+    "updated_at": 1,
+    "individuals.analysis_type": 1,
+    "analyses.date": 1,
+    "panels.panel_name": 1,
+    "panels.is_default": 1,
+    "vcf_files.vcf_snv": 1,
+    "vcf_files.vcf_cancer": 1,
+    "vcf_files.vcf_cancer_sv": 1,
+}
+
 
 class CaseHandler(object):
     """Part of the pymongo adapter that handles cases and institutes"""
@@ -32,33 +65,23 @@ class CaseHandler(object):
             scores(list(tuple)): Returns a list of tuples like (case_id, score) with the most
                                  similar case first
         """
-        scores = {}
-        set_1 = set()
         if len(phenotype_terms) == 0:
             LOG.warning("No phenotype terms provided, please provide ar least one HPO term")
             return None
-        # Add all ancestors of all terms
-        for term in phenotype_terms:
-            hpo_term = self.hpo_term(term)
-            if not hpo_term:
-                continue
-            set_1 = set_1.union(set(hpo_term.get("all_ancestors", [])))
-        # Need to control what cases to look for here
-        # Fetch all cases with phenotypes
-        for case in self.cases(phenotype_terms=True, owner=owner):
-            set_2 = set()
-            if case["_id"] == case_id:
-                continue
-            # Add all ancestors if all terms
-            for term in case["phenotype_terms"]:
-                hpo_term = self.hpo_term(term["phenotype_id"])
-                if not hpo_term:
-                    continue
-                set_2 = set_2.union(set(hpo_term.get("all_ancestors", [])))
-            LOG.debug(
-                f"Check phenotypic similarity between terms:{phenotype_terms} and case {case['_id']}"
-            )
-            scores[case["_id"]] = ui_score(set_1, set_2)
+        hpo_index = self.hpo_ancestor_index()
+
+        # Fetch the phenotype terms of all cases with phenotypes
+        case_query = self.cases(phenotype_terms=True, owner=owner, yield_query=True)
+        if case_id:
+            case_query["_id"] = {"$ne": case_id}
+        case_terms = (
+            (case["_id"], [term["phenotype_id"] for term in case["phenotype_terms"]])
+            for case in self.case_collection.find(
+                case_query, {"phenotype_terms.phenotype_id": 1}
+            ).sort("updated_at", -1)
+        )
+        LOG.debug(f"Check phenotypic similarity between terms:{phenotype_terms} and cases")
+        scores = hpo_index.similarity_scores(phenotype_terms, case_terms)
         # Returns a list of tuples with highest score first
         return sorted(scores.items(), key=operator.itemgetter(1), reverse=True)
 
@@ -361,6 +384,45 @@ class CaseHandler(object):
 
         return self.case_collection.find(query).sort("updated_at", -1)
 
+    def cases_overview(self, query, sort=None, limit=None):
+        """Return cases with only the fields that are shown in lists of cases
+
+        The cases are sorted, limited and projected in the database with one aggregation.
+
+        Args:
+            query(dict): a case query, like the one returned by cases(yield_query=True)
+            sort(dict): sort keys and directions, like {"updated_at": pymongo.DESCENDING}
+            limit(int): maximum number of cases to return
+
+        Returns:
+            cases(pymongo.command_cursor.CommandCursor)
+        """
+        pipeline = [{"$match": query}]
+        if sort:
+            pipeline.append({"$sort": sort})
+        if limit:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": CASE_OVERVIEW_PROJECTION})
+        return self.case_collection.aggregate(pipeline)
+
+    def cases_by_ids(self, case_ids, projection=None):
+        """Fetch a group of cases with one query
+
+        Args:
+            case_ids(iterable(str))
+            projection(dict): the case fields to return, default all fields
+
+        Returns:
+            cases(dict): {<case_id>: case_obj}
+        """
+        case_ids = list(set(case_ids))
+        if not case_ids:
+            return {}
+        return {
+            case_obj["_id"]: case_obj
+            for case_obj in self.case_collection.find({"_id": {"$in": case_ids}}, projection)
+        }
+
     def prioritized_cases(self, institute_id=None):
         """Fetches any prioritized cases from the backend.
 
@@ -394,7 +456,7 @@ class CaseHandler(object):
             query["collaborators"] = institute_id
 
         LOG.debug("Fetch all cases with query {0}".format(query))
-        nr_cases = sum(1 for i in self.case_collection.find(query))
+        nr_cases = self.case_collection.find(query).count()
 
         return nr_cases
 
@@ -534,7 +596,7 @@ class CaseHandler(object):
         result = self.case_collection.delete_one(query)
         return result
 
-    def load_case(self, config_data, update=False, keep_actions=True):
+    def load_case(self, config_data, update=False, keep_actions=True, workers=1):
         """Load a case into the database
 
         Check if the owner and the institute exists.
@@ -543,6 +605,7 @@ class CaseHandler(object):
             config_data(dict): A dictionary with all the necessary information
             update(bool): If existing case should be updated
             keep_actions(bool): Attempt transfer of existing case user actions to new vars
+            workers(int): Number of processes used to parse variants
         Returns:
             case_obj(dict)
         """
@@ -619,6 +682,7 @@ class CaseHandler(object):
                     variant_type=variant_type,
                     category=category,
                     rank_threshold=case_obj.get("rank_score_threshold", 5),
+                    workers=workers,
                 )
 
         except (IntegrityError, ValueError, ConfigError, KeyError) as error:
@@ -867,10 +931,105 @@ class CaseHandler(object):
 
         return case_verif_variants
 
+    def reuploaded_variants(self, case_obj, old_variants):
+        """Return the variants of a case that replace some previous variants
+
+        The new variants are found with one query on the display names of the old ones.
+
+        Args:
+            case_obj(dict): a case object
+            old_variants(list(Variant))
+
+        Returns:
+            new_variants(dict): {<display_name>: <new variant>}
+        """
+        display_names = list({old_var["display_name"] for old_var in old_variants})
+        if not display_names:
+            return {}
+        query = {"case_id": case_obj["_id"], "display_name": {"$in": display_names}}
+        return {var_obj["display_name"]: var_obj for var_obj in self.variant_collection.find(query)}
+
+    def latest_variant_events(self, case_obj, variant_ids, verbs, category=None):
+        """Return the latest event of each verb for a group of variants in a case
+
+        All events are fetched with one aggregation, grouped per variant and verb.
+
+        Args:
+            case_obj(dict): a case object
+            variant_ids(iterable(str)): global variant ids
+            verbs(iterable(str)): the verbs of the events, like 'manual_rank'
+            category(str): 'variant' or 'case', events of both categories if None
+
+        Returns:
+            latest_events(dict): {(<variant_id>, <verb>): {"user_id": <id of the user>}}
+        """
+        variant_ids = list(set(variant_ids))
+        if not variant_ids:
+            return {}
+        match = {
+            "case": case_obj["_id"],
+            "verb": {"$in": list(verbs)},
+            "variant_id": {"$in": variant_ids},
+        }
+        if category:
+            match["category"] = category
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"updated_at": pymongo.DESCENDING}},
+            {
+                "$group": {
+                    "_id": {"variant_id": "$variant_id", "verb": "$verb"},
+                    "user_id": {"$first": "$user_id"},
+                }
+            },
+        ]
+        return {
+            (res["_id"]["variant_id"], res["_id"]["verb"]): res
+            for res in self.event_collection.aggregate(pipeline)
+        }
+
+    def _event_users(self, events):
+        """Return the users of some events, fetched with one query
+
+        Args:
+            events(iterable(dict)): events, or anything else with a 'user_id'
+
+        Returns:
+            users(dict): {<user_id>: <user obj>}, users that no longer exist are left out
+        """
+        user_ids = list({event["user_id"] for event in events})
+        if not user_ids:
+            return {}
+        return {
+            user_obj["_id"]: user_obj
+            for user_obj in self.user_collection.find({"_id": {"$in": user_ids}})
+        }
+
+    def _write_variant_actions(self, variant_updates, events):
+        """Write the updates of some variants and their events with two unordered bulk writes
+
+        Args:
+            variant_updates(dict): {<variant _id>: <update document>}
+            events(list(dict)): events built with build_event
+        """
+        if variant_updates:
+            requests = [
+                pymongo.UpdateOne({"_id": variant_id}, update)
+                for variant_id, update in variant_updates.items()
+            ]
+            self.variant_collection.bulk_write(requests, ordered=False)
+        if events:
+            self.event_collection.insert_many(events, ordered=False)
+        LOG.debug("Updated %s variants and created %s events", len(variant_updates), len(events))
+
     def update_variant_actions(self, institute_obj, case_obj, old_eval_variants):
         """Update existing variants of a case according to the tagged status
             (manual_rank, dismiss_variant, mosaic_tags) of its previous variants
 
+        The new variants, the latest events of the old variants, their comments and the users
+        that made them are fetched with a few queries for all variants. The new variants are then
+        updated, and the events for them created, with two bulk writes.
+
         Accepts:
             institute_obj(dict): an institute object
             case_obj(dict): a case object
@@ -885,14 +1044,7 @@ class CaseHandler(object):
                 'acmg_classification': [list of variant ids]
                 'is_commented': [list of variant ids]
         """
-        updated_variants = {
-            "manual_rank": [],
-            "dismiss_variant": [],
-            "mosaic_tags": [],
-            "cancer_tier": [],
-            "acmg_classification": [],
-            "is_commented": [],
-        }
+        updated_variants = {action: [] for action in VARIANT_ACTION_VERBS}
 
         LOG.debug(
             "Updating action status for {} variants in case:{}".format(
@@ -900,126 +1052,107 @@ class CaseHandler(object):
             )
         )
 
-        n_status_updated = 0
+        new_variants = self.reuploaded_variants(case_obj, old_eval_variants)
+        # collect only the latest associated event of each action
+        latest_events = self.latest_variant_events(
+            case_obj,
+            [old_var["variant_id"] for old_var in old_eval_variants],
+            verbs=VARIANT_ACTION_VERBS.values(),
+            category="variant",
+        )
+        # collect the comments of all commented variants
+        comments = self.variants_comments(
+            institute_obj,
+            case_obj,
+            {variant_id for variant_id, verb in latest_events if verb == "comment"},
+        )
+        users = self._event_users(
+            list(latest_events.values())
+            + [comment for var_comments in comments.values() for comment in var_comments]
+        )
+
+        variant_updates = {}
+        events = []
         for old_var in old_eval_variants:
 
             # search for the same variant in newly uploaded vars for this case
-            display_name = old_var["display_name"]
-
-            new_var = self.variant_collection.find_one(
-                {"case_id": case_obj["_id"], "display_name": display_name}
-            )
-
+            new_var = new_variants.get(old_var["display_name"])
             if new_var is None:  # same var is no more among case variants, skip it
                 LOG.warning(
                     "Trying to propagate manual action from an old variant to a new, but couldn't find same variant any more"
                 )
                 continue
 
-            for action in list(
-                updated_variants.keys()
-            ):  # manual_rank, dismiss_variant, mosaic_tags
-                if (
-                    old_var.get(action) is not None or action == "is_commented"
-                ):  # tag new variant accordingly
-                    # collect only the latest associated event:
-                    verb = action
-                    if action == "acmg_classification":
-                        verb = "acmg"
-                    elif action == "is_commented":
-                        verb = "comment"
-
-                    old_event = self.event_collection.find_one(
-                        {
-                            "case": case_obj["_id"],
-                            "verb": verb,
-                            "variant_id": old_var["variant_id"],
-                            "category": "variant",
-                        },
-                        sort=[("updated_at", pymongo.DESCENDING)],
-                    )
-
-                    if old_event is None:
-                        continue
-
-                    user_obj = self.user(old_event["user_id"])
-                    if user_obj is None:
-                        continue
+            # create a link to the new variant for the events
+            link = "/{0}/{1}/{2}".format(
+                new_var["institute"], case_obj["display_name"], new_var["_id"]
+            )
 
-                    # create a link to the new variant for the events
-                    link = "/{0}/{1}/{2}".format(
-                        new_var["institute"], case_obj["display_name"], new_var["_id"]
-                    )
+            for action, verb in VARIANT_ACTION_VERBS.items():
+                if old_var.get(action) is None and action != "is_commented":
+                    continue
 
-                    updated_variant = None
+                old_event = latest_events.get((old_var["variant_id"], verb))
+                if old_event is None:
+                    continue
 
-                    if action == "manual_rank":
-                        updated_variant = self.update_manual_rank(
-                            institute=institute_obj,
-                            case=case_obj,
-                            user=user_obj,
-                            link=link,
-                            variant=new_var,
-                            manual_rank=old_var.get(action),
-                        )
+                user_obj = users.get(old_event["user_id"])
+                if user_obj is None:
+                    continue
 
-                    if action == "dismiss_variant":
-                        updated_variant = self.update_dismiss_variant(
+                if action == "is_commented":
+                    if new_var["_id"] == old_var["_id"]:
+                        continue
+                    # create the same comments for the new variant
+                    new_comments = [
+                        self.build_event(
                             institute=institute_obj,
                             case=case_obj,
-                            user=user_obj,
+                            user=users[old_comment["user_id"]],
                             link=link,
+                            category="variant",
+                            verb="comment",
+                            level=old_comment.get("level", "specific"),
                             variant=new_var,
-                            dismiss_variant=old_var.get(action),
+                            subject=new_var["display_name"],
+                            content=old_comment.get("content"),
                         )
-
-                    if action == "mosaic_tags":
-                        updated_variant = self.update_mosaic_tags(
-                            institute=institute_obj,
-                            case=case_obj,
-                            user=user_obj,
-                            link=link,
-                            variant=new_var,
-                            mosaic_tags=old_var.get(action),
+                        for old_comment in comments[old_var["variant_id"]]
+                        if old_comment["user_id"] in users
+                    ]
+                    if not new_comments:
+                        continue
+                    LOG.info(
+                        "Created {} new comments for variant {} after reupload".format(
+                            len(new_comments), old_var["display_name"]
                         )
-
-                    if action == "cancer_tier":
-                        updated_variant = self.update_cancer_tier(
+                    )
+                    events.extend(new_comments)
+                else:
+                    value = old_var[action]
+                    unset = not value
+                    if action == "acmg_classification":
+                        unset = ACMG_MAP.get(value) is None
+                    update = variant_updates.setdefault(new_var["_id"], {})
+                    update.setdefault("$unset" if unset else "$set", {})[action] = value
+                    events.append(
+                        self.build_event(
                             institute=institute_obj,
                             case=case_obj,
                             user=user_obj,
                             link=link,
+                            category="variant",
+                            verb=verb,
                             variant=new_var,
-                            cancer_tier=old_var.get(action),
+                            subject=new_var["display_name"],
                         )
+                    )
 
-                    if action == "acmg_classification":
-                        str_classif = ACMG_MAP.get(old_var.get("acmg_classification"))
-                        updated_variant = self.update_acmg(
-                            institute_obj=institute_obj,
-                            case_obj=case_obj,
-                            user_obj=user_obj,
-                            link=link,
-                            variant_obj=new_var,
-                            acmg_str=str_classif,
-                        )
+                updated_variants[action].append(new_var["_id"])
 
-                    if action == "is_commented":
-                        updated_comments = self.comments_reupload(
-                            old_var, new_var, institute_obj, case_obj
-                        )
-                        if updated_comments > 0:
-                            LOG.info(
-                                "Created {} new comments for variant {} after reupload".format(
-                                    updated_comments, display_name
-                                )
-                            )
-                            updated_variant = new_var
-
-                    if updated_variant is not None:
-                        n_status_updated += 1
-                        updated_variants[action].append(updated_variant["_id"])
+        self._write_variant_actions(variant_updates, events)
 
+        n_status_updated = sum(len(var_ids) for var_ids in updated_variants.values())
         LOG.info("Variant actions updated {} times".format(n_status_updated))
         return updated_variants
 
@@ -1027,6 +1160,9 @@ class CaseHandler(object):
         """Update existing variants for a case according to a previous
         verification status.
 
+        As in update_variant_actions, the variants and events are fetched with a few queries and
+        written with two bulk writes.
+
         Accepts:
             institute_obj(dict): an institute object
             case_obj(dict): a case object
@@ -1041,70 +1177,79 @@ class CaseHandler(object):
         LOG.debug("Updating verification status for variants in case:{}".format(case_obj["_id"]))
 
         updated_variants = {"updated_verified": [], "updated_ordered": []}
+        old_variants = [
+            old_var for category in case_verif_variants for old_var in case_verif_variants[category]
+        ]
+        new_variants = self.reuploaded_variants(case_obj, old_variants)
+        old_events = self.latest_variant_events(
+            case_obj,
+            [old_var["variant_id"] for old_var in old_variants],
+            verbs=["validate", "sanger"],
+        )
+        users = self._event_users(old_events.values())
+
+        variant_updates = {}
+        events = []
         # update verification status for verified variants of a case
         for category in case_verif_variants:
-            variants = case_verif_variants[category]
             verb = "sanger"
             if category == "sanger_verified":
                 verb = "validate"
 
-            for old_var in variants:
+            for old_var in case_verif_variants[category]:
                 # new var display name should be the same as old display name:
-                display_name = old_var["display_name"]
-                # check if variant still exists
-                new_var = self.variant_collection.find_one(
-                    {"case_id": case_obj["_id"], "display_name": display_name}
-                )
-
+                new_var = new_variants.get(old_var["display_name"])
                 if new_var is None:  # if variant doesn't exist any more
                     continue
 
+                old_event = old_events.get((old_var["variant_id"], verb))
+                if old_event is None:
+                    continue
+
+                user_obj = users.get(old_event["user_id"])
+                if user_obj is None:
+                    continue
+
                 # create a link to the new variant for the events
                 link = "/{0}/{1}/{2}".format(
                     new_var["institute"], case_obj["display_name"], new_var["_id"]
                 )
-
-                old_event = self.event_collection.find_one(
-                    {
-                        "case": case_obj["_id"],
-                        "verb": verb,
-                        "variant_id": old_var["variant_id"],
-                    }
-                )
-
-                if old_event is None:
-                    continue
-
-                user_obj = self.user(old_event["user_id"])
+                event_categories = ["variant"]
 
                 if category == "sanger_verified":
                     # if a new variant coresponds to the old and
                     # there exist a verification event for the old one
                     # validate new variant as well:
-                    updated_var = self.validate(
-                        institute=institute_obj,
-                        case=case_obj,
-                        user=user_obj,
-                        link=link,
-                        variant=new_var,
-                        validate_type=old_var.get("validation"),
-                    )
-                    if updated_var:
-                        updated_variants["updated_verified"].append(updated_var["_id"])
-
+                    validate_type = old_var.get("validation")
+                    if validate_type not in SANGER_OPTIONS:
+                        LOG.warning("Invalid validation string: %s", validate_type)
+                        continue
+                    update = {"validation": validate_type}
+                    updated_variants["updated_verified"].append(new_var["_id"])
                 else:
                     # old variant had Sanger validation ordered
-                    # check old event to collect user_obj that ordered the verification:
-                    # set sanger ordered status for the new variant as well:
-                    updated_var = self.order_verification(
-                        institute=institute_obj,
-                        case=case_obj,
-                        user=user_obj,
-                        link=link,
-                        variant=new_var,
+                    # set sanger ordered status for the new variant as well,
+                    # with events for both the variant and the case
+                    update = {"sanger_ordered": True}
+                    event_categories.append("case")
+                    updated_variants["updated_ordered"].append(new_var["_id"])
+
+                variant_updates.setdefault(new_var["_id"], {"$set": {}})["$set"].update(update)
+                for event_category in event_categories:
+                    events.append(
+                        self.build_event(
+                            institute=institute_obj,
+                            case=case_obj,
+                            user=user_obj,
+                            link=link,
+                            category=event_category,
+                            verb=verb,
+                            variant=new_var,
+                            subject=new_var["display_name"],
+                        )
                     )
-                    if updated_var:
-                        updated_variants["updated_ordered"].append(updated_var["_id"])
+
+        self._write_variant_actions(variant_updates, events)
 
         n_status_updated = len(updated_variants["updated_verified"]) + len(
             updated_variants["updated_ordered"]
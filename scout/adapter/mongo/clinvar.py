@@ -381,3 +381,28 @@ class ClinVarHandler(object):
             submitted_vars[clinvar.get("local_id")] = clinvar
 
         return submitted_vars
+
+    def cases_to_clinVars(self, case_ids):
+        """Get the variants included in clinvar submissions for a group of cases
+
+        The submission variants of all cases are fetched with one aggregation, grouped by case.
+
+        Args:
+            case_ids(iterable(str)): case _ids
+
+        Returns:
+            submission_variants(dict): {<case_id>: {<variant id>: <variant submission object>}},
+                                       with an empty dict for cases without submitted variants
+        """
+        submission_variants = {case_id: {} for case_id in case_ids}
+        if not submission_variants:
+            return submission_variants
+        pipeline = [
+            {"$match": {"case_id": {"$in": list(submission_variants)}, "csv_type": "variant"}},
+            {"$group": {"_id": "$case_id", "clinvars": {"$push": "$$ROOT"}}},
+        ]
+        for res in self.clinvar_collection.aggregate(pipeline):
+            submission_variants[res["_id"]] = {
+                clinvar.get("local_id"): clinvar for clinvar in res["clinvars"]
+            }
+        return submission_variants
@@ -29,6 +29,45 @@ class EventHandler(CaseEventHandler, VariantEventHandler):
         self.event_collection.delete_one({"_id": event_id})
         LOG.debug("Event {0} deleted".format(event_id))
 
+    def build_event(
+        self,
+        institute,
+        case,
+        user,
+        link,
+        category,
+        verb,
+        subject,
+        level="specific",
+        variant=None,
+        content=None,
+        panel=None,
+    ):
+        """Build an event with the parameters given, without saving it
+
+        Takes the same arguments as create_event
+
+        Returns:
+            event(dict)
+        """
+        variant = variant or {}
+        return dict(
+            institute=institute["_id"],
+            case=case["_id"],
+            user_id=user["_id"],
+            user_name=user["name"],
+            link=link,
+            category=category,
+            verb=verb,
+            subject=subject,
+            level=level,
+            variant_id=variant.get("variant_id"),
+            content=content,
+            panel=panel,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        )
+
     def create_event(
         self,
         institute,
@@ -60,22 +99,18 @@ class EventHandler(CaseEventHandler, VariantEventHandler):
         Returns:
             event(dict): The inserted event
         """
-        variant = variant or {}
-        event = dict(
-            institute=institute["_id"],
-            case=case["_id"],
-            user_id=user["_id"],
-            user_name=user["name"],
+        event = self.build_event(
+            institute=institute,
+            case=case,
+            user=user,
             link=link,
             category=category,
             verb=verb,
             subject=subject,
             level=level,
-            variant_id=variant.get("variant_id"),
+            variant=variant,
             content=content,
             panel=panel,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
         )
 
         LOG.debug("Saving Event")
@@ -155,6 +190,51 @@ class EventHandler(CaseEventHandler, VariantEventHandler):
 
         return self.event_collection.find(query).sort("created_at", pymongo.DESCENDING)
 
+    def variants_comments(self, institute, case, variant_ids):
+        """Fetch the comments of a group of variants with one query
+
+        Global comments and comments specific to the case are included, as in
+        events(institute, case=case, variant_id=variant_id, comments=True).
+
+        Args:
+          institute (dict): An institute
+          case (dict): A case
+          variant_ids (iterable(str)): global variant ids
+
+        Returns:
+            comments(dict): {<variant_id>: list(dict)}, newest comment first
+        """
+        comments = {variant_id: [] for variant_id in variant_ids}
+        if not comments:
+            return comments
+        LOG.debug(
+            "Fetching comments for institute {0} case {1} and {2} variants".format(
+                institute["_id"], case["_id"], len(comments)
+            )
+        )
+        variant_query = {"$in": list(comments)}
+        query = {
+            "$or": [
+                {
+                    "category": "variant",
+                    "variant_id": variant_query,
+                    "verb": "comment",
+                    "level": "global",
+                },
+                {
+                    "category": "variant",
+                    "variant_id": variant_query,
+                    "institute": institute["_id"],
+                    "case": case["_id"],
+                    "verb": "comment",
+                    "level": "specific",
+                },
+            ]
+        }
+        for event in self.event_collection.find(query).sort("created_at", pymongo.DESCENDING):
+            comments[event["variant_id"]].append(event)
+        return comments
+
     def user_events(self, user_obj=None):
         """Fetch all events by a specific user."""
         query = dict(user_id=user_obj["_id"]) if user_obj else dict()
@@ -1,15 +1,62 @@
+import hashlib
 import logging
 from pprint import pprint as pp
-import intervaltree
 
+import pymongo
 from pymongo.errors import DuplicateKeyError, BulkWriteError
 
+from scout.constants import INDEXES
 from scout.exceptions import IntegrityError
+from scout.utils.gene_snapshot import (
+    SNAPSHOT_VERSION,
+    clear_snapshots,
+    read_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+from scout.utils.genomic_intervals import GenomicIntervalIndex
 
 LOG = logging.getLogger(__name__)
 
+# The gene fields that are needed to build variants and coding intervals
+SNAPSHOT_GENE_FIELDS = [
+    "hgnc_id",
+    "hgnc_symbol",
+    "ensembl_id",
+    "description",
+    "inheritance_models",
+    "phenotypes",
+    "chromosome",
+    "start",
+    "end",
+]
+
+# Genes and transcripts are reloaded into shadow collections that are then swapped in
+GENE_RELOAD_COLLECTIONS = {"hgnc_collection": "hgnc_gene", "transcript_collection": "transcript"}
+SHADOW_SUFFIX = "_shadow"
+PREVIOUS_SUFFIX = "_previous"
+# Collection with a marker document while the shadow collections are swapped in
+GENE_RELOAD_MARKER_COLLECTION = "gene_reload"
+
+
+def create_indexes(collection, indexes):
+    """Create indexes on a collection, one at a time
+
+    Args:
+        collection(pymongo.collection.Collection)
+        indexes(list(pymongo.IndexModel))
+    """
+    for index in indexes:
+        index_options = dict(index.document)
+        keys = list(index_options.pop("key").items())
+        collection.create_index(keys, **index_options)
+
 
 class GeneHandler(object):
+
+    # Directory where gene snapshots are cached between processes, set from GENE_CACHE_DIR
+    gene_cache_dir = None
+
     def load_hgnc_gene(self, gene_obj):
         """Add a gene object with transcripts to the database
 
@@ -68,21 +115,243 @@ class GeneHandler(object):
 
         query["build"] = build
         LOG.debug("Fetching gene %s" % hgnc_identifier)
-        gene_obj = self.hgnc_collection.find_one(query)
+        if self.transcripts_embedded(build):
+            gene_obj = self.hgnc_collection.find_one(query)
+            if not gene_obj:
+                return None
+            if "transcripts" not in gene_obj:
+                # The genes have been reloaded since the transcripts were embedded
+                self._embedded_transcripts[build] = False
+                gene_obj["transcripts"] = list(
+                    self.transcripts(build=build, hgnc_id=gene_obj["hgnc_id"])
+                )
+            return gene_obj
+
+        if not self.supports_pipeline_lookup():
+            gene_obj = self.hgnc_collection.find_one(query)
+            if not gene_obj:
+                return None
+            if "transcripts" in gene_obj:
+                self._embedded_transcripts[build] = True
+            else:
+                gene_obj["transcripts"] = list(
+                    self.transcripts(build=build, hgnc_id=gene_obj["hgnc_id"])
+                )
+            return gene_obj
+
+        # Fetch the gene and the transcripts of the build in one round trip
+        pipeline = [
+            {"$match": query},
+            {"$limit": 1},
+            {
+                "$lookup": {
+                    "from": self.transcript_collection.name,
+                    "let": {"hgnc_id": "$hgnc_id"},
+                    "pipeline": [
+                        {
+                            "$match": {
+                                "$expr": {
+                                    "$and": [
+                                        {"$eq": ["$build", build]},
+                                        {"$eq": ["$hgnc_id", "$$hgnc_id"]},
+                                    ]
+                                }
+                            }
+                        }
+                    ],
+                    "as": "transcript_objs",
+                }
+            },
+        ]
+        gene_obj = next(self.hgnc_collection.aggregate(pipeline), None)
         if not gene_obj:
             return None
 
-        # Add the transcripts:
-        transcripts = []
-        tx_objs = self.transcripts(build=build, hgnc_id=gene_obj["hgnc_id"])
-        nr_tx = sum(1 for i in self.transcripts(build=build, hgnc_id=gene_obj["hgnc_id"]))
-        if nr_tx > 0:
-            for tx in tx_objs:
-                transcripts.append(tx)
-        gene_obj["transcripts"] = transcripts
+        transcript_objs = gene_obj.pop("transcript_objs")
+        if "transcripts" in gene_obj:
+            self._embedded_transcripts[build] = True
+        else:
+            gene_obj["transcripts"] = transcript_objs
 
         return gene_obj
 
+    def supports_pipeline_lookup(self):
+        """Return True if the database server supports $lookup with a pipeline, MongoDB 3.6 or later
+
+        Returns:
+            supported(bool)
+        """
+        return self.server_version()[:2] >= [3, 6]
+
+    def hgnc_genes_by_ids(self, hgnc_ids, build="37", add_transcripts=True):
+        """Fetch hgnc genes, with their transcripts, for a group of hgnc ids
+
+        Genes and transcripts are fetched with one query each, or with one query for the genes if
+        the transcripts are embedded in the genes.
+
+        Args:
+            hgnc_ids(iterable(int))
+            build(str)
+            add_transcripts(bool): if False the genes are fetched without transcripts
+
+        Returns:
+            genes(dict): {<hgnc_id>: gene_obj(HgncGene)}
+        """
+        if build:
+            build = str(build)
+        if not build in ["37", "38"]:
+            build = "37"
+        hgnc_ids = list({int(hgnc_id) for hgnc_id in hgnc_ids})
+        genes = {}
+        if not hgnc_ids:
+            return genes
+
+        LOG.debug("Fetching %s genes", len(hgnc_ids))
+        query = {"hgnc_id": {"$in": hgnc_ids}, "build": build}
+        if not add_transcripts:
+            for gene_obj in self.hgnc_collection.find(query, {"transcripts": 0}):
+                genes.setdefault(gene_obj["hgnc_id"], gene_obj)
+            return genes
+
+        missing_transcripts = []
+        for gene_obj in self.hgnc_collection.find(query):
+            if gene_obj["hgnc_id"] in genes:
+                continue
+            if "transcripts" not in gene_obj:
+                gene_obj["transcripts"] = []
+                missing_transcripts.append(gene_obj["hgnc_id"])
+            genes[gene_obj["hgnc_id"]] = gene_obj
+
+        if not missing_transcripts:
+            return genes
+
+        tx_query = {"hgnc_id": {"$in": missing_transcripts}, "build": build}
+        for tx_obj in self.transcript_collection.find(tx_query):
+            genes[tx_obj["hgnc_id"]]["transcripts"].append(tx_obj)
+
+        return genes
+
+    def transcripts_embedded(self, build="37"):
+        """Check if the transcripts of a build are embedded in the gene documents
+
+        The result is kept for the lifetime of the adapter and updated when genes are loaded or
+        a gene without embedded transcripts is found.
+
+        Args:
+            build(str)
+
+        Returns:
+            bool
+        """
+        build = str(build)
+        embedded = getattr(self, "_embedded_transcripts", None)
+        if embedded is None:
+            embedded = self._embedded_transcripts = {}
+        if build not in embedded:
+            gene_obj = self.hgnc_collection.find_one(
+                {"build": build}, {"_id": 0, "transcripts.transcript_id": 1}
+            )
+            embedded[build] = bool(gene_obj and "transcripts" in gene_obj)
+        return embedded[build]
+
+    def embed_transcripts(self, build="37", add_exons=False):
+        """Embed the transcripts of each gene in the gene documents
+
+        With the transcripts embedded a gene with its transcripts is fetched with one query.
+        The transcripts are still kept in the transcript collection.
+
+        Args:
+            build(str)
+            add_exons(bool): Embed the exons of each transcript in the transcripts
+
+        Returns:
+            nr_updated(int): Number of updated genes
+        """
+        build = str(build)
+        LOG.info("Embedding transcripts in genes of build %s", build)
+        gene_transcripts = {}
+        tx_objs = {}
+        for tx_obj in self.transcript_collection.find({"build": build}):
+            gene_transcripts.setdefault(tx_obj["hgnc_id"], []).append(tx_obj)
+            if add_exons:
+                tx_obj["exons"] = []
+                tx_objs[tx_obj.get("transcript_id")] = tx_obj
+
+        if add_exons:
+            LOG.info("Embedding exons in transcripts")
+            for exon_obj in self.exon_collection.find({"build": build}):
+                tx_obj = tx_objs.get(exon_obj.get("transcript"))
+                if tx_obj:
+                    tx_obj["exons"].append(exon_obj)
+
+        requests = []
+        nr_updated = 0
+        for gene_obj in self.hgnc_collection.find({"build": build}, {"_id": 1, "hgnc_id": 1}):
+            transcripts = gene_transcripts.get(gene_obj["hgnc_id"], [])
+            requests.append(
+                pymongo.UpdateOne({"_id": gene_obj["_id"]}, {"$set": {"transcripts": transcripts}})
+            )
+            if len(requests) >= 5000:
+                nr_updated += self.hgnc_collection.bulk_write(
+                    requests, ordered=False
+                ).modified_count
+                requests = []
+        if requests:
+            nr_updated += self.hgnc_collection.bulk_write(requests, ordered=False).modified_count
+
+        self.clear_embedded_transcripts_mode(build)
+        LOG.info("Embedded transcripts in %s genes", nr_updated)
+        return nr_updated
+
+    def remove_embedded_transcripts(self, build="37"):
+        """Remove the embedded transcripts from the gene documents of a build
+
+        Args:
+            build(str)
+
+        Returns:
+            nr_updated(int): Number of updated genes
+        """
+        build = str(build)
+        res = self.hgnc_collection.update_many(
+            {"build": build, "transcripts": {"$exists": True}}, {"$unset": {"transcripts": ""}}
+        )
+        self.clear_embedded_transcripts_mode(build)
+        LOG.info("Removed embedded transcripts from %s genes", res.modified_count)
+        return res.modified_count
+
+    def clear_embedded_transcripts_mode(self, build=None):
+        """Check again if the transcripts are embedded, typically after the genes are updated
+
+        Args:
+            build(str): Only check this build again
+        """
+        embedded = getattr(self, "_embedded_transcripts", None) or {}
+        for embedded_build in list(embedded):
+            if build is None or embedded_build == str(build):
+                embedded.pop(embedded_build)
+
+    def hgncid_to_symbol(self, build="37", hgnc_ids=None):
+        """Return a dictionary with hgnc_id as keys and hgnc symbols as values
+
+        Only the ids and symbols are fetched from the database, in one query.
+
+        Args:
+            build(str)
+            hgnc_ids(iterable(int)): Only include these genes, default all genes of the build
+
+        Returns:
+            hgnc_symbols(dict): {<hgnc_id>: <hgnc_symbol>}
+        """
+        query = {"build": str(build)}
+        if hgnc_ids is not None:
+            query["hgnc_id"] = {"$in": list(set(hgnc_ids))}
+        projection = {"_id": 0, "hgnc_id": 1, "hgnc_symbol": 1}
+        return {
+            gene_obj["hgnc_id"]: gene_obj["hgnc_symbol"]
+            for gene_obj in self.hgnc_collection.find(query, projection)
+        }
+
     def hgnc_id(self, hgnc_symbol, build="37"):
         """Query the genes with a hgnc symbol and return the hgnc id
 
@@ -200,6 +469,7 @@ class GeneHandler(object):
 
     def drop_genes(self, build=None):
         """Delete the genes collection"""
+        self.clear_embedded_transcripts_mode(build)
         if build:
             LOG.info("Dropping the hgnc_gene collection, build %s", build)
             self.hgnc_collection.delete_many({"build": str(build)})
@@ -207,6 +477,136 @@ class GeneHandler(object):
             LOG.info("Dropping the hgnc_gene collection")
             self.hgnc_collection.drop()
 
+    def prepare_gene_reload(self, build=None):
+        """Direct gene and transcript loading to shadow collections
+
+        The live collections are left untouched while the new genes are loaded, so that the web
+        server and variant loading keep seeing the complete previous genes. If only one build is
+        reloaded the genes and transcripts of the other build are copied to the shadow collections.
+
+        Args:
+            build(str): The build that is reloaded, default all builds
+        """
+        self.recover_gene_reload()
+        for attribute, collection_name in GENE_RELOAD_COLLECTIONS.items():
+            shadow_name = collection_name + SHADOW_SUFFIX
+            self.db[shadow_name].drop()
+            other_builds = {"build": {"$ne": str(build)}}
+            if build and self.db[collection_name].find_one(other_builds, {"_id": 1}):
+                LOG.info("Copying %s of other builds than %s", collection_name, build)
+                self.db[collection_name].aggregate(
+                    [{"$match": other_builds}, {"$out": shadow_name}]
+                )
+            setattr(self, attribute, self.db[shadow_name])
+        self.clear_embedded_transcripts_mode(build)
+
+    def swap_gene_reload(self):
+        """Swap the loaded shadow collections in as the live gene and transcript collections
+
+        The indexes are built on the shadow collections before any live collection is replaced.
+        Each live collection is then renamed to the previous generation, for rollback, and its
+        shadow collection renamed to the live collection. The swap is recorded in a marker
+        document, so that a swap that is interrupted between the collections can be detected and
+        recovered, see recover_gene_reload.
+        """
+        self.recover_gene_reload()
+        for collection_name in GENE_RELOAD_COLLECTIONS.values():
+            shadow = self.db[collection_name + SHADOW_SUFFIX]
+            LOG.info("Building indexes for %s", shadow.name)
+            create_indexes(shadow, INDEXES[collection_name])
+
+        marker_collection = self.db[GENE_RELOAD_MARKER_COLLECTION]
+        marker_collection.insert_one({"_id": "swap", "swapped": []})
+        for collection_name in GENE_RELOAD_COLLECTIONS.values():
+            self.db[collection_name + PREVIOUS_SUFFIX].drop()
+
+        collection_names = self.collections()
+        for attribute, collection_name in GENE_RELOAD_COLLECTIONS.items():
+            if collection_name in collection_names:
+                LOG.info("Keeping %s as %s", collection_name, collection_name + PREVIOUS_SUFFIX)
+                self.db[collection_name].rename(collection_name + PREVIOUS_SUFFIX, dropTarget=True)
+            self.db[collection_name + SHADOW_SUFFIX].rename(collection_name, dropTarget=True)
+            marker_collection.update_one({"_id": "swap"}, {"$push": {"swapped": collection_name}})
+            setattr(self, attribute, self.db[collection_name])
+        marker_collection.delete_one({"_id": "swap"})
+        self.clear_embedded_transcripts_mode()
+        LOG.info("Swapped in the reloaded genes and transcripts")
+
+    def recover_gene_reload(self):
+        """Restore the genes and transcripts from before a swap that was interrupted
+
+        If the swap marker is left, some live collections may be from the reload and others from
+        before it. The collections from before the reload are renamed back to the live
+        collections, and the shadow and previous collections are dropped.
+
+        Returns:
+            recovered(bool): False if no swap was interrupted
+        """
+        marker_collection = self.db[GENE_RELOAD_MARKER_COLLECTION]
+        marker = marker_collection.find_one({"_id": "swap"})
+        if marker is None:
+            return False
+
+        LOG.warning("Found an interrupted gene swap, restoring the genes from before the reload")
+        collection_names = self.collections()
+        for attribute, collection_name in GENE_RELOAD_COLLECTIONS.items():
+            previous_name = collection_name + PREVIOUS_SUFFIX
+            swapped = collection_name in marker["swapped"]
+            if previous_name in collection_names and (
+                swapped or collection_name not in collection_names
+            ):
+                self.db[previous_name].rename(collection_name, dropTarget=True)
+            elif swapped:
+                # There was no collection before the reload
+                self.db[collection_name].drop()
+            # Any collection left of an older generation would not match the restored collections
+            self.db[previous_name].drop()
+            self.db[collection_name + SHADOW_SUFFIX].drop()
+            setattr(self, attribute, self.db[collection_name])
+        marker_collection.delete_one({"_id": "swap"})
+        self.clear_embedded_transcripts_mode()
+        self.clear_gene_snapshots()
+        return True
+
+    def discard_gene_reload(self):
+        """Drop the shadow collections of a failed reload and use the live collections again"""
+        if self.recover_gene_reload():
+            return
+        for attribute, collection_name in GENE_RELOAD_COLLECTIONS.items():
+            self.db[collection_name + SHADOW_SUFFIX].drop()
+            setattr(self, attribute, self.db[collection_name])
+        self.clear_embedded_transcripts_mode()
+
+    def rollback_gene_reload(self):
+        """Swap the previous generation of genes and transcripts back in
+
+        An interrupted swap is recovered instead, see recover_gene_reload.
+
+        Returns:
+            rolled_back(bool): False if there is no previous generation
+        """
+        if self.recover_gene_reload():
+            return True
+        collection_names = self.collections()
+        if "hgnc_gene" + PREVIOUS_SUFFIX not in collection_names:
+            LOG.warning("There are no previous genes and transcripts to roll back to")
+            return False
+
+        for attribute, collection_name in GENE_RELOAD_COLLECTIONS.items():
+            previous = self.db[collection_name + PREVIOUS_SUFFIX]
+            if previous.name in collection_names:
+                LOG.info("Building indexes for %s", previous.name)
+                create_indexes(previous, INDEXES[collection_name])
+                previous.rename(collection_name, dropTarget=True)
+            else:
+                # There was no collection before the reload
+                self.db[collection_name].drop()
+            setattr(self, attribute, self.db[collection_name])
+        self.clear_embedded_transcripts_mode()
+        self.clear_gene_snapshots()
+        LOG.info("Rolled back to the previous genes and transcripts")
+        return True
+
     def hgncid_to_gene(self, build="37", genes=None):
         """Return a dictionary with hgnc_id as key and gene_obj as value
 
@@ -393,53 +793,118 @@ class GeneHandler(object):
                 gene["hgnc_id"] = ",".join([str(hgnc_id) for hgnc_id in id_info["ids"]])
 
     def get_coding_intervals(self, build="37", genes=None):
-        """Return a dictionary with chromosomes as keys and interval trees as values
+        """Return an index with the coding intervals of each chromosome
 
-        Each interval represents a coding region of overlapping genes.
+        Each interval represents a coding region of overlapping genes, padded with 5000 bases.
 
         Args:
             build(str): The genome build
             genes(iterable(scout.models.HgncGene)):
 
         Returns:
-            intervals(dict): A dictionary with chromosomes as keys and overlapping genomic intervals as values
+            intervals(GenomicIntervalIndex): Merged intervals with a unique id as data
         """
-        intervals = {}
         if not genes:
             genes = self.all_genes(build=build)
-        LOG.info("Building interval trees...")
-        for i, hgnc_obj in enumerate(genes):
-            chrom = hgnc_obj["chromosome"]
-            start = max((hgnc_obj["start"] - 5000), 1)
-            end = hgnc_obj["end"] + 5000
-
-            # If this is the first time a chromosome is seen we create a new
-            # interval tree with current interval
-            if chrom not in intervals:
-                intervals[chrom] = intervaltree.IntervalTree()
-                intervals[chrom].addi(start, end, i)
-                continue
+        LOG.info("Building coding intervals...")
+        return GenomicIntervalIndex.merged(
+            (
+                hgnc_obj["chromosome"],
+                max((hgnc_obj["start"] - 5000), 1),
+                hgnc_obj["end"] + 5000,
+            )
+            for hgnc_obj in genes
+        )
 
-            res = intervals[chrom].overlap(start, end)
+    def gene_collection_checksum(self, build="37"):
+        """Return a checksum that changes whenever the genes of a build are reloaded
 
-            # If the interval did not overlap any other intervals we insert it and continue
-            if not res:
-                intervals[chrom].addi(start, end, i)
-                continue
+        The checksum is based on the number of genes and the newest document id, since genes
+        are always reinserted with new ids when updated.
 
-            # Loop over the overlapping intervals
-            for interval in res:
-                # Update the positions to new max and mins
-                if interval.begin < start:
-                    start = interval.begin
+        Args:
+            build(str)
 
-                if interval.end > end:
-                    end = interval.end
+        Returns:
+            checksum(str)
+        """
+        query = {"build": str(build)}
+        nr_genes = self.hgnc_collection.find(query).count()
+        last_id = None
+        for gene_obj in (
+            self.hgnc_collection.find(query, {"_id": 1}).sort("_id", pymongo.DESCENDING).limit(1)
+        ):
+            last_id = gene_obj["_id"]
+        hash_obj = hashlib.md5()
+        hash_obj.update("{0}:{1}:{2}".format(build, nr_genes, last_id).encode("utf-8"))
+        return hash_obj.hexdigest()
+
+    def gene_snapshot(self, build="37"):
+        """Return a snapshot with the gene reference data used when loading variants
+
+        The snapshot is built once per build and gene collection checksum. It is kept in
+        memory and, if a gene cache directory is configured, in a file that is reused by other
+        processes.
 
-                # Delete the old interval
-                intervals[chrom].remove(interval)
+        Args:
+            build(str)
 
-            # Add the new interval consisting och the overlapping ones
-            intervals[chrom].addi(start, end, i)
+        Returns:
+            snapshot(dict): {
+                'version': <int>,
+                'build': <str>,
+                'checksum': <str>,
+                'hgncid_to_gene': {<hgnc_id>: <gene_obj with SNAPSHOT_GENE_FIELDS>},
+                'coding_intervals': <GenomicIntervalIndex>,
+            }
+        """
+        build = str(build or "37")
+        if build == "GRCh38":
+            build = "38"
+        checksum = self.gene_collection_checksum(build)
+
+        snapshots = getattr(self, "_gene_snapshots", None)
+        if snapshots is None:
+            snapshots = self._gene_snapshots = {}
+        snapshot = snapshots.get(build)
+        if snapshot and snapshot["checksum"] == checksum:
+            return snapshot
+
+        path = None
+        if self.gene_cache_dir:
+            path = snapshot_path(self.gene_cache_dir, build, checksum)
+            snapshot = read_snapshot(path)
+            if snapshot:
+                LOG.info("Using gene snapshot %s", path)
+                snapshots[build] = snapshot
+                return snapshot
+
+        LOG.info("Building gene snapshot for build %s", build)
+        projection = {field: 1 for field in SNAPSHOT_GENE_FIELDS}
+        projection["_id"] = 0
+        genes = list(self.hgnc_collection.find({"build": build}, projection))
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "build": build,
+            "checksum": checksum,
+            "hgncid_to_gene": self.hgncid_to_gene(build=build, genes=genes),
+            "coding_intervals": self.get_coding_intervals(build=build, genes=genes),
+        }
+        if path:
+            write_snapshot(snapshot, path)
+        snapshots[build] = snapshot
+        return snapshot
+
+    def clear_gene_snapshots(self, build=None):
+        """Invalidate gene snapshots, typically after the genes are updated
 
-        return intervals
+        Args:
+            build(str): Only clear snapshots of this build
+        """
+        snapshots = getattr(self, "_gene_snapshots", None) or {}
+        for snapshot_build in list(snapshots):
+            if build is None or snapshot_build == str(build):
+                snapshots.pop(snapshot_build)
+        if self.gene_cache_dir:
+            nr_deleted = clear_snapshots(self.gene_cache_dir, build=build)
+            LOG.info("Deleted %s gene snapshots", nr_deleted)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import logging
 
 import operator
@@ -7,6 +8,7 @@ from pymongo.errors import DuplicateKeyError, BulkWriteError
 from pymongo import ASCENDING
 
 from scout.exceptions import IntegrityError
+from scout.utils.hpo_index import HpoAncestorIndex
 
 LOG = logging.getLogger(__name__)
 
@@ -20,6 +22,7 @@ class HpoHandler(object):
 
         """
         LOG.debug("Loading hpo term %s into database", hpo_obj["_id"])
+        self._hpo_ancestor_index = None
         try:
             self.hpo_term_collection.insert_one(hpo_obj)
         except DuplicateKeyError as err:
@@ -37,6 +40,7 @@ class HpoHandler(object):
 
         """
         LOG.debug("Loading hpo bulk")
+        self._hpo_ancestor_index = None
 
         try:
             result = self.hpo_term_collection.insert_many(hpo_bulk)
@@ -100,6 +104,48 @@ class HpoHandler(object):
 
         return res
 
+    def hpo_term_collection_checksum(self):
+        """Return a checksum that changes whenever the HPO terms are reloaded
+
+        The HPO terms are updated by dropping and reloading the collection, which then gets a new
+        collection uuid (MongoDB 3.6 or later). The checksum is based on the uuid and the number
+        of terms.
+
+        Returns:
+            checksum(str)
+        """
+        nr_terms = self.hpo_term_collection.find({}, {"_id": 1}).count()
+        collection_uuid = None
+        try:
+            for collection_info in self.db.list_collections(
+                filter={"name": self.hpo_term_collection.name}
+            ):
+                collection_uuid = collection_info.get("info", {}).get("uuid")
+        except Exception as err:
+            LOG.debug("Could not get the uuid of the HPO term collection: %s", err)
+        hash_obj = hashlib.md5()
+        hash_obj.update("{0}:{1}".format(nr_terms, collection_uuid).encode("utf-8"))
+        return hash_obj.hexdigest()
+
+    def hpo_ancestor_index(self):
+        """Return an index with the ancestors of all HPO terms
+
+        The index is built from one query and kept in memory. It is rebuilt when the HPO term
+        collection checksum changes, e.g. when the terms have been updated by another process,
+        and after HPO terms are loaded with this adapter.
+
+        Returns:
+            hpo_index(HpoAncestorIndex)
+        """
+        checksum = self.hpo_term_collection_checksum()
+        hpo_index = getattr(self, "_hpo_ancestor_index", None)
+        if hpo_index is None or self._hpo_ancestor_checksum != checksum:
+            LOG.info("Build HPO ancestor index")
+            hpo_index = HpoAncestorIndex(self.hpo_term_collection.find({}, {"all_ancestors": 1}))
+            self._hpo_ancestor_index = hpo_index
+            self._hpo_ancestor_checksum = checksum
+        return hpo_index
+
     def generate_hpo_gene_list(self, *hpo_terms):
         """Generate a sorted list with namedtuples of hpogenes
         Each namedtuple of the list looks like (hgnc_id, count)
@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from pymongo import ASCENDING
-from pymongo.errors import DuplicateKeyError
+from pymongo import ASCENDING, ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from scout.exceptions import IntegrityError
 
@@ -116,6 +116,28 @@ class DiagnosisHandler(object):
 
         return list(self.disease_term_collection.find(query))
 
+    def disease_terms_by_genes(self, hgnc_ids):
+        """Return the disease terms for a group of genes, fetched with one query
+
+        Args:
+            hgnc_ids(iterable(int))
+
+        Returns:
+            disease_terms(dict): {<hgnc_id>: list(dict)}, with an empty list for genes without terms
+        """
+        disease_terms = {hgnc_id: [] for hgnc_id in hgnc_ids}
+        if not disease_terms:
+            return disease_terms
+
+        LOG.debug("Fetching all diseases for %s genes", len(disease_terms))
+        query = {"genes": {"$in": list(disease_terms)}}
+        for disease_obj in self.disease_term_collection.find(query):
+            for hgnc_id in disease_obj.get("genes", []):
+                if hgnc_id in disease_terms:
+                    disease_terms[hgnc_id].append(disease_obj)
+
+        return disease_terms
+
     def load_disease_term(self, disease_obj):
         """Load a disease term into the database
 
@@ -131,3 +153,51 @@ class DiagnosisHandler(object):
             )
 
         LOG.debug("Disease term saved")
+
+    def load_disease_term_bulk(self, disease_objs):
+        """Load a bulk of disease terms into the database
+
+        The terms are inserted unordered, so one request is sent for the whole bulk.
+
+        Args:
+            disease_objs(list(dict))
+
+        Returns:
+            result (pymongo.results.InsertManyResult)
+        """
+        LOG.debug("Loading disease term bulk with length %s", len(disease_objs))
+        try:
+            result = self.disease_term_collection.insert_many(disease_objs, ordered=False)
+        except (DuplicateKeyError, BulkWriteError) as err:
+            raise IntegrityError(err)
+
+        return result
+
+    def upsert_disease_term_bulk(self, disease_objs):
+        """Replace a bulk of disease terms, inserting terms that does not exist
+
+        Args:
+            disease_objs(list(dict))
+
+        Returns:
+            nr_written(int): the number of replaced and inserted terms
+        """
+        LOG.debug("Upserting disease term bulk with length %s", len(disease_objs))
+        requests = [
+            ReplaceOne({"_id": disease_obj["_id"]}, disease_obj, upsert=True)
+            for disease_obj in disease_objs
+        ]
+        result = self.disease_term_collection.bulk_write(requests, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    def delete_disease_terms(self, disease_ids):
+        """Delete disease terms
+
+        Args:
+            disease_ids(iterable(str)): like 'OMIM:600233'
+
+        Returns:
+            nr_deleted(int)
+        """
+        result = self.disease_term_collection.delete_many({"_id": {"$in": list(disease_ids)}})
+        return result.deleted_count
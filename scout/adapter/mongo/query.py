@@ -78,9 +78,14 @@ class QueryHandler(object):
             case_obj = self.case(display_name=similar_case_display_name, institute_id=institute_id)
             if case_obj:
                 LOG.debug("Search for cases similar to %s", case_obj.get("display_name"))
-                similar_cases = self.get_similar_cases(case_obj)
+                hpo_terms = [term["phenotype_id"] for term in case_obj.get("phenotype_terms", [])]
+                similar_cases = (
+                    self.cases_by_phenotype(hpo_terms, institute_id, case_obj["_id"]) or []
+                )
                 LOG.debug("Similar cases: %s", similar_cases)
-                select_cases = [similar[0] for similar in similar_cases]
+                select_cases = [similar[0] for similar in similar_cases if similar[1] > 0]
+                # No variants should be returned if there are no similar cases
+                mongo_variant_query["case_id"] = {"$in": select_cases}
             else:
                 LOG.debug("Case %s not found.", similar_case_display_name)
 
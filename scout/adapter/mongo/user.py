@@ -68,6 +68,24 @@ class UserHandler(object):
         res = self.user_collection.find(query)
         return res
 
+    def users_by_emails(self, emails):
+        """Fetch a group of users with one query
+
+        Args:
+            emails(iterable(str))
+
+        Returns:
+            users(dict): {<email>: user_obj}, users that do not exist are left out
+        """
+        emails = list(set(emails))
+        if not emails:
+            return {}
+        LOG.info("Fetching %s users", len(emails))
+        return {
+            user_obj["email"]: user_obj
+            for user_obj in self.user_collection.find({"email": {"$in": emails}})
+        }
+
     def user(self, email=None, user_id=None):
         """Fetch a user from the database.
 
@@ -25,20 +25,83 @@ from .variant_loader import VariantLoader
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of overlapping variants shown for a variant
+NR_OVERLAPPING = 30
+# The fields of overlapping variants that are shown in variant lists
+OVERLAPPING_PROJECTION = {
+    "_id": 1,
+    "hgnc_ids": 1,
+    "hgnc_symbols": 1,
+    "display_name": 1,
+    "category": 1,
+    "sub_category": 1,
+    "chromosome": 1,
+    "cytoband_start": 1,
+    "length": 1,
+    "rank_score": 1,
+    "region_annotations": 1,
+    "functional_annotations": 1,
+}
+
 
 class VariantHandler(VariantLoader):
 
     """Methods to handle variants in the mongo adapter"""
 
-    def add_gene_info(self, variant_obj, gene_panels=None, build=None):
+    def add_gene_info_batch(self, variant_objs, gene_panels=None, build=None):
+        """Add extra information about genes to a group of variants
+
+        The genes, transcripts and disease terms of all variants are fetched with one query each.
+
+        Args:
+            variant_objs(iterable(dict)): Variants from the database
+            gene_panels(list(dict)): List of panels from database
+            build(str): chromosome build 37 or 38
+
+        Returns:
+            variant_objs(list(dict))
+        """
+        variant_objs = list(variant_objs)
+        hgnc_ids = {
+            variant_gene["hgnc_id"]
+            for variant_obj in variant_objs
+            for variant_gene in variant_obj.get("genes", [])
+        }
+        genes = self.hgnc_genes_by_ids(hgnc_ids, build)
+        disease_terms = self.disease_terms_by_genes(genes)
+
+        for variant_obj in variant_objs:
+            self.add_gene_info(
+                variant_obj,
+                gene_panels=gene_panels,
+                build=build,
+                genes=genes,
+                disease_terms=disease_terms,
+            )
+        return variant_objs
+
+    def add_gene_info(
+        self, variant_obj, gene_panels=None, build=None, genes=None, disease_terms=None
+    ):
         """Add extra information about genes from gene panels
 
         Args:
             variant_obj(dict): A variant from the database
             gene_panels(list(dict)): List of panels from database
             build(str): chromosome build 37 or 38
+            genes(dict): Prefetched genes, {<hgnc_id>: gene_obj}, see hgnc_genes_by_ids
+            disease_terms(dict): Prefetched disease terms, {<hgnc_id>: list(dict)}
+
+        Returns:
+            variant_obj(dict)
         """
         gene_panels = gene_panels or []
+        if genes is None:
+            genes = self.hgnc_genes_by_ids(
+                [variant_gene["hgnc_id"] for variant_gene in variant_obj.get("genes", [])], build
+            )
+        if disease_terms is None:
+            disease_terms = self.disease_terms_by_genes(genes)
 
         # Add a variable that checks if there are any refseq transcripts
         variant_obj["has_refseq"] = False
@@ -60,7 +123,7 @@ class VariantHandler(VariantLoader):
         for variant_gene in variant_obj.get("genes", []):
             hgnc_id = variant_gene["hgnc_id"]
             # Get the hgnc_gene
-            hgnc_gene = self.hgnc_gene(hgnc_id, build)
+            hgnc_gene = genes.get(hgnc_id)
 
             if not hgnc_gene:
                 continue
@@ -146,7 +209,7 @@ class VariantHandler(VariantLoader):
 
             variant_gene["common"] = hgnc_gene
             # Add the associated disease terms
-            variant_gene["disease_terms"] = self.disease_terms(hgnc_id)
+            variant_gene["disease_terms"] = disease_terms.get(hgnc_id, [])
 
         return variant_obj
 
@@ -159,11 +222,17 @@ class VariantHandler(VariantLoader):
         nr_of_variants=10,
         skip=0,
         sort_key="variant_rank",
+        after_variant_rank=None,
+        projection=None,
     ):
         """Returns variants specified in question for a specific case.
 
         If skip not equal to 0 skip the first n variants.
 
+        Variant ranks are unique within a case, category and variant type, so pages can also be
+        fetched after the last variant rank of the previous page. Then the database does not
+        have to go through all the variants before the page.
+
         Arguments:
             case_id(str): A string that represents the case
             query(dict): A dictionary with querys for the database
@@ -172,6 +241,9 @@ class VariantHandler(VariantLoader):
             nr_of_variants(int): if -1 return all variants
             skip(int): How many variants to skip
             sort_key: ['variant_rank', 'rank_score', 'position']
+            after_variant_rank(int): Only return variants ranked after this rank, requires
+                                     sort_key 'variant_rank'
+            projection(dict): Only return these fields of the variants
 
         Yields:
             result(Iterable[Variant])
@@ -190,6 +262,11 @@ class VariantHandler(VariantLoader):
         mongo_query = self.build_query(
             case_id, query=query, variant_ids=variant_ids, category=category
         )
+        if after_variant_rank is not None:
+            if sort_key != "variant_rank":
+                raise ValueError("Variants can only be fetched after a rank when sorted on rank")
+            mongo_query = {"$and": [mongo_query, {"variant_rank": {"$gt": after_variant_rank}}]}
+
         sorting = []
         if sort_key == "variant_rank":
             sorting = [("variant_rank", pymongo.ASCENDING)]
@@ -198,9 +275,9 @@ class VariantHandler(VariantLoader):
         if sort_key == "position":
             sorting = [("position", pymongo.ASCENDING)]
 
-        result = self.variant_collection.find(mongo_query, skip=skip, limit=nr_of_variants).sort(
-            sorting
-        )
+        result = self.variant_collection.find(
+            mongo_query, projection, skip=skip, limit=nr_of_variants
+        ).sort(sorting)
 
         return result
 
@@ -347,6 +424,7 @@ class VariantHandler(VariantLoader):
             var_obj["case_obj"] = {
                 "display_name": case_obj["display_name"],
                 "individuals": case_obj["individuals"],
+                "genome_build": case_obj.get("genome_build", "37"),
             }
             res.append(var_obj)
 
@@ -553,6 +631,116 @@ class VariantHandler(VariantLoader):
 
         return variants
 
+    def overlapping_by_variants(self, variant_objs):
+        """Return overlapping variants for a group of variants
+
+        Same result as overlapping() for each variant, but only with the fields shown in variant
+        lists. The 30 most severe variants of each gene are found with one aggregation per case,
+        category and variant type, and fetched with one more query. The 30 most severe
+        overlapping variants of a variant are always among the ones of its genes.
+
+        Args:
+            variant_objs(iterable(dict))
+
+        Returns:
+            overlapping(dict): {<variant _id>: list(dict)}, with the 30 most severe variants
+        """
+        overlapping = {}
+        # Group the variants on the query that would be used to find their overlapping variants
+        groups = {}
+        for variant_obj in variant_objs:
+            overlapping[variant_obj["_id"]] = []
+            category = "snv" if variant_obj["category"] == "sv" else "sv"
+            variant_type = variant_obj.get("variant_type", "clinical")
+            group_key = (variant_obj["case_id"], category, variant_type)
+            groups.setdefault(group_key, []).append(variant_obj)
+
+        for (case_id, category, variant_type), group in groups.items():
+            hgnc_ids = list(
+                {hgnc_id for variant_obj in group for hgnc_id in variant_obj.get("hgnc_ids", [])}
+            )
+            if not hgnc_ids:
+                continue
+            query = {
+                "$and": [
+                    {"case_id": case_id},
+                    {"category": category},
+                    {"variant_type": variant_type},
+                    {"hgnc_ids": {"$in": hgnc_ids}},
+                ]
+            }
+            pipeline = [
+                {"$match": query},
+                {"$project": {"hgnc_ids": 1, "rank_score": 1}},
+                {"$sort": {"rank_score": pymongo.DESCENDING}},
+                {"$unwind": "$hgnc_ids"},
+                {"$match": {"hgnc_ids": {"$in": hgnc_ids}}},
+                {"$group": {"_id": "$hgnc_ids", "variant_ids": {"$push": "$_id"}}},
+                {"$project": {"variant_ids": {"$slice": ["$variant_ids", NR_OVERLAPPING]}}},
+            ]
+            candidate_ids = set()
+            for gene_variants in self.variant_collection.aggregate(pipeline, allowDiskUse=True):
+                candidate_ids.update(gene_variants["variant_ids"][:NR_OVERLAPPING])
+
+            candidates = list(
+                self.variant_collection.find(
+                    {"_id": {"$in": list(candidate_ids)}}, OVERLAPPING_PROJECTION
+                ).sort([("rank_score", pymongo.DESCENDING)])
+            )
+            for variant_obj in group:
+                variant_hgnc_ids = set(variant_obj.get("hgnc_ids", []))
+                # We collect the 30 most severe overlapping variants
+                overlapping[variant_obj["_id"]] = [
+                    candidate
+                    for candidate in candidates
+                    if variant_hgnc_ids.intersection(candidate.get("hgnc_ids", []))
+                ][:NR_OVERLAPPING]
+
+        return overlapping
+
+    def variants_by_simple_ids(self, case_id, simple_ids, variant_type="clinical"):
+        """Return the variants of a case with the given simple ids, fetched with one query
+
+        Args:
+            case_id(str)
+            simple_ids(iterable(str)): variant simple_ids (example: 1_161184089_G_GTA)
+            variant_type(str): 'research' or 'clinical' - default 'clinical'
+
+        Returns:
+            variants(dict): {<simple_id>: variant_obj}
+        """
+        simple_ids = list(set(simple_ids))
+        variants = {}
+        if not simple_ids:
+            return variants
+        query = {"case_id": case_id, "simple_id": {"$in": simple_ids}, "variant_type": variant_type}
+        for variant_obj in self.variant_collection.find(query):
+            variants.setdefault(variant_obj["simple_id"], variant_obj)
+        return variants
+
+    def variants_by_document_ids(self, document_ids, build="37"):
+        """Return a group of variants, fetched with one query
+
+        Gene information is added to all variants at once, as in variant().
+
+        Args:
+            document_ids(iterable(str)): the _id of the variants
+            build(str): chromosome build 37 or 38
+
+        Returns:
+            variants(dict): {<document_id>: variant_obj}
+        """
+        document_ids = list(set(document_ids))
+        variants = {}
+        if not document_ids:
+            return variants
+        for variant_obj in self.variant_collection.find({"_id": {"$in": document_ids}}):
+            if variant_obj["chromosome"] in ["X", "Y"]:
+                variant_obj["is_par"] = is_par(variant_obj["chromosome"], variant_obj["position"])
+            variants[variant_obj["_id"]] = variant_obj
+        self.add_gene_info_batch(variants.values(), build=build)
+        return variants
+
     def evaluated_variants(self, case_id):
         """Returns variants that have been evaluated
 
@@ -586,33 +774,35 @@ class VariantHandler(VariantLoader):
         variants = {}
         case_obj = self.case(case_id=case_id)  # case exists since it's used in the query above
         for var in self.variant_collection.find(query):
-            variants[var["variant_id"]] = self.add_gene_info(
-                variant_obj=var, build=case_obj["genome_build"]
-            )
+            variants[var["variant_id"]] = var
 
         # Collect all variant comments from the case
         event_query = {"$and": [{"case": case_id}, {"category": "variant"}, {"verb": "comment"}]}
 
-        # Get all variantids for commented variants
+        # Get all variantids for commented variants that are not already added
         comment_variants = {
             event["variant_id"] for event in self.event_collection.find(event_query)
-        }
-
-        # Get the variant objects for commented variants, if they exist
-        for var_id in comment_variants:
-            # Skip if we already added the variant
-            if var_id in variants:
-                continue
-            # Get the variant with variant_id (not _id!)
-            variant_obj = self.variant(var_id, case_id=case_id)
-
-            # There could be cases with comments that refers to non existing variants
-            # if a case has been reanalysed
-            if not variant_obj:
-                continue
+        }.difference(variants)
+
+        # Get the variant objects for commented variants, if they exist.
+        # There could be cases with comments that refers to non existing variants
+        # if a case has been reanalysed
+        if comment_variants:
+            commented_query = {"case_id": case_id, "variant_id": {"$in": list(comment_variants)}}
+            for variant_obj in self.variant_collection.find(commented_query):
+                # Get the variant with variant_id (not _id!)
+                var_id = variant_obj["variant_id"]
+                if var_id in variants:
+                    continue
+                variant_obj["is_commented"] = True
+                if variant_obj["chromosome"] in ["X", "Y"]:
+                    variant_obj["is_par"] = is_par(
+                        variant_obj["chromosome"], variant_obj["position"]
+                    )
+                variants[var_id] = variant_obj
 
-            variant_obj["is_commented"] = True
-            variants[var_id] = variant_obj
+        # Add gene information to all variants at once
+        self.add_gene_info_batch(variants.values(), build=case_obj["genome_build"])
 
         # Return a list with the variant objects
         return variants.values()
@@ -627,6 +817,7 @@ class VariantHandler(VariantLoader):
         variant_type="clinical",
         category="snv",
         rank_threshold=None,
+        cache=None,
     ):
         """Produce a reduced vcf with variants from the specified coordinates
            This is used for the alignment viewer.
@@ -640,9 +831,10 @@ class VariantHandler(VariantLoader):
             start(int): Specify the start position
             end(int): Specify the end position
             gene_obj(dict): A gene object from the database
+            cache(scout.utils.region_vcf.RegionVcfCache): Reuse a bgzipped region vcf from a cache
 
         Returns:
-            file_name(str): Path to the temporary file
+            file_name(str): Path to the temporary file, or to the file in the cache
         """
         rank_threshold = rank_threshold or -100
 
@@ -665,13 +857,6 @@ class VariantHandler(VariantLoader):
         if not variant_file:
             raise FileNotFoundError("VCF file does not seem to exist")
 
-        try:
-            vcf_obj = VCF(variant_file)
-        except Exception:
-            raise FileNotFoundError(
-                "Could not access {}. The file is missing or malformed".format(variant_file)
-            )
-
         region = ""
 
         if gene_obj:
@@ -688,6 +873,16 @@ class VariantHandler(VariantLoader):
         else:
             rank_threshold = rank_threshold or 5
 
+        if cache:
+            return cache.region_vcf(variant_file, region)
+
+        try:
+            vcf_obj = VCF(variant_file)
+        except Exception:
+            raise FileNotFoundError(
+                "Could not access {}. The file is missing or malformed".format(variant_file)
+            )
+
         with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp:
             file_name = str(pathlib.Path(temp.name))
             for header_line in vcf_obj.raw_header.split("\n"):
@@ -246,6 +246,79 @@ class VariantEventHandler(object):
         sanger_ordered = [item for item in results]
         return sanger_ordered
 
+    def sanger_unevaluated(self, institute_id, user_id=None):
+        """Get the variants of an institute with Sanger ordered but not yet evaluated
+
+        Starts from the variants with Sanger ordered, and joins the events of the institute that
+        ordered Sanger and the cases in the database, so the number of events in the institute
+        does not matter. The variants of cases the institute collaborates on are included.
+
+        Args:
+            institute_id(str) : The id of an institute
+            user_id(str) : Only include variants that this user ordered Sanger for
+
+        Returns:
+            unevaluated(pymongo.command_cursor.CommandCursor): one document per case, like
+                {"_id": <case_id>, "display_name": <case display name>, "vars": [<variant _id>]}
+        """
+        event_match = {"verb": "sanger", "institute": institute_id}
+        if user_id:
+            event_match["user_id"] = user_id
+
+        pipeline = [
+            {
+                "$match": {
+                    "sanger_ordered": True,
+                    "validation": {"$nin": ["True positive", "False positive"]},
+                }
+            },
+            # The events of the institute ordering Sanger for the variant in its case
+            {
+                "$lookup": {
+                    "from": "event",
+                    "let": {"variant_id": "$variant_id", "case_id": "$case_id"},
+                    "pipeline": [
+                        {
+                            "$match": {
+                                "$expr": {
+                                    "$and": [
+                                        {"$eq": ["$variant_id", "$$variant_id"]},
+                                        {"$eq": ["$case", "$$case_id"]},
+                                    ]
+                                }
+                            }
+                        },
+                        {"$match": event_match},
+                        {"$limit": 1},
+                        {"$project": {"_id": 1}},
+                    ],
+                    "as": "sanger_events",
+                }
+            },
+            {"$match": {"sanger_events": {"$ne": []}}},
+            # Variants of removed cases are skipped by the unwind
+            {
+                "$lookup": {
+                    "from": "case",
+                    "let": {"case_id": "$case_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$case_id"]}}},
+                        {"$project": {"display_name": 1}},
+                    ],
+                    "as": "case",
+                }
+            },
+            {"$unwind": "$case"},
+            {
+                "$group": {
+                    "_id": "$case_id",
+                    "display_name": {"$first": "$case.display_name"},
+                    "vars": {"$push": "$_id"},
+                }
+            },
+        ]
+        return self.variant_collection.aggregate(pipeline)
+
     def validate(self, institute, case, user, link, variant, validate_type):
         """Mark validation status for a variant.
 
@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 # stdlib modules
+import collections
 import logging
+import multiprocessing
+import os
+import queue
 import re
+import threading
+import time
 import pathlib
+import warnings
 import tempfile
 
 from datetime import datetime
@@ -13,7 +20,7 @@ import pymongo
 from pymongo.errors import DuplicateKeyError, BulkWriteError
 
 from cyvcf2 import VCF
-from intervaltree import IntervalTree
+from pysam import TabixFile
 
 # Local modules
 from scout.parse.variant.headers import parse_rank_results_header, parse_vep_header
@@ -29,9 +36,250 @@ from scout.constants import CHROMOSOMES, FILE_TYPE_MAP
 
 LOG = logging.getLogger(__name__)
 
+# The fields needed to update the compounds of a variant
+COMPOUND_PROJECTION = {
+    "_id": 1,
+    "rank_score": 1,
+    "genes": 1,
+    "compounds": 1,
+    "position": 1,
+    "end": 1,
+}
+
+# Shared parsing context and vcf handle of a worker process, set when the worker is started
+_PARSE_CONTEXT = None
+_PARSE_VCF = None
+
+# Chromosomes are parsed in parallel in regions of this many base pairs, so the variant objects
+# a worker returns at a time do not grow with the size of the chromosome
+PARSE_REGION_SIZE = 5000000
+# Number of regions per worker that are parsed ahead of the region that is being loaded
+PARSE_REGIONS_AHEAD = 2
+
+
+def parse_stats_template():
+    """Return a dictionary used to count parsed variants and time spent parsing and building"""
+    return {"parsed": 0, "parse_time": 0.0, "build_time": 0.0}
+
+
+def build_variant_obj(variant, parse_context, parse_stats=None):
+    """Parse and build a variant object if the variant should be loaded
+
+    Variants are loaded if they have no rank score, if the rank score is above the threshold,
+    if they are mitochondrial or if they are annotated as pathogenic.
+
+    Args:
+        variant(cyvcf2.Variant)
+        parse_context(dict): Case and gene information needed to parse and build variants.
+            Keys: 'variant_type', 'case_obj', 'individual_positions', 'rank_threshold',
+            'institute_id', 'rank_results_header', 'vep_header', 'category', 'sample_info',
+            'gene_to_panels' and 'hgncid_to_gene'
+        parse_stats(dict): If given, seconds spent parsing and building are added to it
+
+    Returns:
+        variant_obj(dict): None if the variant should not be loaded
+    """
+    start_parse = time.perf_counter()
+    case_obj = parse_context["case_obj"]
+    # All MT variants are loaded
+    mt_variant = "MT" in variant.CHROM
+    rank_score = parse_rank_score(variant.INFO.get("RankScore"), case_obj["_id"])
+    pathogenic = is_pathogenic(variant)
+
+    # Check if the variant should be loaded at all
+    # if rank score is None means there are no rank scores annotated, all variants will be loaded
+    # Otherwise we load all variants above a rank score treshold
+    # Except for MT variants where we load all variants
+    if not (
+        (rank_score is None)
+        or (rank_score > parse_context["rank_threshold"])
+        or mt_variant
+        or pathogenic
+    ):
+        if parse_stats is not None:
+            parse_stats["parse_time"] += time.perf_counter() - start_parse
+        return None
+
+    # Parse the vcf variant
+    parsed_variant = parse_variant(
+        variant=variant,
+        case=case_obj,
+        variant_type=parse_context["variant_type"],
+        rank_results_header=parse_context["rank_results_header"],
+        vep_header=parse_context["vep_header"],
+        individual_positions=parse_context["individual_positions"],
+        category=parse_context["category"],
+    )
+
+    start_build = time.perf_counter()
+
+    # Build the variant object
+    variant_obj = build_variant(
+        variant=parsed_variant,
+        institute_id=parse_context["institute_id"],
+        gene_to_panels=parse_context["gene_to_panels"],
+        hgncid_to_gene=parse_context["hgncid_to_gene"],
+        sample_info=parse_context["sample_info"],
+    )
+
+    if parse_stats is not None:
+        parse_stats["parse_time"] += start_build - start_parse
+        parse_stats["build_time"] += time.perf_counter() - start_build
+
+    return variant_obj
+
+
+def _init_parse_worker(parse_context):
+    """Store the parsing context in a worker process so it is only transferred once"""
+    global _PARSE_CONTEXT, _PARSE_VCF
+    _PARSE_CONTEXT = parse_context
+    _PARSE_VCF = VCF(parse_context["variant_file"])
+    # Most small regions of a chromosome are empty, which cyvcf2 warns about
+    warnings.filterwarnings("ignore", message="no intervals found")
+
+
+def indexed_contigs(variant_file):
+    """Return the chromosomes with records in an indexed vcf, from its tabix index
+
+    Chromosomes that are missing from the vcf header are also in the index.
+
+    Args:
+        variant_file(str): Path to a bgzipped vcf with a .tbi or .csi index
+
+    Returns:
+        contigs(list(str)): In the order of the vcf
+    """
+    with TabixFile(str(variant_file)) as tabix_file:
+        return list(tabix_file.contigs)
+
+
+def parse_regions(vcf_obj, region_size=PARSE_REGION_SIZE, contigs=None):
+    """Split the chromosomes of an indexed vcf into regions of a bounded size
+
+    Chromosomes without a length in the vcf header are parsed as one region.
+
+    Args:
+        vcf_obj(cyvcf2.VCF)
+        region_size(int): Maximum number of base pairs in a region
+        contigs(list(str)): Chromosomes to split, see indexed_contigs. Defaults to the contigs
+                            in the vcf header
+
+    Returns:
+        regions(list(tuple)): (<chrom>, <start>, <end>) in the order of the vcf, 1-based, the
+                              end of the last region of a chromosome is None
+    """
+    seqnames = list(vcf_obj.seqnames)
+    try:
+        seqlens = list(vcf_obj.seqlens)
+    except Exception:
+        seqlens = [None] * len(seqnames)
+    chrom_lengths = dict(zip(seqnames, seqlens))
+
+    regions = []
+    for chrom in seqnames if contigs is None else contigs:
+        length = chrom_lengths.get(chrom)
+        start = 1
+        while length and start + region_size <= length:
+            regions.append((chrom, start, start + region_size - 1))
+            start += region_size
+        regions.append((chrom, start, None))
+    return regions
+
+
+def _parse_region(region):
+    """Parse and build the variants from one region of a vcf in a worker process
+
+    Only the variants that start in the region are parsed, variants that overlap the start of
+    the region belong to the region before.
+
+    Args:
+        region(tuple): (<chrom>, <start>, <end>) as returned by parse_regions
+
+    Returns:
+        parse_stats(dict): Number of variants parsed in the region and time spent
+        variant_objs(list(dict)): The variant objects that should be loaded
+    """
+    chrom, start, end = region
+    if start == 1 and end is None:
+        query = chrom
+    else:
+        query = "{0}:{1}-{2}".format(chrom, start, end or "")
+
+    parse_stats = parse_stats_template()
+    variant_objs = []
+    for variant in _PARSE_VCF(query):
+        if variant.POS < start:
+            continue
+        parse_stats["parsed"] += 1
+        variant_obj = build_variant_obj(variant, _PARSE_CONTEXT, parse_stats)
+        if variant_obj:
+            variant_objs.append(variant_obj)
+    return parse_stats, variant_objs
+
+
+class VariantBulkWriter(object):
+    """Insert bulks of variants from a background thread
+
+    Bulks are put on a bounded queue. When the queue is full the producer blocks until the
+    writer has caught up, so parsing can never run far ahead of the database.
+
+    Args:
+        adapter(MongoAdapter)
+        max_bulks(int): Maximum number of bulks waiting to be written
+    """
+
+    def __init__(self, adapter, max_bulks=4):
+        self.adapter = adapter
+        self.bulk_queue = queue.Queue(maxsize=max_bulks)
+        self.nr_bulks = 0
+        self.write_time = 0.0
+        self.error = None
+        self.thread = threading.Thread(target=self._write, name="variant-bulk-writer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _write(self):
+        """Insert bulks from the queue until the stop signal (None) is received"""
+        while True:
+            bulk = self.bulk_queue.get()
+            if bulk is None:
+                return
+            # After an error the rest of the queue is drained so the producer is not blocked
+            if self.error:
+                continue
+            start = time.perf_counter()
+            try:
+                self.adapter.load_variant_bulk(bulk)
+                self.nr_bulks += 1
+            except IntegrityError:
+                pass
+            except Exception as error:
+                self.error = error
+            self.write_time += time.perf_counter() - start
+
+    def put(self, bulk):
+        """Add a bulk of variant objects to the write queue, blocks if the queue is full
+
+        Args:
+            bulk(list(dict))
+        """
+        if self.error:
+            raise self.error
+        self.bulk_queue.put(bulk)
+
+    def close(self, raise_error=True):
+        """Wait for all queued bulks to be written
+
+        Args:
+            raise_error(bool): Raise the first error that occured in the writer thread, if any
+        """
+        self.bulk_queue.put(None)
+        self.thread.join()
+        if self.error and raise_error:
+            raise self.error
 
-class VariantLoader(object):
 
+class VariantLoader(object):
     """Methods to handle variant loading in the mongo adapter"""
 
     def update_variant(self, variant_obj):
@@ -54,30 +302,74 @@ class VariantLoader(object):
         )
         return new_variant
 
+    def supports_window_fields(self):
+        """Return True if the database server supports $setWindowFields, MongoDB 5.0 or later
+
+        The server version is only checked once.
+        """
+        supported = getattr(self, "_supports_window_fields", None)
+        if supported is None:
+            supported = self._supports_window_fields = self.server_version()[:2] >= [5, 0]
+        return supported
+
     def update_variant_rank(self, case_obj, variant_type="clinical", category="snv"):
         """Updates the manual rank for all variants in a case
 
         Add a variant rank based on the rank score
         Whenever variants are added or removed from a case we need to update the variant rank
 
+        With MongoDB 5.0 or later the ranks are set by the server with one aggregation.
+        Otherwise only the variants with a changed rank are updated, in bulks.
+
         Args:
             case_obj(Case)
             variant_type(str)
+            category(str)
         """
-        # Get all variants sorted by rank score
-        variants = self.variant_collection.find(
-            {
-                "case_id": case_obj["_id"],
-                "category": category,
-                "variant_type": variant_type,
-            }
-        ).sort("rank_score", pymongo.DESCENDING)
-
+        query = {
+            "case_id": case_obj["_id"],
+            "category": category,
+            "variant_type": variant_type,
+        }
         LOG.info("Updating variant_rank for all variants")
 
+        if self.supports_window_fields():
+            # The ranks are computed and written by the server in one pass
+            self.variant_collection.aggregate(
+                [
+                    {"$match": query},
+                    {
+                        "$setWindowFields": {
+                            "sortBy": {"rank_score": pymongo.DESCENDING},
+                            "output": {"variant_rank": {"$documentNumber": {}}},
+                        }
+                    },
+                    {"$project": {"variant_rank": 1}},
+                    {
+                        "$merge": {
+                            "into": self.variant_collection.name,
+                            "on": "_id",
+                            "whenMatched": "merge",
+                            "whenNotMatched": "discard",
+                        }
+                    },
+                ],
+                allowDiskUse=True,
+            )
+            LOG.info("Updating variant_rank done")
+            return
+
+        # Get the ids and ranks of all variants sorted by rank score
+        variants = self.variant_collection.find(query, {"rank_score": 1, "variant_rank": 1}).sort(
+            "rank_score", pymongo.DESCENDING
+        )
+
         requests = []
 
         for index, var_obj in enumerate(variants):
+            # Variants that already have the correct rank are not updated
+            if var_obj.get("variant_rank") == index + 1:
+                continue
 
             operation = pymongo.UpdateOne(
                 {"_id": var_obj["_id"]}, {"$set": {"variant_rank": index + 1}}
@@ -210,10 +502,9 @@ class VariantLoader(object):
                 categories.add(FILE_TYPE_MAP[file_type]["category"])
                 variant_types.add(FILE_TYPE_MAP[file_type]["variant_type"])
 
-        coding_intervals = self.get_coding_intervals(build=build)
+        coding_intervals = self.gene_snapshot(build=build)["coding_intervals"]
         # Loop over all intervals
         for chrom in CHROMOSOMES:
-            intervals = coding_intervals.get(chrom, IntervalTree())
             for var_type in variant_types:
                 for category in categories:
                     LOG.info(
@@ -247,17 +538,9 @@ class VariantLoader(object):
                         var_end = var_obj["end"] + 1
 
                         update_bulk = True
-                        new_region = None
-
-                        # Check if the variant is in a coding region
-                        genomic_regions = coding_intervals.get(var_chrom, IntervalTree()).overlap(
-                            var_start, var_end
-                        )
 
-                        # If the variant is in a coding region
-                        if genomic_regions:
-                            # We know there is data here so get the interval id
-                            new_region = genomic_regions.pop().data
+                        # Check if the variant is in a coding region, get the interval id if so
+                        new_region = coding_intervals.find(var_chrom, var_start, var_end)
 
                         if new_region and (new_region == current_region):
                             # If the variant is in the same region as previous
@@ -285,6 +568,81 @@ class VariantLoader(object):
         LOG.info("All compounds updated")
         return
 
+    def update_region_compounds(
+        self, case_obj, chrom, start, end, build="37", variant_type=None, category=None
+    ):
+        """Update the compounds of the variants in the coding intervals that overlap a region
+
+        Only the variants of the overlapping coding intervals are fetched, with the fields needed
+        to update compounds, and all updates are written with one bulk operation.
+
+        Args:
+            case_obj(dict)
+            chrom(str)
+            start(int)
+            end(int)
+            build(str)
+            variant_type(str): 'clinical' or 'research', defaults to the types of the case
+            category(str): 'snv', 'sv', 'str', 'cancer' or 'cancer_sv', defaults to the
+                           categories of the case
+
+        Returns:
+            nr_updated(int): the number of variants with updated compounds
+        """
+        coding_intervals = self.gene_snapshot(build=build)["coding_intervals"]
+        intervals = coding_intervals.overlapping(chrom, start, end)
+        if not intervals:
+            LOG.info("No coding intervals overlap %s:%s-%s", chrom, start, end)
+            return 0
+        interval_ids = set(interval[2] for interval in intervals)
+        # The variants that overlap the first and the last interval
+        region_start = intervals[0][0]
+        region_end = intervals[-1][1]
+
+        variant_types = set([variant_type]) if variant_type else set()
+        categories = set([category]) if category else set()
+        for file_type in FILE_TYPE_MAP:
+            if case_obj.get("vcf_files", {}).get(file_type):
+                if not category:
+                    categories.add(FILE_TYPE_MAP[file_type]["category"])
+                if not variant_type:
+                    variant_types.add(FILE_TYPE_MAP[file_type]["variant_type"])
+
+        bulk = {}
+        for var_type in variant_types:
+            for var_category in categories:
+                query = {
+                    "case_id": case_obj["_id"],
+                    "category": var_category,
+                    "variant_type": var_type,
+                    "chromosome": chrom,
+                    "position": {"$lt": region_end},
+                    "end": {"$gte": region_start},
+                }
+                # Group the variants by coding interval, in the same way as when loading
+                interval_variants = {}
+                for var_obj in self.variant_collection.find(query, COMPOUND_PROJECTION):
+                    interval_id = coding_intervals.find(
+                        chrom, var_obj["position"], var_obj["end"] + 1
+                    )
+                    if interval_id in interval_ids:
+                        interval_variants.setdefault(interval_id, {})[var_obj["_id"]] = var_obj
+
+                for variants in interval_variants.values():
+                    bulk.update(self.update_compounds(variants))
+
+        self.update_mongo_compound_variants(bulk)
+        nr_updated = sum(1 for var_obj in bulk.values() if var_obj.get("compounds"))
+        LOG.info(
+            "Updated compounds of %s variants in %s coding intervals overlapping %s:%s-%s",
+            nr_updated,
+            len(intervals),
+            chrom,
+            start,
+            end,
+        )
+        return nr_updated
+
     def load_variant(self, variant_obj):
         """Load a variant object
 
@@ -348,6 +706,55 @@ class VariantLoader(object):
 
         return
 
+    def _variant_objs(self, variants, parse_context, parse_stats, regions=None, workers=1):
+        """Yield the variant objects that should be loaded
+
+        If regions are given and more than one worker is used the regions are parsed and built
+        in a process pool. The variant objects are yielded in the same order as the regions so
+        the result is the same as when parsing the vcf serially. Only a few regions per worker
+        are parsed ahead of the region that is being yielded.
+
+        Args:
+            variants(iterable(cyvcf2.Variant))
+            parse_context(dict): See build_variant_obj
+            parse_stats(dict): Keeps track of the number of parsed variants and time spent
+            regions(list(tuple)): Regions of the vcf file, as returned by parse_regions
+            workers(int): Number of processes to use
+
+        Yields:
+            variant_obj(dict)
+        """
+        if not (regions and workers > 1):
+            for variant in variants:
+                parse_stats["parsed"] += 1
+                variant_obj = build_variant_obj(variant, parse_context, parse_stats)
+                if variant_obj:
+                    yield variant_obj
+            return
+
+        LOG.info("Parsing %s regions with %s workers", len(regions), workers)
+        # The workers are spawned, not forked, since the loading process has a database client
+        # and a writer thread that are not safe to fork
+        spawn_context = multiprocessing.get_context("spawn")
+        with spawn_context.Pool(
+            processes=workers, initializer=_init_parse_worker, initargs=(parse_context,)
+        ) as pool:
+            pending = collections.deque()
+            regions = iter(regions)
+            while True:
+                while len(pending) < workers * PARSE_REGIONS_AHEAD:
+                    region = next(regions, None)
+                    if region is None:
+                        break
+                    pending.append(pool.apply_async(_parse_region, (region,)))
+                if not pending:
+                    break
+                region_stats, variant_objs = pending.popleft().get()
+                for key in parse_stats:
+                    parse_stats[key] += region_stats[key]
+                for variant_obj in variant_objs:
+                    yield variant_obj
+
     def _load_variants(
         self,
         variants,
@@ -361,12 +768,19 @@ class VariantLoader(object):
         vep_header=None,
         category="snv",
         sample_info=None,
+        variant_file=None,
+        regions=None,
+        workers=1,
     ):
         """Perform the loading of variants
 
         This is the function that loops over the variants, parse them and build the variant
         objects so they are ready to be inserted into the database.
 
+        If a variant file, regions and more than one worker is given the regions are parsed
+        in parallel, the variants are then grouped and inserted in the same way as when loading
+        serially.
+
         Args:
             variants(iterable(cyvcf2.Variant))
             variant_type(str): ['clinical', 'research']
@@ -380,63 +794,57 @@ class VariantLoader(object):
             category(str): ['snv','sv','cancer','str']
             sample_info(dict): A dictionary with info about samples.
                                Strictly for cancer to tell which is tumor
+            variant_file(str): Path to an indexed vcf, needed for parallel parsing
+            regions(list(tuple)): Regions of the vcf to parse in parallel, see parse_regions
+            workers(int): Number of processes to parse variants with
 
         Returns:
             nr_inserted(int)
         """
         build = build or "37"
-        genes = [gene_obj for gene_obj in self.all_genes(build=build)]
+        gene_snapshot = self.gene_snapshot(build=build)
         gene_to_panels = self.gene_to_panels(case_obj)
-        hgncid_to_gene = self.hgncid_to_gene(genes=genes, build=build)
-        genomic_intervals = self.get_coding_intervals(genes=genes)
+        hgncid_to_gene = gene_snapshot["hgncid_to_gene"]
+        genomic_intervals = gene_snapshot["coding_intervals"]
+
+        parse_context = {
+            "variant_file": variant_file,
+            "variant_type": variant_type,
+            "case_obj": case_obj,
+            "individual_positions": individual_positions,
+            "rank_threshold": rank_threshold,
+            "institute_id": institute_id,
+            "rank_results_header": rank_results_header,
+            "vep_header": vep_header,
+            "category": category,
+            "sample_info": sample_info,
+            "gene_to_panels": gene_to_panels,
+            "hgncid_to_gene": hgncid_to_gene,
+        }
+        if not variant_file:
+            regions = None
+        parse_stats = parse_stats_template()
 
         LOG.info("Start inserting {0} {1} variants into database".format(variant_type, category))
         start_insertion = datetime.now()
         start_five_thousand = datetime.now()
-        # These are the number of parsed varaints
-        nr_variants = 0
         # These are the number of variants that meet the criteria and gets inserted
         nr_inserted = 0
         # This is to keep track of blocks of inserted variants
         inserted = 1
 
-        nr_bulks = 0
-
         # We want to load batches of variants to reduce the number of network round trips
+        # The bulks are written in a background thread while parsing continues
         bulk = {}
         current_region = None
+        bulk_writer = VariantBulkWriter(self)
 
-        for nr_variants, variant in enumerate(variants):
-            # All MT variants are loaded
-            mt_variant = "MT" in variant.CHROM
-            rank_score = parse_rank_score(variant.INFO.get("RankScore"), case_obj["_id"])
-            pathogenic = is_pathogenic(variant)
-
-            # Check if the variant should be loaded at all
-            # if rank score is None means there are no rank scores annotated, all variants will be loaded
-            # Otherwise we load all variants above a rank score treshold
-            # Except for MT variants where we load all variants
-            if (rank_score is None) or (rank_score > rank_threshold) or mt_variant or pathogenic:
+        variant_objs = self._variant_objs(
+            variants, parse_context, parse_stats, regions=regions, workers=workers
+        )
+        try:
+            for variant_obj in variant_objs:
                 nr_inserted += 1
-                # Parse the vcf variant
-                parsed_variant = parse_variant(
-                    variant=variant,
-                    case=case_obj,
-                    variant_type=variant_type,
-                    rank_results_header=rank_results_header,
-                    vep_header=vep_header,
-                    individual_positions=individual_positions,
-                    category=category,
-                )
-
-                # Build the variant object
-                variant_obj = build_variant(
-                    variant=parsed_variant,
-                    institute_id=institute_id,
-                    gene_to_panels=gene_to_panels,
-                    hgncid_to_gene=hgncid_to_gene,
-                    sample_info=sample_info,
-                )
 
                 # Check if the variant is in a genomic region
                 var_chrom = variant_obj["chromosome"]
@@ -446,15 +854,12 @@ class VariantLoader(object):
                 var_id = variant_obj["_id"]
                 # If the bulk should be loaded or not
                 load = True
-                new_region = None
 
-                intervals = genomic_intervals.get(var_chrom, IntervalTree())
-                genomic_regions = intervals.overlap(var_start, var_end)
+                # Get the interval id if the variant is in a coding region
+                new_region = genomic_intervals.find(var_chrom, var_start, var_end)
 
                 # If the variant is in a coding region
-                if genomic_regions:
-                    # We know there is data here so get the interval id
-                    new_region = genomic_regions.pop().data
+                if new_region:
                     # If the variant is in the same region as previous
                     # we add it to the same bulk
                     if new_region == current_region:
@@ -469,23 +874,19 @@ class VariantLoader(object):
                     if len(bulk) > 10000:
                         load = True
                 # Load the variant object
-                if load:
+                if load and bulk:
                     # If the variant bulk contains coding variants we want to update the compounds
                     if current_region:
                         self.update_compounds(bulk)
-                    try:
-                        # Load the variants
-                        self.load_variant_bulk(list(bulk.values()))
-                        nr_bulks += 1
-                    except IntegrityError as error:
-                        pass
+                    # Hand the variants over to the writer
+                    bulk_writer.put(list(bulk.values()))
                     bulk = {}
 
                 current_region = new_region
                 bulk[var_id] = variant_obj
 
-                if nr_variants != 0 and nr_variants % 5000 == 0:
-                    LOG.info("%s variants parsed", str(nr_variants))
+                if nr_inserted % 5000 == 0:
+                    LOG.info("%s variants parsed", parse_stats["parsed"])
                     LOG.info(
                         "Time to parse variants: %s",
                         (datetime.now() - start_five_thousand),
@@ -495,24 +896,33 @@ class VariantLoader(object):
                 if nr_inserted != 0 and (nr_inserted * inserted) % (1000 * inserted) == 0:
                     LOG.info("%s variants inserted", nr_inserted)
                     inserted += 1
-        # If the variants are in a coding region we update the compounds
-        if current_region:
-            self.update_compounds(bulk)
+            # If the variants are in a coding region we update the compounds
+            if current_region:
+                self.update_compounds(bulk)
+
+            # Load the final variant bulk
+            if bulk:
+                bulk_writer.put(list(bulk.values()))
+        except Exception:
+            bulk_writer.close(raise_error=False)
+            raise
+        bulk_writer.close()
 
-        # Load the final variant bulk
-        self.load_variant_bulk(list(bulk.values()))
-        nr_bulks += 1
         LOG.info(
             "All variants inserted, time to insert variants: {0}".format(
                 datetime.now() - start_insertion
             )
         )
 
-        if nr_variants:
-            nr_variants += 1
-        LOG.info("Nr variants parsed: %s", nr_variants)
+        LOG.info("Nr variants parsed: %s", parse_stats["parsed"])
         LOG.info("Nr variants inserted: %s", nr_inserted)
-        LOG.debug("Nr bulks inserted: %s", nr_bulks)
+        LOG.debug("Nr bulks inserted: %s", bulk_writer.nr_bulks)
+        LOG.info(
+            "Time spent parsing: %.1fs, building: %.1fs, writing: %.1fs",
+            parse_stats["parse_time"],
+            parse_stats["build_time"],
+            bulk_writer.write_time,
+        )
 
         return nr_inserted
 
@@ -527,6 +937,7 @@ class VariantLoader(object):
         end=None,
         gene_obj=None,
         build="37",
+        workers=1,
     ):
         """Load variants for a case into scout.
 
@@ -544,6 +955,8 @@ class VariantLoader(object):
             start(int): Specify the start position
             end(int): Specify the end position
             gene_obj(dict): A gene object from the database
+            workers(int): Number of processes used to parse variants. Parallel parsing is
+                          done per chromosome and requires an indexed vcf file
 
         Returns:
             nr_inserted(int)
@@ -628,6 +1041,17 @@ class VariantLoader(object):
 
         variants = vcf_obj(region)
 
+        # Whole files with an index can be split by chromosome and parsed in parallel
+        regions = None
+        if workers > 1 and not region:
+            variant_file = str(variant_file)
+            if os.path.exists(variant_file + ".tbi") or os.path.exists(variant_file + ".csi"):
+                regions = parse_regions(vcf_obj, contigs=indexed_contigs(variant_file))
+            else:
+                LOG.warning(
+                    "Variant file %s is not indexed, parsing with one process", variant_file
+                )
+
         try:
             nr_inserted = self._load_variants(
                 variants=variants,
@@ -641,6 +1065,9 @@ class VariantLoader(object):
                 vep_header=vep_header,
                 category=category,
                 sample_info=sample_info,
+                variant_file=variant_file,
+                regions=regions,
+                workers=workers,
             )
         except Exception as error:
             LOG.exception("unexpected error")
@@ -650,4 +1077,16 @@ class VariantLoader(object):
 
         self.update_variant_rank(case_obj, variant_type, category=category)
 
+        # Variants of the region might be compounds of variants that were already loaded
+        if region:
+            self.update_region_compounds(
+                case_obj,
+                chrom,
+                start,
+                end,
+                build=build,
+                variant_type=variant_type,
+                category=category,
+            )
+
         return nr_inserted
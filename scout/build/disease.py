@@ -54,10 +54,11 @@ def build_disease_term(disease_info, alias_genes={}):
         source="OMIM",
     )
 
+    # The lists are sorted so that terms built from the same information are equal
     # Check if there where any inheritance information
     inheritance_models = disease_info.get("inheritance")
     if inheritance_models:
-        disease_obj["inheritance"] = list(inheritance_models)
+        disease_obj["inheritance"] = sorted(inheritance_models)
 
     hgnc_ids = set()
     for hgnc_symbol in disease_info.get("hgnc_symbols", []):
@@ -72,9 +73,9 @@ def build_disease_term(disease_info, alias_genes={}):
         else:
             LOG.debug("Gene symbol %s could not be found in database", hgnc_symbol)
 
-    disease_obj["genes"] = list(hgnc_ids)
+    disease_obj["genes"] = sorted(hgnc_ids)
 
     if "hpo_terms" in disease_info:
-        disease_obj["hpo_terms"] = list(disease_info["hpo_terms"])
+        disease_obj["hpo_terms"] = sorted(disease_info["hpo_terms"])
 
     return disease_obj
@@ -53,6 +53,13 @@ LOG = logging.getLogger(__name__)
 @click.option("--peddy-ped", type=click.Path(exists=True), help="path to a peddy.ped file")
 @click.option("--peddy-sex", type=click.Path(exists=True), help="path to a sex_check.csv file")
 @click.option("--peddy-check", type=click.Path(exists=True), help="path to a ped_check.csv file")
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes used to parse variants",
+)
 @with_appcontext
 def case(
     vcf,
@@ -69,6 +76,7 @@ def case(
     peddy_sex,
     peddy_check,
     keep_actions,
+    workers,
 ):
     """Load a case into the database.
 
@@ -109,7 +117,7 @@ def case(
     LOG.info("Use family %s" % config_data["family"])
 
     try:
-        case_obj = adapter.load_case(config_data, update, keep_actions)
+        case_obj = adapter.load_case(config_data, update, keep_actions, workers=workers)
     except Exception as err:
         LOG.error("Something went wrong during loading")
         LOG.warning(err)
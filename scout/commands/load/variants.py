@@ -41,6 +41,13 @@ LOG = logging.getLogger(__name__)
     default=True,
     help="Export user actions from old variants to the new",
 )
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes used to parse variants",
+)
 @with_appcontext
 def variants(
     case_id,
@@ -62,6 +69,7 @@ def variants(
     rank_treshold,
     force,
     keep_actions,
+    workers,
 ):
     """Upload variants to a case
 
@@ -151,6 +159,7 @@ def variants(
                 end=end,
                 gene_obj=gene_obj,
                 build=case_obj["genome_build"],
+                workers=workers,
             )
 
         except Exception as e:
@@ -30,6 +30,13 @@ def abort_if_false(ctx, param, value):
         ctx.abort()
 
 
+def echo_timings(timings):
+    """Print the time of each setup phase"""
+    click.echo("phase\tseconds")
+    for phase, seconds in timings.items():
+        click.echo("{0}\t{1:.2f}".format(phase, seconds))
+
+
 @click.command("database", short_help="Setup a basic scout instance")
 @click.option("-i", "--institute-name", type=str)
 @click.option("-u", "--user-name", type=str)
@@ -167,14 +174,16 @@ def database(
             if path.stem == "phenotype_to_genes":
                 resource_files["hpo_to_genes_path"] = str(path.resolve())
 
-    setup_scout(
+    timings = setup_scout(
         adapter=adapter,
         institute_id=institute_name,
         user_name=user_name,
         user_mail=user_mail,
         api_key=api_key,
         resource_files=resource_files,
+        processes=context.obj["processes"],
     )
+    echo_timings(timings)
 
 
 @click.command("demo", short_help="Setup a scout demo instance")
@@ -189,13 +198,15 @@ def demo(context):
     user_mail = context.obj["user_mail"]
 
     adapter = context.obj["adapter"]
-    setup_scout(
+    timings = setup_scout(
         adapter=adapter,
         institute_id=institute_name,
         user_name=user_name,
         user_mail=user_mail,
         demo=True,
+        processes=context.obj["processes"],
     )
+    echo_timings(timings)
 
 
 @click.group()
@@ -220,9 +231,15 @@ def demo(context):
     show_default=True,
     help="Name of initial user",
 )
+@click.option(
+    "-p",
+    "--processes",
+    type=click.IntRange(min=1),
+    help="Number of processes that parse the resources. Defaults to the number of cpus",
+)
 @with_appcontext
 @click.pass_context
-def setup(context, institute, user_mail, user_name):
+def setup(context, institute, user_mail, user_name, processes):
     """
     Setup scout instances: a demo database or a production database, according to the
     according to the subcommand specified by user.
@@ -231,6 +248,7 @@ def setup(context, institute, user_mail, user_name):
         "institute_name": institute,
         "user_name": user_name,
         "user_mail": user_mail,
+        "processes": processes,
     }
 
     mongodb_name = current_app.config["MONGO_DBNAME"]
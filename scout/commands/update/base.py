@@ -15,6 +15,7 @@ from .institute import institute as institute_command
 from .omim import omim as omim_command
 from .panel import panel as panel_command
 from .phenotype_groups import groups as groups_command
+from .transcripts import embed_transcripts as embed_transcripts_command
 from .user import user as user_command
 
 LOG = logging.getLogger(__name__)
@@ -40,3 +41,4 @@ update.add_command(gene_command)
 update.add_command(disease_command)
 update.add_command(groups_command)
 update.add_command(individual_command)
+update.add_command(embed_transcripts_command)
@@ -1,4 +1,5 @@
 import logging
+import re
 
 from pprint import pprint as pp
 from flask.cli import with_appcontext
@@ -8,11 +9,28 @@ from scout.server.extensions import store
 
 LOG = logging.getLogger(__name__)
 
+REGION_PATTERN = re.compile(r"^(?:chr)?([0-9XYMT]+):([0-9]+)-([0-9]+)$")
+
+
+def parse_region(context, param, value):
+    """Parse a region like 1:1000-2000 into a tuple (<chrom>, <start>, <end>)"""
+    if not value:
+        return None
+    match = REGION_PATTERN.match(value.replace(",", ""))
+    if not match:
+        raise click.BadParameter("Region should be formatted like 1:1000-2000")
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
 
 @click.command("compounds", short_help="Update compounds for a case")
 @click.argument("case_id")
+@click.option(
+    "--region",
+    callback=parse_region,
+    help="Only update the compounds of the coding regions that overlap a region, like 1:1000-2000",
+)
 @with_appcontext
-def compounds(case_id):
+def compounds(case_id, region):
     """
     Update all compounds for a case
     """
@@ -26,7 +44,13 @@ def compounds(case_id):
         raise click.Abort()
 
     try:
-        adapter.update_case_compounds(case_obj)
+        if region:
+            chrom, start, end = region
+            adapter.update_region_compounds(
+                case_obj, chrom, start, end, build=str(case_obj.get("genome_build", "37"))
+            )
+        else:
+            adapter.update_case_compounds(case_obj)
     except Exception as err:
         LOG.warning(err)
         raise click.Abort()
@@ -25,8 +25,13 @@ LOG = logging.getLogger(__name__)
 @click.command("diseases", short_help="Update disease terms")
 @click.option("--api-key", help="Specify the api key")
 @click.option("--genemap2", type=click.Path(exists=True), help="Path to genemap2 file")
+@click.option(
+    "--diff",
+    is_flag=True,
+    help="Only write new and changed disease terms instead of reloading all terms",
+)
 @with_appcontext
-def diseases(api_key, genemap2):
+def diseases(api_key, genemap2, diff):
     """
     Update disease terms in mongo database.
 
@@ -51,9 +56,10 @@ def diseases(api_key, genemap2):
             LOG.warning(err)
             raise click.Abort()
 
-    LOG.info("Dropping DiseaseTerms")
-    adapter.disease_term_collection.drop()
-    LOG.debug("DiseaseTerms dropped")
-    load_disease_terms(adapter=adapter, genemap_lines=genemap_lines)
+    if not diff:
+        LOG.info("Dropping DiseaseTerms")
+        adapter.disease_term_collection.drop()
+        LOG.debug("DiseaseTerms dropped")
+    load_disease_terms(adapter=adapter, genemap_lines=genemap_lines, diff=diff)
 
     LOG.info("Successfully loaded all disease terms")
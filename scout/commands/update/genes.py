@@ -17,6 +17,7 @@ Copyright (c) 2015 __MoonsoInc__. All rights reserved.
 
 """
 import logging
+import time
 
 import click
 from flask.cli import with_appcontext, current_app
@@ -45,14 +46,30 @@ LOG = logging.getLogger(__name__)
     help="What genome build should be used. If no choice update 37 and 38.",
 )
 @click.option("--api-key", help="Specify the api key")
+@click.option(
+    "--rollback",
+    is_flag=True,
+    help=(
+        "Swap back the genes and transcripts from before the last update, or from before an "
+        "update that was interrupted while swapping in the new genes"
+    ),
+)
 @with_appcontext
-def genes(build, api_key):
+def genes(build, api_key, rollback):
     """
     Load the hgnc aliases to the mongo database.
+
+    The genes and transcripts are loaded into shadow collections that replace the current
+    collections when all genes are loaded, so the current genes can be used during the update.
     """
     LOG.info("Running scout update genes")
     adapter = store
 
+    if rollback:
+        if not adapter.rollback_gene_reload():
+            raise click.Abort()
+        return
+
     # Fetch the omim information
     api_key = api_key or current_app.config.get("OMIM_API_KEY")
     mim_files = {}
@@ -66,48 +83,100 @@ def genes(build, api_key):
             LOG.warning(err)
             raise click.Abort()
 
-    LOG.warning("Dropping all gene information")
-    adapter.drop_genes(build)
-    LOG.info("Genes dropped")
-    LOG.warning("Dropping all transcript information")
-    adapter.drop_transcripts(build)
-    LOG.info("transcripts dropped")
-
-    hpo_genes = fetch_genes_to_hpo_to_disease()
-
     if build:
         builds = [build]
     else:
         builds = ["37", "38"]
+    # Builds with transcripts embedded in the genes get them embedded again after the update
+    embedded_builds = [
+        genome_build for genome_build in builds if adapter.transcripts_embedded(genome_build)
+    ]
+
+    hpo_genes = fetch_genes_to_hpo_to_disease()
 
     hgnc_lines = fetch_hgnc()
     exac_lines = fetch_exac_constraint()
 
-    for build in builds:
-        ensembl_genes = fetch_ensembl_genes(build=build)
+    LOG.info("Loading genes and transcripts into shadow collections")
+    adapter.prepare_gene_reload(build)
+    try:
+        for genome_build in builds:
+            load_build(
+                adapter,
+                genome_build,
+                hgnc_lines=hgnc_lines,
+                exac_lines=exac_lines,
+                mim_files=mim_files,
+                hpo_genes=hpo_genes,
+                embed_transcripts=genome_build in embedded_builds,
+            )
+        adapter.swap_gene_reload()
+    except Exception as err:
+        LOG.warning("Updating genes failed, keeping the current genes: %s", err)
+        adapter.discard_gene_reload()
+        raise click.Abort()
 
-        # load the genes
-        hgnc_genes = load_hgnc_genes(
-            adapter=adapter,
-            ensembl_lines=ensembl_genes,
-            hgnc_lines=hgnc_lines,
-            exac_lines=exac_lines,
-            mim2gene_lines=mim_files.get("mim2genes"),
-            genemap_lines=mim_files.get("genemap2"),
-            hpo_lines=hpo_genes,
-            build=build,
-        )
-
-        ensembl_genes = {}
-        for gene_obj in hgnc_genes:
-            ensembl_id = gene_obj["ensembl_id"]
-            ensembl_genes[ensembl_id] = gene_obj
+    adapter.update_indexes()
+    adapter.clear_gene_snapshots(build)
 
-        # Fetch the transcripts from ensembl
-        ensembl_transcripts = fetch_ensembl_transcripts(build=build)
+    LOG.info("Genes, transcripts and Exons loaded")
 
-        transcripts = load_transcripts(adapter, ensembl_transcripts, build, ensembl_genes)
 
-    adapter.update_indexes()
+def load_build(
+    adapter, build, hgnc_lines, exac_lines, mim_files, hpo_genes, embed_transcripts=False
+):
+    """Load the genes and transcripts of a build and log the load throughput
 
-    LOG.info("Genes, transcripts and Exons loaded")
+    Args:
+        adapter(scout.adapter.MongoAdapter)
+        build(str)
+        hgnc_lines(list(str))
+        exac_lines(list(str))
+        mim_files(dict)
+        hpo_genes(list(str))
+        embed_transcripts(bool): Embed the transcripts in the genes when loaded
+    """
+    ensembl_genes = fetch_ensembl_genes(build=build)
+
+    # load the genes
+    start = time.time()
+    hgnc_genes = load_hgnc_genes(
+        adapter=adapter,
+        ensembl_lines=ensembl_genes,
+        hgnc_lines=hgnc_lines,
+        exac_lines=exac_lines,
+        mim2gene_lines=mim_files.get("mim2genes"),
+        genemap_lines=mim_files.get("genemap2"),
+        hpo_lines=hpo_genes,
+        build=build,
+    )
+    log_throughput("genes", len(hgnc_genes), build, start)
+
+    ensembl_genes = {}
+    for gene_obj in hgnc_genes:
+        ensembl_id = gene_obj["ensembl_id"]
+        ensembl_genes[ensembl_id] = gene_obj
+
+    # Fetch the transcripts from ensembl
+    ensembl_transcripts = fetch_ensembl_transcripts(build=build)
+
+    start = time.time()
+    transcripts = load_transcripts(adapter, ensembl_transcripts, build, ensembl_genes)
+    log_throughput("transcripts", len(transcripts), build, start)
+
+    if embed_transcripts:
+        adapter.embed_transcripts(build=build)
+
+
+def log_throughput(name, nr_loaded, build, start):
+    """Log the number of loaded objects per second since start"""
+    seconds = max(time.time() - start, 0.001)
+    LOG.info(
+        "Loaded %s %s for build %s in %.1f s (%.0f %s/s)",
+        nr_loaded,
+        name,
+        build,
+        seconds,
+        nr_loaded / seconds,
+        name,
+    )
@@ -0,0 +1,34 @@
+import logging
+
+import click
+from flask.cli import with_appcontext
+
+from scout.server.extensions import store
+
+LOG = logging.getLogger(__name__)
+
+
+@click.command("embed-transcripts", short_help="Embed transcripts in the gene documents")
+@click.option(
+    "--build",
+    type=click.Choice(["37", "38"]),
+    help="What genome build should be used. If no choice update 37 and 38.",
+)
+@click.option("--exons", is_flag=True, help="Embed the exons of the transcripts as well")
+@click.option("--remove", is_flag=True, help="Remove the embedded transcripts from the genes")
+@with_appcontext
+def embed_transcripts(build, exons, remove):
+    """
+    Store the transcripts of each gene in the gene document, so that a gene with its transcripts
+    is fetched with one query. Run again after the genes are updated.
+    """
+    LOG.info("Running scout update embed-transcripts")
+    adapter = store
+
+    builds = [build] if build else ["37", "38"]
+    for build in builds:
+        if remove:
+            nr_updated = adapter.remove_embedded_transcripts(build=build)
+        else:
+            nr_updated = adapter.embed_transcripts(build=build, add_exons=exons)
+        LOG.info("Updated %s genes in build %s", nr_updated, build)
@@ -28,11 +28,11 @@ def intervals(build):
     nr_intervals = 0
     longest = 0
     for chrom in CHROMOSOMES:
-        for iv in intervals[chrom]:
-            iv_len = iv.end - iv.begin
+        for start, end, _ in intervals.intervals(chrom):
+            iv_len = end - start
             if iv_len > longest:
                 longest = iv_len
-        int_nr = len(intervals.get(chrom, []))
+        int_nr = intervals.nr_intervals(chrom)
         click.echo("{0}\t{1}".format(chrom, int_nr))
         nr_intervals += int_nr
 
@@ -89,13 +89,15 @@ INDEXES = {
     "event": [
         IndexModel([("category", ASCENDING), ("verb", ASCENDING)], name="category_verb"),
         IndexModel([("variant_id", ASCENDING)], name="variant_id"),
+        IndexModel([("created_at", DESCENDING)], name="createdat"),
     ],
     "transcript": [
         IndexModel(
             [("build", ASCENDING), ("hgnc_id", ASCENDING), ("length", DESCENDING)],
             name="hgncid_length",
             background=True,
-        )
+        ),
+        IndexModel([("hgnc_id", ASCENDING)], name="hgncid", background=True),
     ],
     "exon": [
         IndexModel(
@@ -9,6 +9,22 @@ EXPORT_HEADER = [
     "Canonical_transcript_HGVS",
 ]
 
+# Variant fields needed to build the lines of EXPORT_HEADER
+EXPORT_PROJECTION = {
+    "rank_score": 1,
+    "chromosome": 1,
+    "position": 1,
+    "reference": 1,
+    "alternative": 1,
+    "genes.hgnc_id": 1,
+    "genes.hgnc_symbol": 1,
+    "genes.transcripts.is_canonical": 1,
+    "genes.transcripts.coding_sequence_name": 1,
+    "samples.sample_id": 1,
+    "samples.allele_depths": 1,
+    "samples.genotype_quality": 1,
+}
+
 MT_EXPORT_HEADER = [
     "Position",
     "Change",
@@ -9,3 +9,57 @@ def export_genes(adapter, build="37"):
 
     for gene_obj in adapter.all_genes(build=build):
         yield gene_obj
+
+
+class GeneSymbolResolver(object):
+    """Resolve the hgnc symbols of the genes in exported variants
+
+    The symbols are fetched with one projected query for all genes of the exported variants and
+    kept for the lifetime of the resolver, e.g. one export request.
+    """
+
+    def __init__(self, adapter, build="37"):
+        self.adapter = adapter
+        self.build = str(build)
+        self.symbols = {}
+        self.fetched_ids = set()
+        self.fetched_all = False
+
+    def prefetch(self, variants, missing_only=False):
+        """Fetch the symbols of all genes in a number of variants that are not fetched already
+
+        Args:
+            variants(iterable(dict)): variant objects
+            missing_only(bool): only fetch genes without a symbol stored on the variant
+        """
+        if self.fetched_all:
+            return
+        hgnc_ids = {
+            gene_obj["hgnc_id"]
+            for variant in variants
+            for gene_obj in variant.get("genes") or []
+            if gene_obj.get("hgnc_id") and not (missing_only and gene_obj.get("hgnc_symbol"))
+        }
+        hgnc_ids.difference_update(self.fetched_ids)
+        if not hgnc_ids:
+            return
+        self.symbols.update(self.adapter.hgncid_to_symbol(build=self.build, hgnc_ids=hgnc_ids))
+        self.fetched_ids.update(hgnc_ids)
+
+    def prefetch_all(self):
+        """Fetch the symbols of all genes in the build, when the exported variants are streamed"""
+        if not self.fetched_all:
+            self.symbols = self.adapter.hgncid_to_symbol(build=self.build)
+            self.fetched_all = True
+
+    def symbol(self, gene_obj, default="-"):
+        """Return the symbol of a variant gene
+
+        Args:
+            gene_obj(dict): a gene from a variant
+            default(str): returned if the gene has no symbol
+
+        Returns:
+            hgnc_symbol(str)
+        """
+        return self.symbols.get(gene_obj.get("hgnc_id")) or gene_obj.get("hgnc_symbol") or default
@@ -49,19 +49,31 @@ def export_variants(adapter, collaborator, document_id=None, case_id=None):
         yield variant_obj
 
 
-def export_verified_variants(aggregate_variants, unique_callers):
+def export_verified_variants(aggregate_variants, unique_callers, gene_symbols=None):
     """Create the lines for an excel file with verified variants for
     an institute
 
     Args:
         aggregate_variants(list): a list of variants with aggregates case data
         unique_callers(set): a unique list of available callers
+        gene_symbols(dict): {<genome_build>: scout.export.gene.GeneSymbolResolver}, resolve
+                            symbols of genes with the genome build of the variant case
 
     Returns:
         document_lines(list): list of lines to include in the document
     """
+    variants_by_build = {}
+    for variant in aggregate_variants:
+        build = str(variant["case_obj"].get("genome_build", "37"))
+        variants_by_build.setdefault(build, []).append(variant)
+    if gene_symbols:
+        for build, build_variants in variants_by_build.items():
+            if build in gene_symbols:
+                gene_symbols[build].prefetch(build_variants, missing_only=True)
     document_lines = []
     for variant in aggregate_variants:
+        build = str(variant["case_obj"].get("genome_build", "37"))
+        build_symbols = gene_symbols.get(build) if gene_symbols else None
         # get genotype and allele depth for each sample
         samples = []
         for sample in variant["samples"]:
@@ -100,7 +112,7 @@ def export_verified_variants(aggregate_variants, unique_callers):
             prot_effect = []
             funct_anno = []
             for gene in variant.get("genes"):  # this will be a unique long field in the document
-                genes.append(gene.get("hgnc_symbol", ""))
+                genes.append(export_gene_symbol(gene, build_symbols))
                 funct_anno.append(gene.get("functional_annotation"))
                 for transcript in gene.get("transcripts"):
                     if transcript.get("is_canonical") and transcript.get("protein_sequence_name"):
@@ -127,16 +139,19 @@ def export_verified_variants(aggregate_variants, unique_callers):
     return document_lines
 
 
-def export_mt_variants(variants, sample_id):
+def export_mt_variants(variants, sample_id, gene_symbols=None):
     """Export mitochondrial variants for a case to create a MT excel report
 
     Args:
         variants(list): all MT variants for a case, sorted by position
         sample_id(str) : the id of a sample within the case
+        gene_symbols(scout.export.gene.GeneSymbolResolver): resolve symbols of genes
 
     Returns:
         document_lines(list): list of lines to include in the document
     """
+    if gene_symbols:
+        gene_symbols.prefetch(variants, missing_only=True)
     document_lines = []
     for variant in variants:
         line = []
@@ -148,7 +163,7 @@ def export_mt_variants(variants, sample_id):
         genes = []
         prot_effect = []
         for gene in variant.get("genes", []):
-            genes.append(gene.get("hgnc_symbol", ""))
+            genes.append(export_gene_symbol(gene, gene_symbols))
             for transcript in gene.get("transcripts"):
                 if transcript.get("is_canonical") and transcript.get("protein_sequence_name"):
                     prot_effect.append(
@@ -167,3 +182,20 @@ def export_mt_variants(variants, sample_id):
         if not alt_ad == 0:
             document_lines.append(line)
     return document_lines
+
+
+def export_gene_symbol(gene_obj, gene_symbols=None):
+    """Return the symbol of a variant gene for an export
+
+    Args:
+        gene_obj(dict): a gene from a variant
+        gene_symbols(scout.export.gene.GeneSymbolResolver)
+
+    Returns:
+        hgnc_symbol(str): the symbol stored on the variant gene if any, empty if unknown
+    """
+    if gene_obj.get("hgnc_symbol"):
+        return gene_obj["hgnc_symbol"]
+    if gene_symbols:
+        return gene_symbols.symbol(gene_obj, default="")
+    return ""
@@ -0,0 +1,38 @@
+"""Load documents into the database in chunks
+
+Large collections like genes and transcripts are inserted with a number of moderately sized
+insert_many calls, so that documents can be streamed to the database as they are built and the
+whole collection never has to be sent in one request.
+"""
+import logging
+
+LOG = logging.getLogger(__name__)
+
+# Number of documents to insert with one insert_many
+BULK_SIZE = 5000
+
+
+def load_bulks(load_bulk, objs, bulk_size=BULK_SIZE):
+    """Load documents in chunks
+
+    Args:
+        load_bulk(function): an adapter function that loads a list of documents,
+                             like adapter.load_hgnc_bulk
+        objs(iterable(dict)): documents, that can be yielded as they are built
+        bulk_size(int): number of documents to load at a time
+
+    Returns:
+        nr_loaded(int)
+    """
+    nr_loaded = 0
+    bulk = []
+    for obj in objs:
+        bulk.append(obj)
+        if len(bulk) >= bulk_size:
+            load_bulk(bulk)
+            nr_loaded += len(bulk)
+            bulk = []
+    if bulk:
+        load_bulk(bulk)
+        nr_loaded += len(bulk)
+    return nr_loaded
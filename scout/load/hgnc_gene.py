@@ -6,6 +6,7 @@ from pprint import pprint as pp
 from click import progressbar
 
 from scout.build import build_hgnc_gene
+from scout.load.bulk import load_bulks
 from scout.utils.link import link_genes
 
 from scout.utils.scout_requests import (
@@ -109,7 +110,6 @@ def load_hgnc_genes(
     Returns:
         gene_objects(list): A list with all gene_objects that was loaded into database
     """
-    gene_objects = list()
 
     if not genes:
         # Fetch the resources if not provided
@@ -138,26 +138,39 @@ def load_hgnc_genes(
             genemap_lines=genemap_lines,
         )
 
-    non_existing = 0
     nr_genes = len(genes)
 
     with progressbar(genes.values(), label="Building genes", length=nr_genes) as bar:
-        for gene_data in bar:
-            if not gene_data.get("chromosome"):
-                LOG.debug(
-                    "skipping gene: %s. No coordinates found",
-                    gene_data.get("hgnc_symbol", "?"),
-                )
-                non_existing += 1
-                continue
-
-            gene_obj = build_hgnc_gene(gene_data, build=build)
-            gene_objects.append(gene_obj)
+        gene_objects = list(build_hgnc_genes(bar, build=build))
+    non_existing = nr_genes - len(gene_objects)
 
     LOG.info("Loading genes build %s", build)
-    adapter.load_hgnc_bulk(gene_objects)
+    load_bulks(adapter.load_hgnc_bulk, gene_objects)
 
     LOG.info("Loading done. %s genes loaded", len(gene_objects))
     LOG.info("Nr of genes without coordinates in build %s: %s", build, non_existing)
 
     return gene_objects
+
+
+def build_hgnc_genes(genes, build="37"):
+    """Build the gene objects of linked genes
+
+    Genes without coordinates in the build are skipped.
+
+    Args:
+        genes(iterable(dict)): linked gene information, the values returned by link_genes
+        build(str)
+
+    Yields:
+        gene_obj(scout.models.hgnc_map.HgncGene)
+    """
+    for gene_data in genes:
+        if not gene_data.get("chromosome"):
+            LOG.debug(
+                "skipping gene: %s. No coordinates found",
+                gene_data.get("hgnc_symbol", "?"),
+            )
+            continue
+
+        yield build_hgnc_gene(gene_data, build=build)
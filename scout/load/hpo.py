@@ -16,6 +16,7 @@ from scout.utils.scout_requests import (
 from scout.parse.omim import get_mim_phenotypes
 from scout.build.hpo import build_hpo_term
 from scout.build.disease import build_disease_term
+from scout.load.bulk import load_bulks
 
 from pprint import pprint as pp
 
@@ -134,35 +135,87 @@ def load_hpo_terms(adapter, hpo_lines=None, hpo_gene_lines=None, alias_genes=Non
     LOG.info("Time to load terms: {0}".format(datetime.now() - start_time))
 
 
-def load_disease_terms(adapter, genemap_lines, genes=None, hpo_disease_lines=None):
+def load_disease_terms(adapter, genemap_lines, genes=None, hpo_disease_lines=None, diff=False):
     """Load the omim phenotypes into the database
 
     Parse the phenotypes from genemap2.txt and find the associated hpo terms
     from http://compbio.charite.de/jenkins/job/hpo.annotations/lastStableBuild/phenotype_to_genes.txt
 
+    The terms are written in bulks. In diff mode the terms are compared with the terms in the
+    database and only new and changed terms are written, terms that are not in genemap2 anymore
+    are deleted.
+
     Args:
         adapter(MongoAdapter)
         genemap_lines(iterable(str))
         genes(dict): Dictionary with all genes found in database
         hpo_disease_lines(iterable(str))
+        diff(bool): Only write the terms that differ from the terms in the database
 
     """
     # Get a map with hgnc symbols to hgnc ids from scout
     if not genes:
         genes = adapter.genes_by_alias()
 
-    # Fetch the disease terms from omim
-    disease_terms = get_mim_phenotypes(genemap_lines=genemap_lines)
-
     if not hpo_disease_lines:
         hpo_disease_lines = fetch_hpo_to_genes_to_disease()
-    hpo_diseases = parse_hpo_diseases(hpo_disease_lines)
 
     start_time = datetime.now()
-    nr_diseases = None
+    disease_objs = build_disease_terms(genemap_lines, genes, hpo_disease_lines)
 
     LOG.info("Loading the hpo disease...")
-    for nr_diseases, disease_number in enumerate(disease_terms):
+    if not diff:
+        nr_diseases = load_bulks(adapter.load_disease_term_bulk, disease_objs)
+        LOG.info("Loading done. Nr of diseases loaded {0}".format(nr_diseases))
+        LOG.info("Time to load diseases: {0}".format(datetime.now() - start_time))
+        return
+
+    existing_terms = {disease_obj["_id"]: disease_obj for disease_obj in adapter.disease_terms()}
+    nr_written = load_bulks(
+        adapter.upsert_disease_term_bulk, changed_disease_terms(disease_objs, existing_terms)
+    )
+    # The terms that are left are not in genemap2 anymore
+    nr_deleted = 0
+    if existing_terms:
+        nr_deleted = adapter.delete_disease_terms(existing_terms)
+
+    LOG.info("Loading done. Nr of diseases written: %s, deleted: %s", nr_written, nr_deleted)
+    LOG.info("Time to load diseases: {0}".format(datetime.now() - start_time))
+
+
+def changed_disease_terms(disease_objs, existing_terms):
+    """Yield the disease terms that are new or differ from the existing terms
+
+    The terms are removed from existing_terms as they are compared.
+
+    Args:
+        disease_objs(iterable(dict))
+        existing_terms(dict): {<disease_id>: <disease_obj>}
+
+    Yields:
+        disease_obj(dict)
+    """
+    for disease_obj in disease_objs:
+        if existing_terms.pop(disease_obj["_id"], None) != disease_obj:
+            yield disease_obj
+
+
+def build_disease_terms(genemap_lines, genes, hpo_disease_lines):
+    """Build the disease terms of the omim phenotypes
+
+    Args:
+        genemap_lines(iterable(str))
+        genes(dict): Dictionary with all genes found in database
+        hpo_disease_lines(iterable(str))
+
+    Yields:
+        disease_obj(scout.models.phenotype_term.DiseaseTerm)
+    """
+    # Fetch the disease terms from omim
+    disease_terms = get_mim_phenotypes(genemap_lines=genemap_lines)
+    hpo_diseases = parse_hpo_diseases(hpo_disease_lines)
+
+    for disease_number in disease_terms:
         disease_info = disease_terms[disease_number]
         disease_id = "OMIM:{0}".format(disease_number)
 
@@ -170,9 +223,4 @@ def load_disease_terms(adapter, genemap_lines, genes=None, hpo_disease_lines=Non
             hpo_terms = hpo_diseases[disease_id]["hpo_terms"]
             if hpo_terms:
                 disease_info["hpo_terms"] = hpo_terms
-        disease_obj = build_disease_term(disease_info, genes)
-
-        adapter.load_disease_term(disease_obj)
-
-    LOG.info("Loading done. Nr of diseases loaded {0}".format(nr_diseases))
-    LOG.info("Time to load diseases: {0}".format(datetime.now() - start_time))
+        yield build_disease_term(disease_info, genes)
@@ -4,9 +4,18 @@ Sets up a scout database.
 This means add a default institute, a user and the internal definitions such as gene objects,
 transcripts, hpo terms etc
 
+The reference data is read and parsed in a process pool: independent sources are fetched
+concurrently and the genes and transcripts of the two genome builds are built in parallel. The
+built documents are inserted in chunks as soon as a build is ready and the indexes are created
+when all data is loaded. The time of each phase is logged and returned.
+
 """
-import datetime
+
+import collections
+import contextlib
 import logging
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 
 import yaml
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
@@ -20,12 +29,16 @@ from scout.demo import load_path, panel_path
 ### Import demo files ###
 from scout.demo.resources import demo_files
 from scout.resources import cytoband_files
-from scout.load import load_hgnc_genes, load_hpo, load_transcripts, load_cytobands
+from scout.load import load_hpo, load_cytobands
+from scout.load.bulk import load_bulks
+from scout.load.hgnc_gene import build_hgnc_genes
+from scout.load.transcript import build_transcripts, link_transcripts
 
 # Resources
 from scout.parse.case import parse_case_data
 from scout.parse.panel import parse_gene_panel
 from scout.utils.handle import get_file_handle
+from scout.utils.link import link_genes
 from scout.utils.scout_requests import (
     fetch_ensembl_genes,
     fetch_ensembl_transcripts,
@@ -38,6 +51,249 @@ from scout.utils.scout_requests import (
 LOG = logging.getLogger(__name__)
 
 
+BUILDS = ["37", "38"]
+
+
+class SerialExecutor(object):
+    """Run tasks when they are submitted, with the interface of a process pool executor"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    @staticmethod
+    def submit(function, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as err:
+            future.set_exception(err)
+        return future
+
+
+def task_executor(processes=None):
+    """Return an executor for the setup tasks
+
+    Args:
+        processes(int): number of worker processes, defaults to the number of cpus. The tasks are
+                        run in the current process if 1.
+    """
+    if processes == 1:
+        return SerialExecutor()
+    return ProcessPoolExecutor(max_workers=processes)
+
+
+class PhaseTimer(object):
+    """Measure the time of the phases of the setup"""
+
+    def __init__(self):
+        # {<phase>: <seconds>}, in the order the phases were started
+        self.timings = collections.OrderedDict()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time a phase, the times of phases with the same name are added up"""
+        self.timings.setdefault(name, 0)
+        start = time.time()
+        try:
+            yield
+        finally:
+            seconds = time.time() - start
+            self.timings[name] += seconds
+            LOG.info("Phase %s done in %.2f s", name, seconds)
+
+
+def resource_lines(path=None, fetch_function=None, **kwargs):
+    """Return the lines of a resource file, or fetch them if there is no file
+
+    Args:
+        path(str): path to a resource file
+        fetch_function(function): a function in scout.utils.scout_requests
+        kwargs: passed to fetch_function
+
+    Returns:
+        lines(list(str))
+    """
+    if path:
+        return [line for line in get_file_handle(path)]
+    return list(fetch_function(**kwargs))
+
+
+def mim_lines(mim2gene_path=None, genemap_path=None, api_key=None):
+    """Return the lines of the OMIM mim2gene and genemap2 files
+
+    Args:
+        mim2gene_path(str)
+        genemap_path(str)
+        api_key(str): used to fetch the files if both paths are not given
+
+    Returns:
+        mim2gene_lines(list(str)), genemap_lines(list(str)): None if there were no resources
+    """
+    if genemap_path and mim2gene_path:
+        return resource_lines(mim2gene_path), resource_lines(genemap_path)
+    if not api_key:
+        return None, None
+    try:
+        mim_files = fetch_mim_files(api_key, mim2genes=True, genemap2=True)
+    except Exception as err:
+        LOG.warning(err)
+        raise err
+    return mim_files["mim2genes"], mim_files["genemap2"]
+
+
+def build_genes_and_transcripts(
+    build,
+    ensembl_lines,
+    transcripts_lines,
+    hgnc_lines,
+    exac_lines,
+    hpo_lines,
+    mim2gene_lines=None,
+    genemap_lines=None,
+):
+    """Link the gene sources and build the gene and transcript objects of a genome build
+
+    Does not need a database, so that the builds can be built in separate processes.
+
+    Args:
+        build(str)
+        ensembl_lines(iterable(str)): Lines formated with ensembl gene information
+        transcripts_lines(iterable(str)): Lines formated with ensembl transcript information
+        hgnc_lines(iterable(str)): Lines with gene information from genenames.org
+        exac_lines(iterable(str)): Lines with information pLi-scores from ExAC
+        hpo_lines(iterable(str)): Lines information about map from hpo terms to genes
+        mim2gene_lines(iterable(str)): Lines with map from omim id to gene symbol
+        genemap_lines(iterable(str)): Lines with information of omim entries
+
+    Returns:
+        gene_objs(list(HgncGene)), transcript_objs(list(HgncTranscript))
+    """
+    genes = link_genes(
+        ensembl_lines=ensembl_lines,
+        hgnc_lines=hgnc_lines,
+        exac_lines=exac_lines,
+        hpo_lines=hpo_lines,
+        mim2gene_lines=mim2gene_lines,
+        genemap_lines=genemap_lines,
+    )
+    gene_objs = list(build_hgnc_genes(genes.values(), build=build))
+
+    ensembl_genes = {gene_obj["ensembl_id"]: gene_obj for gene_obj in gene_objs}
+    transcripts = link_transcripts(transcripts_lines, ensembl_genes, build)
+    transcript_objs = list(build_transcripts(transcripts.values(), build))
+    LOG.info(
+        "Built %s genes and %s transcripts for build %s",
+        len(gene_objs),
+        len(transcript_objs),
+        build,
+    )
+    return gene_objs, transcript_objs
+
+
+def load_reference_genes(adapter, resource_files, api_key=None, processes=None, timer=None):
+    """Fetch, build and load the genes and transcripts of both genome builds
+
+    The resources are read in parallel and the two builds are built in parallel. The genes and
+    transcripts of a build are inserted in chunks as soon as the build is ready.
+
+    Args:
+        adapter(scout.adapter.MongoAdapter)
+        resource_files(dict): paths to resource files, resources without a file are fetched
+        api_key(str): OMIM api key
+        processes(int): number of worker processes
+        timer(PhaseTimer)
+
+    Returns:
+        genemap_lines(list(str)): the OMIM genemap2 lines, None if there were no OMIM resources
+    """
+    timer = timer or PhaseTimer()
+    # {<name>: (<function>, <kwargs>)}
+    resource_tasks = {
+        "hgnc": (
+            resource_lines,
+            dict(path=resource_files.get("hgnc_path"), fetch_function=fetch_hgnc),
+        ),
+        "exac": (
+            resource_lines,
+            dict(path=resource_files.get("exac_path"), fetch_function=fetch_exac_constraint),
+        ),
+        "hpo_genes": (
+            resource_lines,
+            dict(
+                path=resource_files.get("hpogenes_path"),
+                fetch_function=fetch_genes_to_hpo_to_disease,
+            ),
+        ),
+        "mim": (
+            mim_lines,
+            dict(
+                mim2gene_path=resource_files.get("mim2gene_path"),
+                genemap_path=resource_files.get("genemap_path"),
+                api_key=api_key,
+            ),
+        ),
+    }
+    for build in BUILDS:
+        resource_tasks["genes" + build] = (
+            resource_lines,
+            dict(
+                path=resource_files.get("genes{}_path".format(build)),
+                fetch_function=fetch_ensembl_genes,
+                build=build,
+            ),
+        )
+        resource_tasks["transcripts" + build] = (
+            resource_lines,
+            dict(
+                path=resource_files.get("transcripts{}_path".format(build)),
+                fetch_function=fetch_ensembl_transcripts,
+                build=build,
+            ),
+        )
+
+    with task_executor(processes) as executor:
+        with timer.phase("read resources"):
+            futures = {
+                name: executor.submit(function, **kwargs)
+                for name, (function, kwargs) in resource_tasks.items()
+            }
+            resources = {name: future.result() for name, future in futures.items()}
+        mim2gene_lines, genemap_lines = resources["mim"]
+
+        # Only the time waiting for a build is timed as building, the inserts are timed apart
+        with timer.phase("build genes"):
+            futures = {}
+            for build in BUILDS:
+                future = executor.submit(
+                    build_genes_and_transcripts,
+                    build,
+                    resources.pop("genes" + build),
+                    resources.pop("transcripts" + build),
+                    resources["hgnc"],
+                    resources["exac"],
+                    resources["hpo_genes"],
+                    mim2gene_lines,
+                    genemap_lines,
+                )
+                futures[future] = build
+            completed = as_completed(futures)
+
+        for _ in range(len(futures)):
+            with timer.phase("build genes"):
+                future = next(completed)
+                gene_objs, transcript_objs = future.result()
+            with timer.phase("insert genes"):
+                load_bulks(adapter.load_hgnc_bulk, gene_objs)
+            with timer.phase("insert transcripts"):
+                load_bulks(adapter.load_transcript_bulk, transcript_objs)
+            LOG.info("Genes and transcripts of build %s loaded", futures[future])
+
+    return genemap_lines
+
+
 def setup_scout(
     adapter,
     institute_id="cust000",
@@ -46,6 +302,7 @@ def setup_scout(
     api_key=None,
     demo=False,
     resource_files=None,
+    processes=None,
 ):
     """Function to setup a working scout instance.
 
@@ -61,16 +318,32 @@ def setup_scout(
          Link between hpo terms and genes is fetched from HPO
          For more details check the documentation.
 
+    Args:
+        adapter(scout.adapter.MongoAdapter)
+        institute_id(str)
+        user_name(str)
+        user_mail(str)
+        api_key(str): OMIM api key
+        demo(bool): setup a demo instance with the demo resources, a gene panel and a case
+        resource_files(dict): paths to resource files, resources without a file are fetched
+        processes(int): number of processes that parse the resources, defaults to the number
+                        of cpus. Everything is run in the current process if 1.
+
+    Returns:
+        timings(OrderedDict): {<phase>: <seconds>}
     """
+    timer = PhaseTimer()
+    start = time.time()
 
     LOG.info("Check if there was a database, delete if existing")
     existing_database = False
-    for collection_name in adapter.db.collection_names():
-        if collection_name.startswith("system"):
-            continue
-        LOG.info("Deleting collection %s", collection_name)
-        adapter.db.drop_collection(collection_name)
-        existing_database = True
+    with timer.phase("delete database"):
+        for collection_name in adapter.db.collection_names():
+            if collection_name.startswith("system"):
+                continue
+            LOG.info("Deleting collection %s", collection_name)
+            adapter.db.drop_collection(collection_name)
+            existing_database = True
 
     if existing_database:
         LOG.info("Database deleted")
@@ -95,74 +368,15 @@ def setup_scout(
     resource_files = resource_files or {}
     if demo:
         resource_files = demo_files
-    mim2gene_lines = None
-    genemap_lines = None
-    mim2gene_path = resource_files.get("mim2gene_path")
-    genemap_path = resource_files.get("genemap_path")
-    if genemap_path and mim2gene_path:
-        mim2gene_lines = [line for line in get_file_handle(mim2gene_path)]
-        genemap_lines = [line for line in get_file_handle(genemap_path)]
 
-    if (genemap_lines is None) and api_key:
-        try:
-            mim_files = fetch_mim_files(api_key, mim2genes=True, genemap2=True)
-        except Exception as err:
-            LOG.warning(err)
-            raise err
-        mim2gene_lines = mim_files["mim2genes"]
-        genemap_lines = mim_files["genemap2"]
-
-    if resource_files.get("hpogenes_path"):
-        hpo_gene_lines = [line for line in get_file_handle(resource_files.get("hpogenes_path"))]
-    else:
-        hpo_gene_lines = fetch_genes_to_hpo_to_disease()
-
-    if resource_files.get("hgnc_path"):
-        hgnc_lines = [line for line in get_file_handle(resource_files.get("hgnc_path"))]
-    else:
-        hgnc_lines = fetch_hgnc()
-
-    if resource_files.get("exac_path"):
-        exac_lines = [line for line in get_file_handle(resource_files.get("exac_path"))]
-    else:
-        exac_lines = fetch_exac_constraint()
+    genemap_lines = load_reference_genes(
+        adapter, resource_files, api_key=api_key, processes=processes, timer=timer
+    )
 
     # Load cytobands into cytoband collection
-    for genome_build, cytobands_path in cytoband_files.items():
-        load_cytobands(cytobands_path, genome_build, adapter)
-
-    builds = ["37", "38"]
-    for build in builds:
-        genes_path = "genes{}_path".format(build)
-        if resource_files.get(genes_path):
-            ensembl_genes = get_file_handle(resource_files[genes_path])
-        else:
-            ensembl_genes = fetch_ensembl_genes(build=build)
-
-        hgnc_genes = load_hgnc_genes(
-            adapter=adapter,
-            ensembl_lines=ensembl_genes,
-            hgnc_lines=hgnc_lines,
-            exac_lines=exac_lines,
-            mim2gene_lines=mim2gene_lines,
-            genemap_lines=genemap_lines,
-            hpo_lines=hpo_gene_lines,
-            build=build,
-        )
-
-        # Create a map from ensembl ids to gene objects
-        ensembl_genes = {}
-        for gene_obj in hgnc_genes:
-            ensembl_id = gene_obj["ensembl_id"]
-            ensembl_genes[ensembl_id] = gene_obj
-
-        tx_path = "transcripts{}_path".format(build)
-        if resource_files.get(tx_path):
-            ensembl_transcripts = get_file_handle(resource_files[tx_path])
-        else:
-            ensembl_transcripts = fetch_ensembl_transcripts(build=build)
-        # Load the transcripts for a certain build
-        transcripts = load_transcripts(adapter, ensembl_transcripts, build, ensembl_genes)
+    with timer.phase("load cytobands"):
+        for genome_build, cytobands_path in cytoband_files.items():
+            load_cytobands(cytobands_path, genome_build, adapter)
 
     hpo_terms_handle = None
     if resource_files.get("hpoterms_path"):
@@ -176,29 +390,37 @@ def setup_scout(
     if resource_files.get("hpo_disease_path"):
         hpo_disease_handle = get_file_handle(resource_files["hpo_disease_path"])
 
-    load_hpo(
-        adapter=adapter,
-        disease_lines=genemap_lines,
-        hpo_lines=hpo_terms_handle,
-        hpo_gene_lines=hpo_to_genes_handle,
-    )
+    with timer.phase("load hpo"):
+        load_hpo(
+            adapter=adapter,
+            disease_lines=genemap_lines,
+            hpo_lines=hpo_terms_handle,
+            hpo_gene_lines=hpo_to_genes_handle,
+        )
 
     # If demo we load a gene panel and some case information
     if demo:
-        parsed_panel = parse_gene_panel(
-            path=panel_path,
-            institute="cust000",
-            panel_id="panel1",
-            version=1.0,
-            display_name="Test panel",
-        )
-        adapter.load_panel(parsed_panel)
-
-        case_handle = get_file_handle(load_path)
-        case_data = yaml.load(case_handle, Loader=yaml.FullLoader)
-        config_data = parse_case_data(config=case_data)
-        adapter.load_case(config_data)
-
+        with timer.phase("load demo data"):
+            parsed_panel = parse_gene_panel(
+                path=panel_path,
+                institute="cust000",
+                panel_id="panel1",
+                version=1.0,
+                display_name="Test panel",
+            )
+            adapter.load_panel(parsed_panel)
+
+            case_handle = get_file_handle(load_path)
+            case_data = yaml.load(case_handle, Loader=yaml.FullLoader)
+            config_data = parse_case_data(config=case_data)
+            adapter.load_case(config_data)
+
+    # The indexes are created when all data is loaded, so they are not updated on every insert
     LOG.info("Creating indexes")
-    adapter.load_indexes()
+    with timer.phase("create indexes"):
+        adapter.load_indexes()
+    timer.timings["total"] = time.time() - start
     LOG.info("Scout instance setup successful")
+    for phase, seconds in timer.timings.items():
+        LOG.info("%s: %.2f s", phase, seconds)
+    return timer.timings
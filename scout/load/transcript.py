@@ -7,6 +7,7 @@ from click import progressbar
 from scout.utils.scout_requests import fetch_ensembl_transcripts
 from scout.parse.ensembl import parse_transcripts
 from scout.build.genes.transcript import build_transcript
+from scout.load.bulk import load_bulks
 
 LOG = logging.getLogger(__name__)
 
@@ -34,6 +35,42 @@ def load_transcripts(adapter, transcripts_lines=None, build="37", ensembl_genes=
         transcripts_lines = fetch_ensembl_transcripts(build=build)
 
     # Map with all transcripts enstid -> parsed transcript
+    transcripts_dict = link_transcripts(transcripts_lines, ensembl_genes, build)
+    nr_transcripts = len(transcripts_dict)
+
+    with progressbar(
+        transcripts_dict.values(), label="Building transcripts", length=nr_transcripts
+    ) as bar:
+        transcript_objs = list(build_transcripts(bar, build))
+
+    # Load all transcripts
+    LOG.info("Loading transcripts...")
+    load_bulks(adapter.load_transcript_bulk, transcript_objs)
+
+    ref_seq_transcripts = sum(
+        len(tx_obj.get("refseq_identifiers") or []) for tx_obj in transcript_objs
+    )
+    nr_primary_transcripts = sum(1 for tx_obj in transcript_objs if tx_obj.get("is_primary"))
+    LOG.info("Number of transcripts in build %s: %s", build, nr_transcripts)
+    LOG.info("Number of transcripts with refseq identifier: %s", ref_seq_transcripts)
+    LOG.info("Number of primary transcripts: %s", nr_primary_transcripts)
+
+    return transcript_objs
+
+
+def link_transcripts(transcripts_lines, ensembl_genes, build="37"):
+    """Parse ensembl transcripts and add the hgnc id of their genes
+
+    Transcripts of genes that does not exist in scout are skipped.
+
+    Args:
+        transcripts_lines(iterable): iterable with ensembl transcript lines
+        ensembl_genes(dict): Map from ensembl_id -> HgncGene
+        build(str)
+
+    Returns:
+        transcripts_dict(dict): Map from enstid -> parsed transcript
+    """
     transcripts_dict = parse_transcripts(transcripts_lines)
     for ens_tx_id in list(transcripts_dict):
         parsed_tx = transcripts_dict[ens_tx_id]
@@ -53,64 +90,54 @@ def load_transcripts(adapter, transcripts_lines=None, build="37", ensembl_genes=
         # Primary transcript information is collected from HGNC
         parsed_tx["primary_transcripts"] = set(gene_obj.get("primary_transcripts", []))
 
-    ref_seq_transcripts = 0
-    nr_primary_transcripts = 0
-    nr_transcripts = len(transcripts_dict)
+    return transcripts_dict
 
-    transcript_objs = []
 
-    with progressbar(
-        transcripts_dict.values(), label="Building transcripts", length=nr_transcripts
-    ) as bar:
-        for tx_data in bar:
-
-            #################### Get the correct refseq identifier ####################
-            # We need to decide one refseq identifier for each transcript, if there are any to
-            # choose from. The algorithm is as follows:
-            # If there is ONE mrna this is choosen
-            # If there are several mrna the one that is in 'primary_transcripts' is choosen
-            # Else one is choosen at random
-            # The same follows for the other categories where nc_rna has precedense over mrna_predicted
-            # We will store all refseq identifiers in a "refseq_identifiers" list as well
-            tx_data["is_primary"] = False
-            primary_transcripts = tx_data["primary_transcripts"]
-            refseq_identifier = None
-            refseq_identifiers = []
-            for category in TRANSCRIPT_CATEGORIES:
-                identifiers = tx_data[category]
-                if not identifiers:
-                    continue
-
-                for refseq_id in identifiers:
-                    # Add all refseq identifiers to refseq_identifiers
-                    refseq_identifiers.append(refseq_id)
-                    ref_seq_transcripts += 1
-
-                    if refseq_id in primary_transcripts:
-                        refseq_identifier = refseq_id
-                        tx_data["is_primary"] = True
-                        nr_primary_transcripts += 1
-
-                    if not refseq_identifier:
-                        refseq_identifier = refseq_id
-
-            if refseq_identifier:
-                tx_data["refseq_id"] = refseq_identifier
-            if refseq_identifiers:
-                tx_data["refseq_identifiers"] = refseq_identifiers
-
-            ####################  ####################  ####################
-            # Build the transcript object
-            tx_obj = build_transcript(tx_data, build)
-            transcript_objs.append(tx_obj)
+def build_transcripts(transcripts, build="37"):
+    """Build the transcript objects of linked transcripts
 
-    # Load all transcripts
-    LOG.info("Loading transcripts...")
-    if len(transcript_objs) > 0:
-        adapter.load_transcript_bulk(transcript_objs)
-
-    LOG.info("Number of transcripts in build %s: %s", build, nr_transcripts)
-    LOG.info("Number of transcripts with refseq identifier: %s", ref_seq_transcripts)
-    LOG.info("Number of primary transcripts: %s", nr_primary_transcripts)
+    Args:
+        transcripts(iterable(dict)): the values returned by link_transcripts
+        build(str)
 
-    return transcript_objs
+    Yields:
+        tx_obj(scout.models.hgnc_map.HgncTranscript)
+    """
+    for tx_data in transcripts:
+
+        #################### Get the correct refseq identifier ####################
+        # We need to decide one refseq identifier for each transcript, if there are any to
+        # choose from. The algorithm is as follows:
+        # If there is ONE mrna this is choosen
+        # If there are several mrna the one that is in 'primary_transcripts' is choosen
+        # Else one is choosen at random
+        # The same follows for the other categories where nc_rna has precedense over mrna_predicted
+        # We will store all refseq identifiers in a "refseq_identifiers" list as well
+        tx_data["is_primary"] = False
+        primary_transcripts = tx_data["primary_transcripts"]
+        refseq_identifier = None
+        refseq_identifiers = []
+        for category in TRANSCRIPT_CATEGORIES:
+            identifiers = tx_data[category]
+            if not identifiers:
+                continue
+
+            for refseq_id in identifiers:
+                # Add all refseq identifiers to refseq_identifiers
+                refseq_identifiers.append(refseq_id)
+
+                if refseq_id in primary_transcripts:
+                    refseq_identifier = refseq_id
+                    tx_data["is_primary"] = True
+
+                if not refseq_identifier:
+                    refseq_identifier = refseq_id
+
+        if refseq_identifier:
+            tx_data["refseq_id"] = refseq_identifier
+        if refseq_identifiers:
+            tx_data["refseq_identifiers"] = refseq_identifiers
+
+        ####################  ####################  ####################
+        # Build the transcript object
+        yield build_transcript(tx_data, build)
@@ -1,4 +1,4 @@
-import intervaltree
+from scout.utils.genomic_intervals import GenomicIntervalIndex
 
 
 def parse_cytoband(lines):
@@ -8,10 +8,10 @@ def parse_cytoband(lines):
         lines(iterable): Strings on format "chr1\t2300000\t5400000\tp36.32\tgpos25"
 
     Returns:
-        cytobands(dict): Dictionary with chromosome names as keys and
-                         interval trees as values
+        cytobands(GenomicIntervalIndex): Cytobands with chromosome names without 'chr' and
+                                         the cytoband names as data
     """
-    cytobands = {}
+    cytobands = []
     for line in lines:
         if line.startswith("#"):
             continue
@@ -21,15 +21,6 @@ def parse_cytoband(lines):
         start = int(splitted_line[1])
         stop = int(splitted_line[2])
         name = splitted_line[3]
-        if chrom in cytobands:
-            # Add interval to existing tree
-            cytobands[chrom][start:stop] = name
-        else:
-            # Create a new interval tree
-            new_tree = intervaltree.IntervalTree()
-            # create the interval
-            new_tree[start:stop] = name
-            # Add the interval tree
-            cytobands[chrom] = new_tree
+        cytobands.append((chrom, start, stop, name))
 
-    return cytobands
+    return GenomicIntervalIndex.from_intervals(cytobands)
@@ -1,9 +1,135 @@
 """Code for parsing ensembl information"""
+import functools
 import logging
 
 LOG = logging.getLogger(__name__)
 
 
+def parse_hgnc_id(value):
+    """Convert a hgnc id like 'HGNC:5' to an integer"""
+    return int(value.split(":")[-1])
+
+
+def ensembl_column_fields(word):
+    """Return the fields that an ensembl column is parsed into
+
+    Args:
+        word(str): A lowercased header column
+
+    Returns:
+        column_fields(list(tuple)): (<field>, <converter>), the converter is None for strings
+    """
+    column_fields = []
+
+    if "chromosome" in word:
+        column_fields.append(("chrom", None))
+
+    if "gene" in word:
+        if "id" in word:
+            column_fields.append(("ensembl_gene_id", None))
+        elif "start" in word:
+            column_fields.append(("gene_start", int))
+        elif "end" in word:
+            column_fields.append(("gene_end", int))
+
+    if "hgnc symbol" in word:
+        column_fields.append(("hgnc_symbol", None))
+    if "gene name" in word:
+        column_fields.append(("hgnc_symbol", None))
+
+    if "hgnc id" in word:
+        column_fields.append(("hgnc_id", parse_hgnc_id))
+
+    if "transcript" in word:
+        if "id" in word:
+            column_fields.append(("ensembl_transcript_id", None))
+        elif "start" in word:
+            column_fields.append(("transcript_start", int))
+        elif "end" in word:
+            column_fields.append(("transcript_end", int))
+
+    if "exon" in word:
+        if "start" in word:
+            column_fields.append(("exon_start", int))
+        elif "end" in word:
+            column_fields.append(("exon_end", int))
+        elif "id" in word:
+            column_fields.append(("ensembl_exon_id", None))
+        elif "rank" in word:
+            column_fields.append(("exon_rank", int))
+
+    if "utr" in word:
+
+        if "start" in word:
+            if "5" in word:
+                column_fields.append(("utr_5_start", int))
+            elif "3" in word:
+                column_fields.append(("utr_3_start", int))
+        elif "end" in word:
+            if "5" in word:
+                column_fields.append(("utr_5_end", int))
+            elif "3" in word:
+                column_fields.append(("utr_3_end", int))
+
+    if "strand" in word:
+        column_fields.append(("strand", int))
+
+    if "refseq" in word:
+        if "mrna" in word:
+            if "predicted" in word:
+                column_fields.append(("refseq_mrna_predicted", None))
+            else:
+                column_fields.append(("refseq_mrna", None))
+
+        if "ncrna" in word:
+            column_fields.append(("refseq_ncrna", None))
+
+    return column_fields
+
+
+def ensembl_field_parsers(header):
+    """Resolve which fields the columns of an ensembl header are parsed into
+
+    This is done once per file, so that the lines can be parsed without looking at the header.
+
+    Args:
+        header(list): A list with the header info
+
+    Returns:
+        field_parsers(tuple): (<column index>, <field>, <converter>) in column order
+    """
+    field_parsers = []
+    for index, head in enumerate(header):
+        for field, converter in ensembl_column_fields(head.lower()):
+            field_parsers.append((index, field, converter))
+    return tuple(field_parsers)
+
+
+_cached_field_parsers = functools.lru_cache(maxsize=16)(ensembl_field_parsers)
+
+
+def parse_ensembl_row(row, field_parsers):
+    """Parse the columns of an ensembl formated line
+
+    Args:
+        row(list): The columns of a line
+        field_parsers(tuple): As returned by ensembl_field_parsers
+
+    Returns:
+        ensembl_info(dict): A dictionary with the relevant info
+    """
+    ensembl_info = {}
+    nr_columns = len(row)
+    for index, field, converter in field_parsers:
+        if index >= nr_columns:
+            break
+        value = row[index]
+        if not value:
+            continue
+        ensembl_info[field] = converter(value) if converter else value
+    return ensembl_info
+
+
 def parse_ensembl_line(line, header):
     """Parse an ensembl formated line
 
@@ -17,82 +143,27 @@ def parse_ensembl_line(line, header):
     Returns:
         ensembl_info(dict): A dictionary with the relevant info
     """
-    line = line.rstrip().split("\t")
-    header = [head.lower() for head in header]
-    raw_info = dict(zip(header, line))
+    return parse_ensembl_row(line.rstrip().split("\t"), _cached_field_parsers(tuple(header)))
 
-    ensembl_info = {}
 
-    for word in raw_info:
-        value = raw_info[word]
+def parse_ensembl_rows(lines):
+    """Parse the lines of an ensembl formated file, resolving the header once
 
-        if not value:
-            continue
+    The first line is the header.
 
-        if "chromosome" in word:
-            ensembl_info["chrom"] = value
-
-        if "gene" in word:
-            if "id" in word:
-                ensembl_info["ensembl_gene_id"] = value
-            elif "start" in word:
-                ensembl_info["gene_start"] = int(value)
-            elif "end" in word:
-                ensembl_info["gene_end"] = int(value)
-
-        if "hgnc symbol" in word:
-            ensembl_info["hgnc_symbol"] = value
-        if "gene name" in word:
-            ensembl_info["hgnc_symbol"] = value
-
-        if "hgnc id" in word:
-            ensembl_info["hgnc_id"] = int(value.split(":")[-1])
-
-        if "transcript" in word:
-            if "id" in word:
-                ensembl_info["ensembl_transcript_id"] = value
-            elif "start" in word:
-                ensembl_info["transcript_start"] = int(value)
-            elif "end" in word:
-                ensembl_info["transcript_end"] = int(value)
-
-        if "exon" in word:
-            if "start" in word:
-                ensembl_info["exon_start"] = int(value)
-            elif "end" in word:
-                ensembl_info["exon_end"] = int(value)
-            elif "id" in word:
-                ensembl_info["ensembl_exon_id"] = value
-            elif "rank" in word:
-                ensembl_info["exon_rank"] = int(value)
-
-        if "utr" in word:
-
-            if "start" in word:
-                if "5" in word:
-                    ensembl_info["utr_5_start"] = int(value)
-                elif "3" in word:
-                    ensembl_info["utr_3_start"] = int(value)
-            elif "end" in word:
-                if "5" in word:
-                    ensembl_info["utr_5_end"] = int(value)
-                elif "3" in word:
-                    ensembl_info["utr_3_end"] = int(value)
-
-        if "strand" in word:
-            ensembl_info["strand"] = int(value)
-
-        if "refseq" in word:
-            if "mrna" in word:
-                if "predicted" in word:
-                    ensembl_info["refseq_mrna_predicted"] = value
-                else:
-                    ensembl_info["refseq_mrna"] = value
-
-            if "ncrna" in word:
-                ensembl_info["refseq_ncrna"] = value
+    Args:
+        lines(iterable(str))
 
-    return ensembl_info
+    Yields:
+        ensembl_info(dict)
+    """
+    field_parsers = None
+    for line in lines:
+        row = line.rstrip().split("\t")
+        if field_parsers is None:
+            field_parsers = ensembl_field_parsers(row)
+            continue
+        yield parse_ensembl_row(row, field_parsers)
 
 
 def parse_transcripts(transcript_lines):
@@ -159,16 +230,9 @@ def parse_ensembl_genes(lines):
         ensembl_gene(dict): A dictionary with the relevant information
     """
     LOG.info("Parsing ensembl genes from file")
-    header = []
-    for index, line in enumerate(lines):
-
-        # File allways start with a header line
-        if index == 0:
-            header = line.rstrip().split("\t")
-            continue
-        # After that each line represents a gene
-
-        yield parse_ensembl_line(line, header)
+    # File allways start with a header line, after that each line represents a gene
+    for ensembl_gene in parse_ensembl_rows(lines):
+        yield ensembl_gene
 
 
 def parse_ensembl_transcripts(lines):
@@ -183,16 +247,10 @@ def parse_ensembl_transcripts(lines):
     Yields:
         ensembl_gene(dict): A dictionary with the relevant information
     """
-    header = []
-    LOG.info("Parsing ensembl genes from file")
-    for index, line in enumerate(lines):
-
-        # File allways start with a header line
-        if index == 0:
-            header = line.rstrip().split("\t")
-        # After that each line represents a transcript
-        else:
-            yield parse_ensembl_line(line, header)
+    LOG.info("Parsing ensembl transcripts from file")
+    # File allways start with a header line, after that each line represents a transcript
+    for ensembl_transcript in parse_ensembl_rows(lines):
+        yield ensembl_transcript
 
 
 def parse_ensembl_exons(lines):
@@ -206,15 +264,8 @@ def parse_ensembl_exons(lines):
     Yields:
         ensembl_gene(dict): A dictionary with the relevant information
     """
-    header = []
-    for index, line in enumerate(lines):
-
-        # File allways start with a header line
-        if index == 0:
-            header = line.rstrip().split("\t")
-            continue
-
-        exon_info = parse_ensembl_line(line, header)
+    # File allways start with a header line
+    for exon_info in parse_ensembl_rows(lines):
 
         exon = {
             "chrom": str(exon_info["chrom"]),
@@ -226,25 +277,11 @@ def parse_ensembl_exons(lines):
             "strand": exon_info["strand"],
             "rank": exon_info["exon_rank"],
         }
-        try:
-            exon["5_utr_start"] = int(exon_info.get("utr_5_start"))
-        except (ValueError, TypeError):
-            exon["5_utr_start"] = None
-
-        try:
-            exon["5_utr_end"] = int(exon_info.get("utr_5_end"))
-        except (ValueError, TypeError):
-            exon["5_utr_end"] = None
-
-        try:
-            exon["3_utr_start"] = int(exon_info.get("utr_3_start"))
-        except (ValueError, TypeError):
-            exon["3_utr_start"] = None
-
-        try:
-            exon["3_utr_end"] = int(exon_info.get("utr_3_end"))
-        except (ValueError, TypeError):
-            exon["3_utr_end"] = None
+        # The UTR positions are already converted to integers
+        exon["5_utr_start"] = exon_info.get("utr_5_start")
+        exon["5_utr_end"] = exon_info.get("utr_5_end")
+        exon["3_utr_start"] = exon_info.get("utr_3_start")
+        exon["3_utr_end"] = exon_info.get("utr_3_end")
 
         # Recalculate start and stop (taking UTR regions into account for end exons)
         if exon["strand"] == 1:
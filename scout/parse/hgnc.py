@@ -1,9 +1,46 @@
+import functools
 import logging
 from pprint import pprint as pp
 
 logger = logging.getLogger(__name__)
 
 
+# The columns of the HGNC complete set that genes are built from
+HGNC_COLUMNS = [
+    "status",
+    "symbol",
+    "hgnc_id",
+    "name",
+    "prev_symbol",
+    "alias_symbol",
+    "ensembl_gene_id",
+    "omim_id",
+    "entrez_id",
+    "refseq_accession",
+    "uniprot_ids",
+    "ucsc_id",
+    "vega_id",
+]
+
+
+def hgnc_column_indexes(header):
+    """Resolve the positions of the used columns in a HGNC header
+
+    This is done once per file, so that the lines can be parsed without looking at the header.
+
+    Args:
+        header(list): A list with the header info
+
+    Returns:
+        column_indexes(tuple): the index of each column in HGNC_COLUMNS, None if it is missing
+    """
+    positions = {head: index for index, head in enumerate(header)}
+    return tuple(positions.get(column) for column in HGNC_COLUMNS)
+
+
+_cached_column_indexes = functools.lru_cache(maxsize=16)(hgnc_column_indexes)
+
+
 def parse_hgnc_line(line, header):
     """Parse an hgnc formated line
 
@@ -14,73 +51,85 @@ def parse_hgnc_line(line, header):
     Returns:
         hgnc_info(dict): A dictionary with the relevant info
     """
+    return parse_hgnc_row(line.rstrip().split("\t"), _cached_column_indexes(tuple(header)))
+
+
+def parse_hgnc_row(row, column_indexes):
+    """Parse the columns of an hgnc formated line
+
+    Args:
+        row(list): The columns of a line
+        column_indexes(tuple): As returned by hgnc_column_indexes
+
+    Returns:
+        hgnc_info(dict): A dictionary with the relevant info
+    """
+    nr_columns = len(row)
+    (
+        status,
+        hgnc_symbol,
+        hgnc_id,
+        description,
+        previous_names,
+        alias_symbols,
+        ensembl_gene_id,
+        omim_id,
+        entrez_id,
+        ref_seq,
+        uniprot_ids,
+        ucsc_id,
+        vega_id,
+    ) = [
+        row[index] if index is not None and index < nr_columns else None for index in column_indexes
+    ]
+
     hgnc_gene = {}
-    line = line.rstrip().split("\t")
-    raw_info = dict(zip(header, line))
     # Skip all genes that have status withdrawn
-    if "Withdrawn" in raw_info["status"]:
+    if "Withdrawn" in status:
         return hgnc_gene
 
-    hgnc_symbol = raw_info["symbol"]
     hgnc_gene["hgnc_symbol"] = hgnc_symbol
-    hgnc_gene["hgnc_id"] = int(raw_info["hgnc_id"].split(":")[-1])
-    hgnc_gene["description"] = raw_info["name"]
+    hgnc_gene["hgnc_id"] = int(hgnc_id.split(":")[-1])
+    hgnc_gene["description"] = description
 
     # We want to have the current symbol as an alias
     aliases = set([hgnc_symbol, hgnc_symbol.upper()])
     # We then need to add both the previous symbols and
     # alias symbols
-    previous_names = raw_info["prev_symbol"]
     if previous_names:
-        for alias in previous_names.strip('"').split("|"):
-            aliases.add(alias)
+        aliases.update(previous_names.strip('"').split("|"))
 
-    alias_symbols = raw_info["alias_symbol"]
     if alias_symbols:
-        for alias in alias_symbols.strip('"').split("|"):
-            aliases.add(alias)
+        aliases.update(alias_symbols.strip('"').split("|"))
 
     hgnc_gene["previous_symbols"] = list(aliases)
 
     # We need the ensembl_gene_id to link the genes with ensembl
-    hgnc_gene["ensembl_gene_id"] = raw_info.get("ensembl_gene_id")
+    hgnc_gene["ensembl_gene_id"] = ensembl_gene_id
 
-    omim_id = raw_info.get("omim_id")
     if omim_id:
         hgnc_gene["omim_id"] = int(omim_id.strip('"').split("|")[0])
     else:
         hgnc_gene["omim_id"] = None
 
-    entrez_id = hgnc_gene["entrez_id"] = raw_info.get("entrez_id")
     if entrez_id:
         hgnc_gene["entrez_id"] = int(entrez_id)
     else:
         hgnc_gene["entrez_id"] = None
 
     # These are the primary transcripts according to HGNC
-    ref_seq = raw_info.get("refseq_accession")
     if ref_seq:
         hgnc_gene["ref_seq"] = ref_seq.strip('"').split("|")
     else:
         hgnc_gene["ref_seq"] = []
 
-    uniprot_ids = raw_info.get("uniprot_ids")
     if uniprot_ids:
         hgnc_gene["uniprot_ids"] = uniprot_ids.strip('""').split("|")
     else:
         hgnc_gene["uniprot_ids"] = []
 
-    ucsc_id = raw_info.get("ucsc_id")
-    if ucsc_id:
-        hgnc_gene["ucsc_id"] = ucsc_id
-    else:
-        hgnc_gene["ucsc_id"] = None
-
-    vega_id = raw_info.get("vega_id")
-    if vega_id:
-        hgnc_gene["vega_id"] = vega_id
-    else:
-        hgnc_gene["vega_id"] = None
+    hgnc_gene["ucsc_id"] = ucsc_id or None
+    hgnc_gene["vega_id"] = vega_id or None
 
     return hgnc_gene
 
@@ -97,12 +146,12 @@ def parse_hgnc_genes(lines):
     Yields:
         hgnc_gene(dict): A dictionary with the relevant information
     """
-    header = []
+    column_indexes = None
     logger.info("Parsing hgnc genes...")
-    for index, line in enumerate(lines):
-        if index == 0:
-            header = line.split("\t")
+    for line in lines:
+        if column_indexes is None:
+            column_indexes = hgnc_column_indexes(line.split("\t"))
         elif len(line) > 1:
-            hgnc_gene = parse_hgnc_line(line=line, header=header)
+            hgnc_gene = parse_hgnc_row(line.rstrip().split("\t"), column_indexes)
             if hgnc_gene:
                 yield hgnc_gene
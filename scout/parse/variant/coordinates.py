@@ -3,6 +3,20 @@
 from scout.constants import BND_ALT_PATTERN, CHR_PATTERN, CYTOBANDS_37, CYTOBANDS_38
 
 
+def get_cytoband_index(build):
+    """Return the cytoband index for a genome build
+
+    Args:
+        build(str)
+
+    Returns:
+        cytobands(GenomicIntervalIndex)
+    """
+    if "38" in str(build):
+        return CYTOBANDS_38
+    return CYTOBANDS_37
+
+
 def get_cytoband_coordinates(chrom, pos, build):
     """Get the cytoband coordinate for a position
 
@@ -14,20 +28,21 @@ def get_cytoband_coordinates(chrom, pos, build):
     Returns:
         coordinate(str)
     """
-    coordinate = ""
+    return get_cytoband_index(build).find(chrom, pos) or ""
 
-    if "38" in str(build):
-        coord_resource = CYTOBANDS_38
-    else:
-        coord_resource = CYTOBANDS_37
 
-    if chrom not in coord_resource:
-        return coordinate
+def get_cytoband_coordinates_batch(chrom, positions, build):
+    """Get the cytoband coordinates for a block of positions on one chromosome
 
-    for interval in coord_resource[chrom][pos]:
-        coordinate = interval.data
+    Args:
+        chrom(str)
+        positions(iterable(int))
+        build(str)
 
-    return coordinate
+    Returns:
+        coordinates(list(str)): One cytoband coordinate per position
+    """
+    return [coordinate or "" for coordinate in get_cytoband_index(build).locate(chrom, positions)]
 
 
 def sv_length(pos, end, chrom, end_chrom, svlen=None):
@@ -93,6 +93,7 @@ def configure_extensions(app):
     extensions.bootstrap.init_app(app)
     extensions.mongo.init_app(app)
     extensions.store.init_app(app)
+    extensions.region_vcf.init_app(app)
     extensions.login_manager.init_app(app)
     extensions.mail.init_app(app)
 
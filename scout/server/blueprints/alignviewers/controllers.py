@@ -1,3 +1,5 @@
+import os.path
+
 HG19REF_URL = "https://s3.amazonaws.com/igv.broadinstitute.org/genomes/seq/hg19/hg19.fasta"
 HG19REF_INDEX_URL = (
     "https://s3.amazonaws.com/igv.broadinstitute.org/genomes/seq/hg19/hg19.fasta.fai"
@@ -132,3 +134,28 @@ def genes_track(build, chrom):
         genes_track["indexURL"] = HG19GENES_INDEX_URL
 
     return genes_track
+
+
+def region_vcf_track(vcf_path):
+    """Return a dictionary consisting in the igv.js track of a bgzipped region vcf
+
+    Accepts:
+        vcf_path(str): path to the region vcf of a variant
+
+    Returns:
+        region_vcf_track(dict)
+    """
+    region_vcf_track = {
+        "name": "Variants",
+        "type": "variant",
+        "format": "vcf",
+        "sourceType": "file",
+        "url": vcf_path,
+    }
+    index_path = vcf_path + ".tbi"
+    if os.path.exists(index_path):
+        region_vcf_track["indexURL"] = index_path
+    else:
+        region_vcf_track["indexed"] = False
+
+    return region_vcf_track
@@ -73,6 +73,7 @@ def igv():
     tiddit_coverage_files = None
     updregion_files = None
     updsites_files = None
+    region_vcf_file = None
 
     if request.form.get("align") == "mt_bam":
         bam_files = request.form.get("mt_bam").split(",")
@@ -101,6 +102,9 @@ def igv():
         if request.form.get("upd_sites_bed"):
             updsites_files = request.form.get("upd_sites_bed").split(",")
             LOG.debug("loading the following upd region tracks: %s", updsites_files)
+        if request.form.get("region_vcf"):
+            region_vcf_file = request.form.get("region_vcf")
+            LOG.debug("loading the following variants track: %s", region_vcf_file)
 
     display_obj = {}
 
@@ -147,6 +151,9 @@ def igv():
         updsites_tracks = make_igv_tracks("UPD sites", updsites_files)
         display_obj["updsites_tracks"] = updsites_tracks
 
+    if region_vcf_file:
+        display_obj["region_vcf_track"] = controllers.region_vcf_track(region_vcf_file)
+
     if request.form.get("center_guide"):
         display_obj["display_center_guide"] = True
     else:
@@ -27,6 +27,7 @@ from scout.constants.variant_tags import (
     GENETIC_MODELS,
     MANUAL_RANK_OPTIONS,
 )
+from scout.export.gene import GeneSymbolResolver
 from scout.export.variant import export_mt_variants
 from scout.parse.matchmaker import (
     genomic_features,
@@ -34,6 +35,7 @@ from scout.parse.matchmaker import (
     omim_terms,
     parse_matches,
 )
+from scout.server.blueprints.variant.controllers import prefetch_variants_info
 from scout.server.blueprints.variant.controllers import variant as variant_decorator
 from scout.server.utils import institute_and_case
 from scout.utils.matchmaker import matchmaker_request
@@ -246,21 +248,29 @@ def case_report_content(store, institute_obj, case_obj):
     data["genetic_models"] = dict(GENETIC_MODELS)
     data["report_created_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
 
+    # The ids of the variants in each category. A variant can be in several categories, e.g. a
+    # causative that is also tagged, but it is decorated once
     evaluated_variants = {vt: [] for vt in variant_types}
+    report_variants = {}
     # We collect all causatives (including the partial ones) and suspected variants
     # These are handeled in separate since they are on case level
+    case_variants = store.variants_by_document_ids(
+        [
+            var_id
+            for var_type in ["causatives", "suspects", "partial_causatives"]
+            for var_id in case_obj.get(var_type) or []
+        ],
+        build=case_obj.get("genome_build", "37"),
+    )
     for var_type in ["causatives", "suspects", "partial_causatives"]:
         # These include references to variants
         vt = "_".join([var_type, "detailed"])
         for var_id in case_obj.get(var_type, []):
-            variant_obj = store.variant(var_id)
+            variant_obj = case_variants.get(var_id)
             if not variant_obj:
                 continue
-            if var_type == "partial_causatives":  # Collect associated phenotypes
-                variant_obj["phenotypes"] = [
-                    value for key, value in case_obj["partial_causatives"].items() if key == var_id
-                ][0]
-            evaluated_variants[vt].append(variant_obj)
+            report_variants[variant_obj["_id"]] = variant_obj
+            evaluated_variants[vt].append(variant_obj["_id"])
 
     ## get variants for this case that are either classified, commented, tagged or dismissed.
     for var_obj in store.evaluated_variants(case_id=case_obj["_id"]):
@@ -271,29 +281,44 @@ def case_report_content(store, institute_obj, case_obj):
             # Eac variant can belong to multiple categories
             if keyword not in var_obj:
                 continue
-            evaluated_variants[vt].append(var_obj)
+            evaluated_variants[vt].append(var_obj["_id"])
+        report_variants[var_obj["_id"]] = dict(report_variants.get(var_obj["_id"], {}), **var_obj)
+
+    # Each variant is decorated once, with the case level information and the information of
+    # all variants fetched up front
+    prefetched = prefetch_variants_info(
+        store, institute_obj, case_obj, list(report_variants.values())
+    )
+    decorated_variants = {}
+    for var_id, var_obj in report_variants.items():
+        # We decorate the variant with some extra information
+        decorated_info = variant_decorator(
+            store=store,
+            institute_id=institute_obj["_id"],
+            case_name=case_obj["display_name"],
+            variant_id=None,
+            variant_obj=var_obj,
+            add_case=False,
+            add_other=False,
+            get_overlapping=False,
+            add_compounds=False,
+            variant_type=var_obj["category"],
+            institute_obj=institute_obj,
+            case_obj=case_obj,
+            add_events=False,
+            add_evaluations=False,
+            prefetched=prefetched,
+        )
+        decorated_variants[var_id] = decorated_info["variant"]
 
     for var_type in evaluated_variants:
-        decorated_variants = []
-        for var_obj in evaluated_variants[var_type]:
-            # We decorate the variant with some extra information
-            decorated_info = variant_decorator(
-                store=store,
-                institute_id=institute_obj["_id"],
-                case_name=case_obj["display_name"],
-                variant_id=None,
-                variant_obj=var_obj,
-                add_case=False,
-                add_other=False,
-                get_overlapping=False,
-                add_compounds=False,
-                variant_type=var_obj["category"],
-                institute_obj=institute_obj,
-                case_obj=case_obj,
-            )
-            decorated_variants.append(decorated_info["variant"])
         # Add the decorated variants to the case
-        data[var_type] = decorated_variants
+        data[var_type] = [decorated_variants[var_id] for var_id in evaluated_variants[var_type]]
+    # The partial causatives are shown with their associated phenotypes, only in their category
+    data["partial_causatives_detailed"] = [
+        dict(var_obj, phenotypes=case_obj["partial_causatives"][var_obj["_id"]])
+        for var_obj in data["partial_causatives_detailed"]
+    ]
 
     return data
 
@@ -371,11 +396,17 @@ def mt_excel_files(store, case_obj, temp_excel_dir):
         store.variants(case_id=case_obj["_id"], query=query, nr_of_variants=-1, sort_key="position")
     )
 
+    # The gene symbols of the MT variants are fetched once and reused for all samples
+    gene_symbols = GeneSymbolResolver(store, build=case_obj.get("genome_build", "37"))
+    gene_symbols.prefetch(mt_variants, missing_only=True)
+
     written_files = 0
     for sample in samples:
         sample_id = sample["individual_id"]
         display_name = sample["display_name"]
-        sample_lines = export_mt_variants(variants=mt_variants, sample_id=sample_id)
+        sample_lines = export_mt_variants(
+            variants=mt_variants, sample_id=sample_id, gene_symbols=gene_symbols
+        )
 
         # set up document name
         document_name = ".".join([case_obj["display_name"], display_name, today]) + ".xlsx"
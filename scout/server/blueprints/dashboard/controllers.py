@@ -1,10 +1,12 @@
+import datetime
 import logging
+
 from flask_login import current_user
 
 LOG = logging.getLogger(__name__)
 
 
-def get_dashboard_info(adapter, institute_id=None, slice_query=None):
+def get_dashboard_info(adapter, institute_id=None, slice_query=None, use_stats_collection=False):
     """Returns cases with phenotype
 
         If phenotypes are provided search for only those
@@ -13,6 +15,8 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
         adapter(adapter.MongoAdapter)
         institute_id(str): an institute _id
         slice_query(str): query to filter cases to obtain statistics for.
+        use_stats_collection(bool): read statistics without a slice_query from the
+                                    dashboard_stats collection, refreshed when there are new events
 
     Returns:
         data(dict): Dictionary with relevant information
@@ -24,11 +28,14 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
     if institute_id == "None":
         institute_id = None
 
+    if use_stats_collection and not slice_query:
+        return get_stored_dashboard_info(adapter, institute_id=institute_id)
+
     # If a slice_query is present then numbers in "General statistics" and "Case statistics" will
     # reflect the data available for the query
-    general_sliced_info = get_general_case_info(
-        adapter, institute_id=institute_id, slice_query=slice_query
-    )
+    case_query = adapter.cases(owner=institute_id, name_query=slice_query, yield_query=True)
+    case_stats = get_case_stats(adapter, case_query)
+    general_sliced_info = case_stats["general"]
     total_sliced_cases = general_sliced_info["total_cases"]
 
     data = {"total_cases": total_sliced_cases}
@@ -40,13 +47,19 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
         ped_info["percent"] = ped_info["count"] / total_sliced_cases
         data["pedigree"].append(ped_info)
 
-    data["cases"] = get_case_groups(
-        adapter, total_sliced_cases, institute_id=institute_id, slice_query=slice_query
-    )
+    data["cases"] = [{"status": "all", "count": total_sliced_cases, "percent": 1}]
+    for status_group in case_stats["status"]:
+        data["cases"].append(
+            {
+                "status": status_group["_id"],
+                "count": status_group["count"],
+                "percent": status_group["count"] / total_sliced_cases,
+            }
+        )
 
-    data["analysis_types"] = get_analysis_types(
-        adapter, total_sliced_cases, institute_id=institute_id, slice_query=slice_query
-    )
+    data["analysis_types"] = [
+        {"name": group["_id"], "count": group["count"]} for group in case_stats["analysis_types"]
+    ]
 
     overview = [
         {
@@ -73,48 +86,12 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
 
     # Data from "Variant statistics tab" is not filtered by slice_query and numbers will
     # reflect verified variants in all available cases for an institute
-    general_info = get_general_case_info(adapter, institute_id=institute_id)
-    total_cases = general_info["total_cases"]
-    sliced_case_ids = general_sliced_info["case_ids"]
-    verified_query = {
-        "verb": {"$in": ["validate", "sanger"]},
-    }
-    if institute_id:  # filter by institute if users wishes so
-        verified_query["institute"] = institute_id
-
-    # Case level information
-    sliced_validation_cases = set()
-    sliced_validated_cases = set()
-
-    # Variant level information
-    validated_tp = set()
-    validated_fp = set()
-    var_valid_orders = (
-        0  # use this counter to count 'True Positive', 'False positive' and 'Not validated' vars
-    )
-
-    validate_events = adapter.event_collection.find(verified_query)
-    for validate_event in list(validate_events):
-        case_id = validate_event.get("case")
-        var_obj = adapter.variant(case_id=case_id, document_id=validate_event["variant_id"])
-        if var_obj:  # Don't take into account variants which have been removed from db
-            var_valid_orders += 1
-            if case_id in sliced_case_ids:
-                sliced_validation_cases.add(
-                    case_id
-                )  # add to the set. Can't add same id twice since it'a a set
-
-            validation = var_obj.get("validation")
-            if validation and validation in ["True positive", "False positive"]:
-                if case_id in sliced_case_ids:
-                    sliced_validated_cases.add(case_id)
-                if validation == "True positive":
-                    validated_tp.add(var_obj["_id"])
-                elif validation == "False positive":
-                    validated_fp.add(var_obj["_id"])
-
-    n_validation_cases = len(sliced_validation_cases)
-    n_validated_cases = len(sliced_validated_cases)
+    validation_info = get_validation_info(adapter, case_query, institute_id=institute_id)
+    n_validation_cases = len(validation_info["sliced_validation_cases"])
+    n_validated_cases = len(validation_info["sliced_validated_cases"])
+    validated_tp = validation_info["validated_tp"]
+    validated_fp = validation_info["validated_fp"]
+    var_valid_orders = validation_info["var_valid_orders"]
 
     # append
     overview.append(
@@ -135,7 +112,6 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
     data["overview"] = overview
 
     variants = []
-    nr_validated = len(validated_tp) + len(validated_fp)
     variants.append({"title": "Validation ordered", "count": var_valid_orders, "percent": 1})
 
     # taking into account that var_valid_orders might be 0:
@@ -166,28 +142,120 @@ def get_dashboard_info(adapter, institute_id=None, slice_query=None):
     return data
 
 
-def get_general_case_info(adapter, institute_id=None, slice_query=None):
-    """Return general information about cases
+def get_stored_dashboard_info(adapter, institute_id=None):
+    """Return the dashboard information of an institute from the dashboard_stats collection
+
+    The stored information is recomputed when events or case updates have been added after it
+    was stored, so the dashboard is read with a few indexed queries when nothing has changed.
 
     Args:
         adapter(adapter.MongoAdapter)
-        institute_id(str)
-        slice_query(str): Query to filter cases to obtain statistics for.
+        institute_id(str): an institute _id, None for all institutes
 
     Returns:
-        general(dict)
+        data(dict): Dictionary with relevant information
     """
-    general = {}
+    stats_id = institute_id or "all"
+    stats_obj = adapter.dashboard_stats_collection.find_one({"_id": stats_id})
+    if stats_obj and not has_new_events(adapter, stats_obj["updated_at"], institute_id):
+        LOG.debug("Use stored dashboard statistics for %s", stats_id)
+        return stats_obj["data"]
+
+    # Set before the statistics are computed to not miss events added meanwhile
+    updated_at = datetime.datetime.now()
+    data = get_dashboard_info(adapter, institute_id=institute_id)
+    adapter.dashboard_stats_collection.replace_one(
+        {"_id": stats_id},
+        {"_id": stats_id, "data": data, "updated_at": updated_at},
+        upsert=True,
+    )
+    LOG.info("Stored dashboard statistics for %s", stats_id)
+    return data
 
-    # Potentially sensitive slice queries are assumed allowed if we have got this far
-    name_query = slice_query
 
-    cases = adapter.cases(owner=institute_id, name_query=name_query)
+def has_new_events(adapter, since, institute_id=None):
+    """Check if there are events or updated cases after a point in time
 
-    phenotype_cases = 0
-    causative_cases = 0
-    pinned_cases = 0
-    cohort_cases = 0
+    Args:
+        adapter(adapter.MongoAdapter)
+        since(datetime.datetime)
+        institute_id(str): an institute _id, None for all institutes
+
+    Returns:
+        bool
+    """
+    event_query = {"created_at": {"$gt": since}}
+    case_query = {"updated_at": {"$gt": since}}
+    if institute_id:
+        event_query["institute"] = institute_id
+        case_query["owner"] = institute_id
+
+    if adapter.event_collection.find_one(event_query, {"_id": 1}):
+        return True
+    return adapter.case_collection.find_one(case_query, {"_id": 1}) is not None
+
+
+def get_case_stats(adapter, case_query):
+    """Return the general information, status and analysis type groups of cases
+
+    All statistics are collected in one aggregation.
+
+    Args:
+        adapter(adapter.MongoAdapter)
+        case_query(dict): Query for the cases to obtain statistics for
+
+    Returns:
+        case_stats(dict): with keys "general", "status" and "analysis_types"
+    """
+
+    def nr_non_empty(field):
+        """Count cases where an array field is not empty"""
+        size = {"$size": {"$ifNull": ["$" + field, []]}}
+        return {"$sum": {"$cond": [{"$gt": [size, 0]}, 1, 0]}}
+
+    pipeline = [
+        {"$match": case_query},
+        {
+            "$facet": {
+                "general": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_cases": {"$sum": 1},
+                            "phenotype_cases": nr_non_empty("phenotype_terms"),
+                            "causative_cases": nr_non_empty("causatives"),
+                            "pinned_cases": nr_non_empty("suspects"),
+                            "cohort_cases": nr_non_empty("cohorts"),
+                        }
+                    }
+                ],
+                "pedigree": [
+                    {
+                        "$group": {
+                            "_id": {"$size": {"$ifNull": ["$individuals", []]}},
+                            "count": {"$sum": 1},
+                        }
+                    }
+                ],
+                "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "analysis_types": [
+                    {"$unwind": "$individuals"},
+                    {"$group": {"_id": "$individuals.analysis_type", "count": {"$sum": 1}}},
+                ],
+            }
+        },
+    ]
+    facets = next(adapter.case_collection.aggregate(pipeline))
+
+    general = {
+        "total_cases": 0,
+        "phenotype_cases": 0,
+        "causative_cases": 0,
+        "pinned_cases": 0,
+        "cohort_cases": 0,
+    }
+    for general_info in facets["general"]:
+        general.update({key: general_info[key] for key in general})
 
     pedigree = {
         1: {"title": "Single", "count": 0},
@@ -195,117 +263,114 @@ def get_general_case_info(adapter, institute_id=None, slice_query=None):
         3: {"title": "Trio", "count": 0},
         "many": {"title": "Many", "count": 0},
     }
-
-    case_ids = set()
-
-    total_cases = 0
-    for total_cases, case in enumerate(cases, 1):
-        case_ids.add(case["_id"])
-        if case.get("phenotype_terms"):
-            phenotype_cases += 1
-        if case.get("causatives"):
-            causative_cases += 1
-        if case.get("suspects"):
-            pinned_cases += 1
-        if case.get("cohorts"):
-            cohort_cases += 1
-
-        nr_individuals = len(case.get("individuals", []))
+    for ped_group in facets["pedigree"]:
+        nr_individuals = ped_group["_id"]
         if nr_individuals == 0:
             continue
         if nr_individuals > 3:
-            pedigree["many"]["count"] += 1
+            pedigree["many"]["count"] += ped_group["count"]
         else:
-            pedigree[nr_individuals]["count"] += 1
-
-    general["total_cases"] = total_cases
-    general["phenotype_cases"] = phenotype_cases
-    general["causative_cases"] = causative_cases
-    general["pinned_cases"] = pinned_cases
-    general["cohort_cases"] = cohort_cases
+            pedigree[nr_individuals]["count"] += ped_group["count"]
     general["pedigree"] = pedigree
-    general["case_ids"] = case_ids
 
-    return general
-
-
-def get_case_groups(adapter, total_cases, institute_id=None, slice_query=None):
-    """Return the information about case groups
+    return {
+        "general": general,
+        "status": facets["status"],
+        "analysis_types": facets["analysis_types"],
+    }
 
-    Args:
-        store(adapter.MongoAdapter)
-        total_cases(int): Total number of cases
-        slice_query(str): Query to filter cases to obtain statistics for.
 
-    Returns:
-        cases(dict):
-    """
-    # Create a group with all cases in the database
-    cases = [{"status": "all", "count": total_cases, "percent": 1}]
-    # Group the cases based on their status
-    pipeline = []
-    group = {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-
-    subquery = {}
-    if institute_id and slice_query:
-        subquery = adapter.cases(owner=institute_id, name_query=slice_query, yield_query=True)
-    elif institute_id:
-        subquery = adapter.cases(owner=institute_id, yield_query=True)
-    elif slice_query:
-        subquery = adapter.cases(name_query=slice_query, yield_query=True)
-
-    query = {"$match": subquery} if subquery else {}
-
-    if query:
-        pipeline.append(query)
-
-    pipeline.append(group)
-    res = adapter.case_collection.aggregate(pipeline)
-
-    for status_group in res:
-        cases.append(
-            {
-                "status": status_group["_id"],
-                "count": status_group["count"],
-                "percent": status_group["count"] / total_cases,
-            }
-        )
+def get_validation_info(adapter, case_query, institute_id=None):
+    """Return information about variants ordered for validation and their outcome
 
-    return cases
+    Validation orders are grouped by case and variant in one aggregation, and the variants that
+    are still in the database are fetched with one query.
 
-
-def get_analysis_types(adapter, total_cases, institute_id=None, slice_query=None):
-    """Return information about analysis types.
-        Group cases based on analysis type for the individuals.
     Args:
         adapter(adapter.MongoAdapter)
-        total_cases(int): Total number of cases
+        case_query(dict): Query for the cases to count validation cases for
         institute_id(str)
-        slice_query(str): Query to filter cases to obtain statistics for.
-    Returns:
-        analysis_types array of hashes with name: analysis_type(str), count: count(int)
 
+    Returns:
+        validation_info(dict)
     """
-    # Group cases based on analysis type of the individuals
-    query = {}
+    verified_query = {
+        "verb": {"$in": ["validate", "sanger"]},
+    }
+    if institute_id:  # filter by institute if users wishes so
+        verified_query["institute"] = institute_id
 
-    subquery = {}
-    if institute_id and slice_query:
-        subquery = adapter.cases(owner=institute_id, name_query=slice_query, yield_query=True)
-    elif institute_id:
-        subquery = adapter.cases(owner=institute_id, yield_query=True)
-    elif slice_query:
-        subquery = adapter.cases(name_query=slice_query, yield_query=True)
+    nr_orders = {}
+    for order_group in adapter.event_collection.aggregate(
+        [
+            {"$match": verified_query},
+            {
+                "$group": {
+                    "_id": {"case": "$case", "variant_id": "$variant_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+    ):
+        nr_orders[(order_group["_id"]["case"], order_group["_id"]["variant_id"])] = order_group[
+            "count"
+        ]
+
+    # Don't take into account variants which have been removed from db
+    ordered_variants = {}
+    if nr_orders:
+        variant_query = {
+            "case_id": {"$in": list({case_id for case_id, _ in nr_orders})},
+            "variant_id": {"$in": list({variant_id for _, variant_id in nr_orders})},
+        }
+        projection = {"case_id": 1, "variant_id": 1, "variant_type": 1, "validation": 1}
+        for var_obj in adapter.variant_collection.find(variant_query, projection):
+            key = (var_obj["case_id"], var_obj["variant_id"])
+            if key not in nr_orders:
+                continue
+            # Prefer the clinical variant if the research variant is also loaded
+            if key not in ordered_variants or var_obj.get("variant_type") == "clinical":
+                ordered_variants[key] = var_obj
+
+    # Cases with ordered variants that are part of the queried cases
+    sliced_case_ids = set()
+    if ordered_variants:
+        ordered_case_ids = {"_id": {"$in": list({case_id for case_id, _ in ordered_variants})}}
+        sliced_case_ids = set(
+            adapter.case_collection.distinct(
+                "_id", {"$and": [case_query, ordered_case_ids]} if case_query else ordered_case_ids
+            )
+        )
 
-    query = {"$match": subquery}
+    # Case level information
+    sliced_validation_cases = set()
+    sliced_validated_cases = set()
 
-    pipeline = []
-    if query:
-        pipeline.append(query)
+    # Variant level information
+    validated_tp = set()
+    validated_fp = set()
+    var_valid_orders = (
+        0  # use this counter to count 'True Positive', 'False positive' and 'Not validated' vars
+    )
 
-    pipeline.append({"$unwind": "$individuals"})
-    pipeline.append({"$group": {"_id": "$individuals.analysis_type", "count": {"$sum": 1}}})
-    analysis_query = adapter.case_collection.aggregate(pipeline)
-    analysis_types = [{"name": group["_id"], "count": group["count"]} for group in analysis_query]
+    for (case_id, _), var_obj in ordered_variants.items():
+        var_valid_orders += nr_orders[(case_id, var_obj["variant_id"])]
+        if case_id in sliced_case_ids:
+            sliced_validation_cases.add(case_id)
 
-    return analysis_types
+        validation = var_obj.get("validation")
+        if validation and validation in ["True positive", "False positive"]:
+            if case_id in sliced_case_ids:
+                sliced_validated_cases.add(case_id)
+            if validation == "True positive":
+                validated_tp.add(var_obj["_id"])
+            elif validation == "False positive":
+                validated_fp.add(var_obj["_id"])
+
+    return {
+        "sliced_validation_cases": sliced_validation_cases,
+        "sliced_validated_cases": sliced_validated_cases,
+        "validated_tp": validated_tp,
+        "validated_fp": validated_fp,
+        "var_valid_orders": var_valid_orders,
+    }
@@ -74,7 +74,12 @@ def index():
 
     LOG.info("Fetch all cases with institute: %s", institute_id)
 
-    data = get_dashboard_info(store, institute_id, slice_query)
+    data = get_dashboard_info(
+        store,
+        institute_id,
+        slice_query,
+        use_stats_collection=current_app.config.get("DASHBOARD_STATS_COLLECTION", False),
+    )
     data["institutes"] = institutes
     data["choice"] = institute_id
     total_cases = data["total_cases"]
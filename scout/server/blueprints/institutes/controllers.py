@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime
+import itertools
 import logging
 
 LOG = logging.getLogger(__name__)
@@ -8,7 +9,6 @@ from flask_login import current_user
 from flask import flash
 from scout.constants import CASE_STATUSES
 from scout.parse.clinvar import clinvar_submission_header, clinvar_submission_lines
-from scout.server.blueprints.genes.controllers import gene
 from scout.server.blueprints.variant.utils import predictions
 from scout.server.extensions import store
 from scout.server.utils import user_institutes
@@ -125,40 +125,24 @@ def update_institute_settings(store, institute_obj, form):
 def cases(store, case_query, prioritized_cases_query=None, limit=100):
     """Preprocess case objects.
 
-    Add the necessary information to display the 'cases' view
+    Add the necessary information to display the 'cases' view. The assignees and the clinvar
+    submission variants of all cases are fetched with one query each.
 
     Args:
         store(adapter.MongoAdapter)
-        case_query(pymongo.Cursor)
-        prioritized_cases_query(pymongo.Cursor)
+        case_query(iterable(dict)): cases, like the result of store.cases_overview
+        prioritized_cases_query(iterable(dict))
         limit(int): Maximum number of cases to display
 
     Returns:
         data(dict): includes the cases, how many there are and the limit.
     """
     case_groups = {status: [] for status in CASE_STATUSES}
-    nr_cases = 0
 
-    # local function to add info to case obj
-    def populate_case_obj(case_obj):
-        analysis_types = set(ind["analysis_type"] for ind in case_obj["individuals"])
-        LOG.debug("Analysis types found in %s: %s", case_obj["_id"], ",".join(analysis_types))
-        if len(analysis_types) > 1:
-            LOG.debug("Set analysis types to {'mixed'}")
-            analysis_types = set(["mixed"])
-
-        case_obj["analysis_types"] = list(analysis_types)
-        case_obj["assignees"] = [
-            store.user(user_email) for user_email in case_obj.get("assignees", [])
-        ]
-        case_obj["is_rerun"] = len(case_obj.get("analyses", [])) > 0
-        case_obj["clinvar_variants"] = store.case_to_clinVars(case_obj["_id"])
-        case_obj["display_track"] = TRACKS[case_obj.get("track", "rare")]
-        return case_obj
-
-    for nr_cases, case_obj in enumerate(case_query.limit(limit), 1):
-        case_obj = populate_case_obj(case_obj)
+    case_objs = list(itertools.islice(case_query, limit))
+    for case_obj in case_objs:
         case_groups[case_obj["status"]].append(case_obj)
+    nr_cases = len(case_objs)
 
     if prioritized_cases_query:
         extra_prioritized = 0
@@ -170,11 +154,32 @@ def cases(store, case_query, prioritized_cases_query=None, limit=100):
                 continue
             else:
                 extra_prioritized += 1
-                case_obj = populate_case_obj(case_obj)
+                case_objs.append(case_obj)
                 case_groups[case_obj["status"]].append(case_obj)
         # extra prioritized cases are potentially shown in addition to the case query limit
         nr_cases += extra_prioritized
 
+    users = store.users_by_emails(
+        user_email for case_obj in case_objs for user_email in case_obj.get("assignees", [])
+    )
+    clinvars = store.cases_to_clinVars(case_obj["_id"] for case_obj in case_objs)
+
+    # add info to case objs
+    for case_obj in case_objs:
+        analysis_types = set(ind["analysis_type"] for ind in case_obj["individuals"])
+        LOG.debug("Analysis types found in %s: %s", case_obj["_id"], ",".join(analysis_types))
+        if len(analysis_types) > 1:
+            LOG.debug("Set analysis types to {'mixed'}")
+            analysis_types = set(["mixed"])
+
+        case_obj["analysis_types"] = list(analysis_types)
+        case_obj["assignees"] = [
+            users.get(user_email) for user_email in case_obj.get("assignees", [])
+        ]
+        case_obj["is_rerun"] = len(case_obj.get("analyses", [])) > 0
+        case_obj["clinvar_variants"] = clinvars[case_obj["_id"]]
+        case_obj["display_track"] = TRACKS[case_obj.get("track", "rare")]
+
     data = {
         "cases": [(status, case_groups[status]) for status in CASE_STATUSES],
         "found_cases": nr_cases,
@@ -200,6 +205,82 @@ def populate_case_filter_form(params):
     return form
 
 
+class LookupMemo(object):
+    """Cases and genes needed to build one page, each fetched from the database only once"""
+
+    def __init__(self, store, case_projection=None):
+        """
+        Args:
+            store(adapter.MongoAdapter)
+            case_projection(dict): the case fields to fetch, default all fields
+        """
+        self.store = store
+        self.case_projection = case_projection
+        # {<case_id>: case_obj}, None for missing cases
+        self._cases = {}
+        # {(<build>, <hgnc_id>): gene_obj}, None for missing genes
+        self._genes = {}
+
+    def cases(self, case_ids):
+        """Return a group of cases, fetching the ones not already seen with one query
+
+        Args:
+            case_ids(iterable(str))
+
+        Returns:
+            cases(dict): {<case_id>: case_obj}, without missing cases
+        """
+        case_ids = set(case_ids)
+        missing = [case_id for case_id in case_ids if case_id not in self._cases]
+        if missing:
+            fetched = self.store.cases_by_ids(missing, projection=self.case_projection)
+            for case_id in missing:
+                self._cases[case_id] = fetched.get(case_id)
+        return {
+            case_id: self._cases[case_id]
+            for case_id in case_ids
+            if self._cases[case_id] is not None
+        }
+
+    def case(self, case_id):
+        """Return a case, or None if it does not exist"""
+        return self.cases([case_id]).get(case_id)
+
+    def genes(self, hgnc_ids, build="37"):
+        """Return a group of genes without transcripts, fetching the ones not already seen
+
+        Args:
+            hgnc_ids(iterable(int))
+            build(str)
+
+        Returns:
+            genes(dict): {<hgnc_id>: gene_obj}, without missing genes
+        """
+        hgnc_ids = {hgnc_id for hgnc_id in hgnc_ids if hgnc_id}
+        missing = [hgnc_id for hgnc_id in hgnc_ids if (build, hgnc_id) not in self._genes]
+        if missing:
+            fetched = self.store.hgnc_genes_by_ids(missing, build=build, add_transcripts=False)
+            for hgnc_id in missing:
+                self._genes[(build, hgnc_id)] = fetched.get(hgnc_id)
+        return {
+            hgnc_id: self._genes[(build, hgnc_id)]
+            for hgnc_id in hgnc_ids
+            if self._genes[(build, hgnc_id)] is not None
+        }
+
+    def gene(self, hgnc_id, build="37"):
+        """Return a gene without transcripts, or None if it does not exist in the build"""
+        return self.genes([hgnc_id], build=build).get(hgnc_id)
+
+    def gene_symbol(self, hgnc_id, build="37"):
+        """Return the symbol of a gene, looked up in the other build if it is missing in this one"""
+        for gene_build in [build] + [other for other in ["37", "38"] if other != build]:
+            gene_obj = self.gene(hgnc_id, build=gene_build)
+            if gene_obj:
+                return gene_obj["hgnc_symbol"]
+        return None
+
+
 def get_sanger_unevaluated(store, institute_id, user_id):
     """Get all variants for an institute having Sanger validations ordered but still not evaluated
 
@@ -212,52 +293,10 @@ def get_sanger_unevaluated(store, institute_id, user_id):
                      where the keys are case_ids and the values are lists of variants with Sanger ordered but not yet validated
 
     """
-
-    # Retrieve a list of ids for variants with Sanger ordered grouped by case from the 'event' collection
-    # This way is much faster than querying over all variants in all cases of an institute
-    sanger_ordered_by_case = store.sanger_ordered(institute_id, user_id)
+    # The variants, the events ordering Sanger and the cases are joined in the database
     unevaluated = []
-
-    # for each object where key==case and value==[variant_id with Sanger ordered]
-    for item in sanger_ordered_by_case:
-        case_id = item["_id"]
-        # Get the case to collect display name
-        case_obj = store.case(case_id=case_id)
-
-        if not case_obj:  # the case might have been removed
-            continue
-
-        case_display_name = case_obj.get("display_name")
-
-        # List of variant document ids
-        varid_list = item["vars"]
-
-        unevaluated_by_case = {}
-        unevaluated_by_case[case_display_name] = []
-
-        for var_id in varid_list:
-            # For each variant with sanger validation ordered
-            variant_obj = store.variant(document_id=var_id, case_id=case_id)
-
-            # Double check that Sanger was ordered (and not canceled) for the variant
-            if (
-                variant_obj is None
-                or variant_obj.get("sanger_ordered") is None
-                or variant_obj.get("sanger_ordered") is False
-            ):
-                continue
-
-            validation = variant_obj.get("validation", "not_evaluated")
-
-            # Check that the variant is not evaluated
-            if validation in ["True positive", "False positive"]:
-                continue
-
-            unevaluated_by_case[case_display_name].append(variant_obj["_id"])
-
-        # If for a case there is at least one Sanger validation to evaluate add the object to the unevaluated objects list
-        if len(unevaluated_by_case[case_display_name]) > 0:
-            unevaluated.append(unevaluated_by_case)
+    for item in store.sanger_unevaluated(institute_id, user_id):
+        unevaluated.append({item["display_name"]: item["vars"]})
 
     return unevaluated
 
@@ -269,14 +308,31 @@ def gene_variants(store, variants_query, institute_id, page=1, per_page=50):
     variant_count = variants_query.count()
     skip_count = per_page * max(page - 1, 0)
     more_variants = True if variant_count > (skip_count + per_page) else False
-    variant_res = variants_query.skip(skip_count).limit(per_page)
+    variant_res = list(variants_query.skip(skip_count).limit(per_page))
 
     my_institutes = set(inst["_id"] for inst in user_institutes(store, current_user))
 
+    # Fetch the cases of the variants and the genes of each build with one query each
+    memo = LookupMemo(
+        store,
+        case_projection={"display_name": 1, "owner": 1, "collaborators": 1, "genome_build": 1},
+    )
+    variant_cases = memo.cases(variant_obj["case_id"] for variant_obj in variant_res)
+    build_genes = {}
+    for variant_obj in variant_res:
+        variant_case_obj = variant_cases.get(variant_obj["case_id"])
+        if not variant_case_obj:
+            continue
+        build_genes.setdefault(get_genome_build(variant_case_obj), set()).update(
+            gene_obj.get("hgnc_id") for gene_obj in variant_obj.get("genes") or []
+        )
+    for genome_build, hgnc_ids in build_genes.items():
+        memo.genes(hgnc_ids, build=genome_build)
+
     variants = []
     for variant_obj in variant_res:
         # Populate variant case_display_name
-        variant_case_obj = store.case(case_id=variant_obj["case_id"])
+        variant_case_obj = variant_cases.get(variant_obj["case_id"])
         if not variant_case_obj:
             # A variant with missing case was encountered
             continue
@@ -292,16 +348,19 @@ def gene_variants(store, variants_query, institute_id, page=1, per_page=50):
 
         genome_build = get_genome_build(variant_case_obj)
         variant_genes = variant_obj.get("genes")
-        gene_object = update_HGNC_symbols(store, variant_genes, genome_build)
+        gene_object = update_HGNC_symbols(store, variant_genes, genome_build, memo=memo)
 
         # Populate variant HGVS and predictions
         variant_genes = variant_obj.get("genes")
         hgvs_c = []
         hgvs_p = []
+        gene_symbols = []
         if variant_genes is not None:
             for gene_obj in variant_genes:
                 hgnc_id = gene_obj["hgnc_id"]
-                gene_symbol = gene(store, hgnc_id)["symbol"]
+                gene_symbol = memo.gene_symbol(hgnc_id, build=genome_build) or gene_obj.get(
+                    "hgnc_symbol"
+                )
                 gene_symbols = [gene_symbol]
 
                 # gather HGVS info from gene transcripts
@@ -448,8 +507,15 @@ def clinvar_lines(clinvar_objects, clinvar_header_obj):
     return clinvar_lines
 
 
-def update_HGNC_symbols(store, variant_genes, genome_build):
+def update_HGNC_symbols(store, variant_genes, genome_build, memo=None):
     """Update the HGNC symbols if they are not set
+
+    Args:
+        store(adapter.MongoAdapter)
+        variant_genes(list(dict))
+        genome_build(str)
+        memo(LookupMemo): genes already fetched for the page, used instead of single gene queries
+
     Returns:
         gene_object()"""
 
@@ -460,7 +526,10 @@ def update_HGNC_symbols(store, variant_genes, genome_build):
                 continue
             # Else we collect the gene object and check the id
             if gene_obj.get("hgnc_symbol") is None or gene_obj.get("description") is None:
-                hgnc_gene = store.hgnc_gene(gene_obj["hgnc_id"], build=genome_build)
+                if memo:
+                    hgnc_gene = memo.gene(gene_obj["hgnc_id"], build=genome_build)
+                else:
+                    hgnc_gene = store.hgnc_gene(gene_obj["hgnc_id"], build=genome_build)
                 if not hgnc_gene:
                     continue
                 gene_obj["hgnc_symbol"] = hgnc_gene["hgnc_symbol"]
@@ -83,30 +83,31 @@ def cases(institute_id):
 
     skip_assigned = request.args.get("skip_assigned")
     is_research = request.args.get("is_research")
-    all_cases = store.cases(
+    case_query = store.cases(
         collaborator=institute_id,
         name_query=name_query,
         skip_assigned=skip_assigned,
         is_research=is_research,
+        yield_query=True,
     )
     form = controllers.populate_case_filter_form(request.args)
 
     sort_by = request.args.get("sort")
     sort_order = request.args.get("order") or "asc"
-    if sort_by:
+    sort = {"updated_at": pymongo.DESCENDING}
+    if sort_by in ["analysis_date", "track", "status"]:
         pymongo_sort = pymongo.ASCENDING
         if sort_order == "desc":
             pymongo_sort = pymongo.DESCENDING
-        if sort_by == "analysis_date":
-            all_cases.sort("analysis_date", pymongo_sort)
-        elif sort_by == "track":
-            all_cases.sort("track", pymongo_sort)
-        elif sort_by == "status":
-            all_cases.sort("status", pymongo_sort)
+        sort = {sort_by: pymongo_sort}
 
     LOG.debug("Prepare all cases")
+    all_cases = store.cases_overview(case_query, sort=sort, limit=limit)
 
-    prioritized_cases = store.prioritized_cases(institute_id=institute_id)
+    prioritized_cases = store.cases_overview(
+        store.cases(collaborator=institute_id, status="prioritized", yield_query=True),
+        sort={"updated_at": pymongo.DESCENDING},
+    )
 
     data = controllers.cases(store, all_cases, prioritized_cases, limit)
     data["sort_order"] = sort_order
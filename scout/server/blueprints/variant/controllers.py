@@ -53,6 +53,9 @@ def variant(
     variant_type=None,
     case_obj=None,
     institute_obj=None,
+    add_events=True,
+    add_evaluations=True,
+    prefetched=None,
 ):
     """Pre-process a single variant for the detailed variant view.
 
@@ -72,6 +75,10 @@ def variant(
         variant_category(str): ["snv", "str", "sv", "cancer", "cancer_sv"]
         institute_obj(scout.models.Institute)
         case_obj(scout.models.Case)
+        add_events(bool): If the events of the variant should be collected
+        add_evaluations(bool): If the ACMG evaluations of the variant should be collected
+        prefetched(dict): Information fetched for a group of variants of the case,
+                          see prefetch_variants_info
 
     Returns:
         variant_info(dict): {
@@ -105,25 +112,31 @@ def variant(
 
     variant_id = variant_obj["variant_id"]
 
-    genome_build = str(case_obj.get("genome_build", "37"))
-    if genome_build not in ["37", "38"]:
-        genome_build = "37"
-
-    panels = default_panels(store, case_obj)
-    variant_obj = add_gene_info(store, variant_obj, gene_panels=panels, genome_build=genome_build)
+    genome_build = case_genome_build(case_obj)
+    if prefetched is None:
+        prefetched = prefetch_variants_info(store, institute_obj, case_obj, [variant_obj])
+
+    variant_obj = add_gene_info(
+        store,
+        variant_obj,
+        gene_panels=prefetched["panels"],
+        genome_build=genome_build,
+        genes=prefetched["genes"],
+        disease_terms=prefetched["disease_terms"],
+    )
     # Add information about bam files and create a region vcf
     if add_case:
         variant_case(store, case_obj, variant_obj)
 
     # Collect all the events for the variant
-    events = store.events(institute_obj, case=case_obj, variant_id=variant_id)
-    for event in events:
-        event["verb"] = VERBS_MAP[event["verb"]]
+    events = []
+    if add_events:
+        events = store.events(institute_obj, case=case_obj, variant_id=variant_id)
+        for event in events:
+            event["verb"] = VERBS_MAP[event["verb"]]
 
     # Comments are not on case level so these needs to be fetched on their own
-    variant_obj["comments"] = store.events(
-        institute_obj, case=case_obj, variant_id=variant_id, comments=True
-    )
+    variant_obj["comments"] = prefetched["comments"].get(variant_id, [])
 
     # Adds information about other causative variants
     other_causatives = []
@@ -181,11 +194,12 @@ def variant(
         variant_obj["acmg_classification"] = ACMG_COMPLETE_MAP[acmg_code]
 
     evaluations = []
-    for evaluation_obj in store.get_evaluations(variant_obj):
-        evaluation(store, evaluation_obj)
-        evaluations.append(evaluation_obj)
+    if add_evaluations:
+        for evaluation_obj in store.get_evaluations(variant_obj):
+            evaluation(store, evaluation_obj)
+            evaluations.append(evaluation_obj)
 
-    case_clinvars = store.case_to_clinVars(case_obj.get("display_name"))
+    case_clinvars = prefetched["case_clinvars"]
 
     if variant_id in case_clinvars:
         variant_obj["clinvar_clinsig"] = case_clinvars.get(variant_id)["clinsig"]
@@ -221,6 +235,54 @@ def variant(
     }
 
 
+def case_genome_build(case_obj):
+    """Return the genome build of a case, '37' if it is not set or not supported"""
+    genome_build = str(case_obj.get("genome_build", "37"))
+    if genome_build not in ["37", "38"]:
+        genome_build = "37"
+    return genome_build
+
+
+def prefetch_variants_info(store, institute_obj, case_obj, variant_objs):
+    """Fetch the information that is added to a group of variants of a case with a few bulk queries
+
+    The default panels and the ClinVar submissions of the case are fetched once, and the genes,
+    disease terms and comments of all variants with one query each.
+
+    Args:
+        store(scout.adapter.MongoAdapter)
+        institute_obj(scout.models.Institute)
+        case_obj(scout.models.Case)
+        variant_objs(list(scout.models.Variant))
+
+    Returns:
+        prefetched(dict): {
+            'panels': list(dict),
+            'genes': {<hgnc_id>: hgnc_gene},
+            'disease_terms': {<hgnc_id>: list(dict)},
+            'comments': {<variant_id>: list(event)},
+            'case_clinvars': {<variant_id>: clinvar submission variant},
+        }
+    """
+    genes = store.hgnc_genes_by_ids(
+        {
+            variant_gene["hgnc_id"]
+            for variant_obj in variant_objs
+            for variant_gene in variant_obj.get("genes", [])
+        },
+        build=case_genome_build(case_obj),
+    )
+    return {
+        "panels": default_panels(store, case_obj),
+        "genes": genes,
+        "disease_terms": store.disease_terms_by_genes(genes),
+        "comments": store.variants_comments(
+            institute_obj, case_obj, {variant_obj["variant_id"] for variant_obj in variant_objs}
+        ),
+        "case_clinvars": store.case_to_clinVars(case_obj.get("display_name")),
+    }
+
+
 def observations(store, loqusdb, case_obj, variant_obj):
     """Query observations for a variant.
 
@@ -264,10 +326,11 @@ def observations(store, loqusdb, case_obj, variant_obj):
 
     institute_id = variant_obj["institute"]
     institute_obj = store.institute(institute_id)
-    obs_data = loqusdb.get_variant(variant_query, loqusdb_id=institute_obj.get("loqusdb_id")) or {}
+    loqusdb_id = institute_obj.get("loqusdb_id")
+    obs_data = loqusdb.get_variant(variant_query, loqusdb_id=loqusdb_id) or {}
     if not obs_data:
         LOG.debug("Could not find any observations for %s", composite_id)
-        obs_data["total"] = loqusdb.case_count()
+        obs_data["total"] = loqusdb.case_count(loqusdb_id=loqusdb_id)
         return obs_data
 
     user_institutes_ids = set([inst["_id"] for inst in user_institutes(store, current_user)])
@@ -121,7 +121,9 @@ def update_transcripts_information(variant_gene, hgnc_gene, variant_obj, genome_
     variant_gene["primary_transcripts"] = refseq_transcripts
 
 
-def add_gene_info(store, variant_obj, gene_panels=None, genome_build=None):
+def add_gene_info(
+    store, variant_obj, gene_panels=None, genome_build=None, genes=None, disease_terms=None
+):
     """Adds information to variant genes from hgnc genes and gene panels.
 
     Variants are annotated with gene and transcript information from VEP. In Scout the database
@@ -137,12 +139,22 @@ def add_gene_info(store, variant_obj, gene_panels=None, genome_build=None):
         variant_obj(dict): A variant from the database
         gene_panels(list(dict)): List of panels from database
         genome_build(str)
+        genes(dict): Prefetched genes, {<hgnc_id>: gene_obj}, see store.hgnc_genes_by_ids
+        disease_terms(dict): Prefetched disease terms, {<hgnc_id>: list(dict)}
 
     Returns:
         variant_obj
     """
     gene_panels = gene_panels or []
     genome_build = genome_build or "37"
+    # Fetch the genes and disease terms of all variant genes at once
+    if genes is None:
+        genes = store.hgnc_genes_by_ids(
+            [variant_gene["hgnc_id"] for variant_gene in variant_obj.get("genes", [])],
+            build=genome_build,
+        )
+    if disease_terms is None:
+        disease_terms = store.disease_terms_by_genes(genes)
 
     # Add a variable that checks if there are any refseq transcripts
 
@@ -164,7 +176,7 @@ def add_gene_info(store, variant_obj, gene_panels=None, genome_build=None):
     for variant_gene in variant_obj.get("genes", []):
         hgnc_id = variant_gene["hgnc_id"]
         # Get the hgnc_gene
-        hgnc_gene = store.hgnc_gene(hgnc_id, build=genome_build)
+        hgnc_gene = genes.get(hgnc_id)
 
         if not hgnc_gene:
             continue
@@ -190,8 +202,7 @@ def add_gene_info(store, variant_obj, gene_panels=None, genome_build=None):
             variant_obj["disease_associated_transcripts"].append(transcript_str)
 
         # Add the associated disease terms
-        disease_terms = store.disease_terms(hgnc_id)
-        variant_gene["disease_terms"] = disease_terms
+        variant_gene["disease_terms"] = disease_terms.get(hgnc_id, [])
 
         all_models = all_models.union(set(variant_gene["manual_inheritance"]))
         omim_models = set()
@@ -1,4 +1,6 @@
+import base64
 import datetime
+import json
 import logging
 import os.path
 import urllib.parse
@@ -8,6 +10,7 @@ from pprint import pprint as pp
 from flask import Response, flash, request, url_for, session
 from flask_login import current_user
 from flask_mail import Message
+from pymongo.errors import PyMongoError
 from werkzeug.datastructures import Headers, MultiDict
 from xlsxwriter import Workbook
 
@@ -26,9 +29,13 @@ from scout.constants import (
     VERBS_MAP,
 )
 from scout.constants.acmg import ACMG_CRITERIA
-from scout.constants.variants_export import EXPORT_HEADER, VERIFIED_VARIANTS_HEADER
+from scout.constants.variants_export import (
+    EXPORT_HEADER,
+    EXPORT_PROJECTION,
+    VERIFIED_VARIANTS_HEADER,
+)
+from scout.export.gene import GeneSymbolResolver
 from scout.export.variant import export_verified_variants
-from scout.server.blueprints.genes.controllers import gene
 from scout.server.blueprints.variant.utils import predictions
 from scout.server.links import add_gene_links, add_tx_links, ensembl, cosmic_link
 from scout.server.utils import (
@@ -49,27 +56,149 @@ from .forms import (
 
 LOG = logging.getLogger(__name__)
 
+# Number of variants fetched from the database at a time when exporting
+EXPORT_BATCH_SIZE = 1000
+
+
+def encode_page_token(page, variant_obj, filtered_count=None):
+    """Return an opaque token for the page that follows a variant
+
+    Args:
+        page(int): The number of the page
+        variant_obj(dict): The last variant on the previous page
+        filtered_count(int): Number of variants that match the filters, passed on between pages
+
+    Returns:
+        page_token(str): None if the variant has no rank
+    """
+    if variant_obj.get("variant_rank") is None:
+        return None
+    token = {"page": page, "variant_rank": variant_obj["variant_rank"], "count": filtered_count}
+    return base64.urlsafe_b64encode(json.dumps(token).encode("utf-8")).decode("utf-8")
+
+
+def decode_page_token(page_token):
+    """Decode a page token
+
+    Args:
+        page_token(str)
+
+    Returns:
+        page_token(dict): {'page': <int>, 'variant_rank': <int>, 'count': <int>} or None if the
+                          token is not valid
+    """
+    if not page_token:
+        return None
+    try:
+        token = json.loads(base64.urlsafe_b64decode(page_token.encode("utf-8")))
+        return {
+            "page": int(token["page"]),
+            "variant_rank": int(token["variant_rank"]),
+            "count": token.get("count"),
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        LOG.warning("Invalid page token: %s", page_token)
+        return None
+
+
+def variants_page(request_values):
+    """Return the page of variants to show from the values of a request
+
+    Pages are requested with a page token, from the 'Next page' button, or with a page number.
+
+    Args:
+        request_values(werkzeug.datastructures.MultiDict): request.form or request.args
+
+    Returns:
+        page(int), page_token(dict): page_token is None if no valid token was sent
+    """
+    page_token = decode_page_token(request_values.get("page_token"))
+    if page_token:
+        return page_token["page"], page_token
+    return int(request_values.get("page", 1)), None
+
+
+def filtered_variants_count(variants_query, page_token=None):
+    """Return the number of variants that match the filters
+
+    The count is only done on the first page, later pages get the count from the page token.
+
+    Args:
+        variants_query(pymongo.Cursor)
+        page_token(dict)
+
+    Returns:
+        filtered_count(int)
+    """
+    if page_token and page_token.get("count") is not None:
+        return page_token["count"]
+    return variants_query.count()
+
+
+def paginate_variants(variants_query, page=1, per_page=50, page_token=None):
+    """Return the variants on a page, and if there are more variants after them
+
+    With a page token the query already starts after the previous page, so nothing is skipped.
+    One variant more than fits on the page is fetched to know if there is a next page.
+
+    Args:
+        variants_query(pymongo.Cursor)
+        page(int)
+        per_page(int)
+        page_token(dict)
+
+    Returns:
+        variant_res(list(dict)), more_variants(bool)
+    """
+    skip_count = 0 if page_token else per_page * max(page - 1, 0)
+    variant_res = list(variants_query.skip(skip_count).limit(per_page + 1))
+    return variant_res[:per_page], len(variant_res) > per_page
+
+
+def next_page_token(variant_res, more_variants, page, filtered_count=None):
+    """Return the token for the page after a page of variants, None if there are no more"""
+    if not (more_variants and variant_res):
+        return None
+    return encode_page_token(page + 1, variant_res[-1], filtered_count)
 
-def variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50):
+
+def variants(
+    store,
+    institute_obj,
+    case_obj,
+    variants_query,
+    page=1,
+    per_page=50,
+    page_token=None,
+    filtered_count=None,
+    loqusdb=None,
+):
     """Pre-process list of variants."""
-    variant_count = variants_query.count()
-    skip_count = per_page * max(page - 1, 0)
-    more_variants = True if variant_count > (skip_count + per_page) else False
-    variant_res = variants_query.skip(skip_count).limit(per_page)
+    variant_res, more_variants = paginate_variants(variants_query, page, per_page, page_token)
 
     genome_build = str(case_obj.get("genome_build", "37"))
     if genome_build not in ["37", "38"]:
         genome_build = "37"
 
+    page_data = prefetch_page_data(
+        store,
+        institute_obj,
+        case_obj,
+        variant_res,
+        genome_build,
+        overlapping=True,
+        loqusdb=loqusdb,
+    )
+
     variants = []
     for variant_obj in variant_res:
-        overlapping_svs = [sv for sv in store.overlapping(variant_obj)]
+        overlapping_svs = page_data["overlapping"][variant_obj["_id"]]
         variant_obj["overlapping"] = overlapping_svs or None
 
         evaluations = []
         is_research = variant_obj["variant_type"] == "research"
         # Get previous ACMG evalautions of the variant from other cases
-        for evaluation_obj in store.get_evaluations(variant_obj):
+        for evaluation_obj in page_data["evaluations"][variant_obj["variant_id"]]:
             if evaluation_obj["case_id"] == case_obj["_id"]:
                 continue
 
@@ -81,15 +210,15 @@ def variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50
 
         variant_obj["evaluations"] = evaluations
 
+        if page_data["observations"] is not None:
+            loqus_variant = page_data["observations"].get(variant_obj["simple_id"], {})
+            variant_obj["local_observations"] = loqus_variant.get("observations", 0)
+
         clinical_var_obj = variant_obj
         if is_research:
             variant_obj["research_assessments"] = get_manual_assessments(variant_obj)
 
-            clinical_var_obj = store.variant(
-                case_id=case_obj["_id"],
-                simple_id=variant_obj["simple_id"],
-                variant_type="clinical",
-            )
+            clinical_var_obj = page_data["clinical_variants"].get(variant_obj["simple_id"])
 
         variant_obj["clinical_assessments"] = get_manual_assessments(clinical_var_obj)
 
@@ -101,40 +230,138 @@ def variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50
                 variant_obj,
                 update=True,
                 genome_build=genome_build,
+                comments=page_data["comments"][variant_obj["variant_id"]],
+                hgnc_genes=page_data["genes"],
             )
         )
 
-    return {"variants": variants, "more_variants": more_variants}
+    return {
+        "variants": variants,
+        "more_variants": more_variants,
+        "next_page_token": next_page_token(variant_res, more_variants, page, filtered_count),
+    }
 
 
-def sv_variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50):
+def sv_variants(
+    store,
+    institute_obj,
+    case_obj,
+    variants_query,
+    page=1,
+    per_page=50,
+    page_token=None,
+    filtered_count=None,
+):
     """Pre-process list of SV variants."""
-    skip_count = per_page * max(page - 1, 0)
-    more_variants = True if variants_query.count() > (skip_count + per_page) else False
+    variant_res, more_variants = paginate_variants(variants_query, page, per_page, page_token)
 
     genome_build = str(case_obj.get("genome_build", "37"))
     if genome_build not in ["37", "38"]:
         genome_build = "37"
 
+    page_data = prefetch_page_data(store, institute_obj, case_obj, variant_res, genome_build)
+
     variants = []
 
-    for variant_obj in variants_query.skip(skip_count).limit(per_page):
+    for variant_obj in variant_res:
         # show previous classifications for research variants
         clinical_var_obj = variant_obj
         if variant_obj["variant_type"] == "research":
-            clinical_var_obj = store.variant(
-                case_id=case_obj["_id"],
-                simple_id=variant_obj["simple_id"],
-                variant_type="clinical",
-            )
+            clinical_var_obj = page_data["clinical_variants"].get(variant_obj["simple_id"])
         if clinical_var_obj is not None:
             variant_obj["clinical_assessments"] = get_manual_assessments(clinical_var_obj)
 
         variants.append(
-            parse_variant(store, institute_obj, case_obj, variant_obj, genome_build=genome_build)
+            parse_variant(
+                store,
+                institute_obj,
+                case_obj,
+                variant_obj,
+                genome_build=genome_build,
+                comments=page_data["comments"][variant_obj["variant_id"]],
+                hgnc_genes=page_data["genes"],
+            )
         )
 
-    return {"variants": variants, "more_variants": more_variants}
+    return {
+        "variants": variants,
+        "more_variants": more_variants,
+        "next_page_token": next_page_token(variant_res, more_variants, page, filtered_count),
+    }
+
+
+def prefetch_page_data(
+    store,
+    institute_obj,
+    case_obj,
+    variant_objs,
+    genome_build="37",
+    overlapping=False,
+    loqusdb=None,
+):
+    """Fetch the information that is shown for a page of variants with a few bulk queries
+
+    Instead of asking the database once for every variant this collects, for all variants on
+    the page, comments, ACMG evaluations, the clinical variants of research variants, genes
+    with missing hgnc symbols, optionally the overlapping variants and, if the loqusdb database
+    can be queried directly, the local observations.
+
+    Args:
+        store(scout.adapter.MongoAdapter)
+        institute_obj(scout.models.Institute)
+        case_obj(scout.models.Case)
+        variant_objs(list(scout.models.Variant)): The variants on the page
+        genome_build(str)
+        overlapping(bool): If overlapping variants should be fetched
+        loqusdb(scout.server.extensions.LoqusDB)
+
+    Returns:
+        page_data(dict): {
+            'comments': {<variant_id>: list(event)},
+            'evaluations': {<variant_id>: list(evaluation)},
+            'clinical_variants': {<simple_id>: variant_obj},
+            'genes': {<hgnc_id>: hgnc_gene},
+            'overlapping': {<variant _id>: list(variant_obj)},
+            'observations': {<simple_id>: loqus_variant}, None if not fetched
+        }
+    """
+    variant_ids = [variant_obj["variant_id"] for variant_obj in variant_objs]
+    research_simple_ids = [
+        variant_obj["simple_id"]
+        for variant_obj in variant_objs
+        if variant_obj["variant_type"] == "research"
+    ]
+    # Genes that were loaded without a hgnc symbol
+    missing_symbol_ids = {
+        gene_obj["hgnc_id"]
+        for variant_obj in variant_objs
+        for gene_obj in variant_obj.get("genes") or []
+        if gene_obj["hgnc_id"] and gene_obj.get("hgnc_symbol") is None
+    }
+
+    page_data = {
+        "comments": store.variants_comments(institute_obj, case_obj, variant_ids),
+        "evaluations": store.get_evaluations_by_variants(variant_ids),
+        "clinical_variants": store.variants_by_simple_ids(
+            case_obj["_id"], research_simple_ids, variant_type="clinical"
+        ),
+        "genes": store.hgnc_genes_by_ids(missing_symbol_ids, build=genome_build),
+        "overlapping": {},
+        "observations": None,
+    }
+    if overlapping:
+        page_data["overlapping"] = store.overlapping_by_variants(variant_objs)
+
+    loqusdb_id = institute_obj.get("loqusdb_id")
+    try:
+        if loqusdb is not None and loqusdb.has_database(loqusdb_id):
+            page_data["observations"] = loqusdb.get_variants(
+                [variant_obj["simple_id"] for variant_obj in variant_objs], loqusdb_id=loqusdb_id
+            )
+    except PyMongoError as err:
+        LOG.warning("Could not fetch observations from loqusdb %s: %s", loqusdb_id, err)
+
+    return page_data
 
 
 def get_manual_assessments(variant_obj):
@@ -240,6 +467,8 @@ def parse_variant(
     update=False,
     genome_build="37",
     get_compounds=True,
+    comments=None,
+    hgnc_genes=None,
 ):
     """Parse information about variants.
     - Adds information about compounds
@@ -251,6 +480,8 @@ def parse_variant(
         variant_obj(scout.models.Variant)
         update(bool): If variant should be updated in database
         genome_build(str)
+        comments(list(dict)): Prefetched comments of the variant
+        hgnc_genes(dict): Prefetched genes, {<hgnc_id>: hgnc_gene}
     """
     has_changed = False
     compounds = variant_obj.get("compounds", [])
@@ -276,7 +507,10 @@ def parse_variant(
                 continue
             # Else we collect the gene object and check the id
             if gene_obj.get("hgnc_symbol") is None:
-                hgnc_gene = store.hgnc_gene(gene_obj["hgnc_id"], build=genome_build)
+                if hgnc_genes is not None:
+                    hgnc_gene = hgnc_genes.get(gene_obj["hgnc_id"])
+                else:
+                    hgnc_gene = store.hgnc_gene(gene_obj["hgnc_id"], build=genome_build)
                 if not hgnc_gene:
                     continue
                 has_changed = True
@@ -287,12 +521,14 @@ def parse_variant(
     if update and has_changed:
         variant_obj = store.update_variant(variant_obj)
 
-    variant_obj["comments"] = store.events(
-        institute_obj,
-        case=case_obj,
-        variant_id=variant_obj["variant_id"],
-        comments=True,
-    )
+    if comments is None:
+        comments = store.events(
+            institute_obj,
+            case=case_obj,
+            variant_id=variant_obj["variant_id"],
+            comments=True,
+        )
+    variant_obj["comments"] = list(comments)
 
     if variant_genes:
         variant_obj.update(predictions(variant_genes))
@@ -316,100 +552,122 @@ def parse_variant(
     return variant_obj
 
 
-def download_variants(store, case_obj, variant_objs):
-    """Download filtered variants for a case to an excel file
+def download_variants(store, case_obj, query, category):
+    """Download all filtered variants for a case to a csv file
+
+    The variants are read from the database in batches, with only the exported fields, and
+    the lines are streamed to the client while they are created.
 
     Args:
         store(adapter.MongoAdapter)
         case_obj(dict)
-        variant_objs(PyMongo cursor)
+        query(dict): the variants filters
+        category(str): 'snv', 'sv', 'str', 'cancer' or 'cancer_sv'
 
     Returns:
         an HTTP response containing a csv file
     """
     document_header = variants_export_header(case_obj)
-    export_lines = []
-    # Return max 500 variants
-    export_lines = variant_export_lines(store, case_obj, variant_objs.limit(500))
-
-    def generate(header, lines):
+    variant_objs = store.variants(
+        case_obj["_id"],
+        query=query,
+        category=category,
+        nr_of_variants=-1,
+        projection=EXPORT_PROJECTION,
+    ).batch_size(EXPORT_BATCH_SIZE)
+    # One query for all gene symbols instead of one per exported gene
+    gene_symbols = GeneSymbolResolver(store, build=case_obj.get("genome_build", "37"))
+    gene_symbols.prefetch_all()
+
+    def generate(header):
         yield header + "\n"
-        for line in lines:
-            yield line + "\n"
+        for variant in variant_objs:
+            yield variant_export_line(case_obj, variant, gene_symbols) + "\n"
 
     headers = Headers()
     headers.add(
         "Content-Disposition",
         "attachment",
-        filename=str(case_obj["display_name"]) + "-filtered_sv-variants.csv",
+        filename=str(case_obj["display_name"]) + "-filtered_variants.csv",
     )
     # return a csv with the exported variants
     return Response(
-        generate(",".join(document_header), export_lines),
+        generate(",".join(document_header)),
         mimetype="text/csv",
         headers=headers,
     )
 
 
-def variant_export_lines(store, case_obj, variants_query):
+def variant_export_lines(store, case_obj, variants_query, gene_symbols=None):
     """Get variants info to be exported to file, one list (line) per variant.
     Args:
         store(scout.adapter.MongoAdapter)
         case_obj(scout.models.Case)
         variants_query: a list of variant objects, each one is a dictionary
+        gene_symbols(scout.export.gene.GeneSymbolResolver): created for the case if None
     Returns:
         export_variants: a list of strings. Each string  of the list corresponding to the fields
                          of a variant to be exported to file, separated by comma
     """
+    variants = list(variants_query)
+    if gene_symbols is None:
+        gene_symbols = GeneSymbolResolver(store, build=case_obj.get("genome_build", "37"))
+    gene_symbols.prefetch(variants)
 
-    export_variants = []
-
-    for variant in variants_query:
-        variant_line = []
-        position = variant["position"]
-        change = variant["reference"] + ">" + variant["alternative"]
-        variant_line.append(variant["rank_score"])
-        variant_line.append(variant["chromosome"])
-        variant_line.append(position)
-        variant_line.append(change)
-        variant_line.append("_".join([str(position), change]))
-
-        # gather gene info:
-        gene_list = variant.get("genes")  # this is a list of gene objects
-
-        # if variant is in genes
-        if gene_list is not None and len(gene_list) > 0:
-            gene_info = variant_export_genes_info(store, gene_list)
-            variant_line += gene_info
-        else:
-            empty_col = 0
-            while empty_col < 3:
-                variant_line.append(
-                    "-"
-                )  # empty HGNC id, emoty gene name and empty transcripts columns
-                empty_col += 1
-
-        variant_gts = variant["samples"]  # list of coverage and gt calls for case samples
-        for individual in case_obj["individuals"]:
-            for variant_gt in variant_gts:
-                if individual["individual_id"] == variant_gt["sample_id"]:
-                    # gather coverage info
-                    variant_line.append(variant_gt["allele_depths"][0])  # AD reference
-                    variant_line.append(variant_gt["allele_depths"][1])  # AD alternate
-                    # gather genotype quality info
-                    variant_line.append(variant_gt["genotype_quality"])
-
-        variant_line = [str(i) for i in variant_line]
-        export_variants.append(",".join(variant_line))
-
-    return export_variants
-
-
-def variant_export_genes_info(store, gene_list):
+    return [variant_export_line(case_obj, variant, gene_symbols) for variant in variants]
+
+
+def variant_export_line(case_obj, variant, gene_symbols):
+    """Get the info of one variant to be exported to file
+
+    Args:
+        case_obj(scout.models.Case)
+        variant(dict): a variant object, with at least the fields in EXPORT_PROJECTION
+        gene_symbols(scout.export.gene.GeneSymbolResolver): with the variant genes prefetched
+    Returns:
+        variant_line(str): the fields of the variant to be exported, separated by comma
+    """
+    variant_line = []
+    position = variant["position"]
+    change = variant["reference"] + ">" + variant["alternative"]
+    variant_line.append(variant["rank_score"])
+    variant_line.append(variant["chromosome"])
+    variant_line.append(position)
+    variant_line.append(change)
+    variant_line.append("_".join([str(position), change]))
+
+    # gather gene info:
+    gene_list = variant.get("genes")  # this is a list of gene objects
+
+    # if variant is in genes
+    if gene_list is not None and len(gene_list) > 0:
+        gene_info = variant_export_genes_info(gene_list, gene_symbols)
+        variant_line += gene_info
+    else:
+        empty_col = 0
+        while empty_col < 3:
+            variant_line.append("-")  # empty HGNC id, emoty gene name and empty transcripts columns
+            empty_col += 1
+
+    variant_gts = variant["samples"]  # list of coverage and gt calls for case samples
+    for individual in case_obj["individuals"]:
+        for variant_gt in variant_gts:
+            if individual["individual_id"] == variant_gt["sample_id"]:
+                # gather coverage info
+                variant_line.append(variant_gt["allele_depths"][0])  # AD reference
+                variant_line.append(variant_gt["allele_depths"][1])  # AD alternate
+                # gather genotype quality info
+                variant_line.append(variant_gt["genotype_quality"])
+
+    return ",".join(str(i) for i in variant_line)
+
+
+def variant_export_genes_info(gene_list, gene_symbols):
     """Adds gene info to a list of fields corresponding to a variant to be exported.
 
     Args:
         gene_list(list) A list of gene objects contained in the variant
+        gene_symbols(scout.export.gene.GeneSymbolResolver)
 
     Returns:
         gene_info(list) A list of gene-relates string info
@@ -422,19 +680,16 @@ def variant_export_genes_info(store, gene_list):
 
     for gene_obj in gene_list:
         hgnc_id = gene_obj["hgnc_id"]
-        gene_name = gene(store, hgnc_id)["symbol"]
+        gene_name = gene_symbols.symbol(gene_obj)
 
         gene_ids.append(hgnc_id)
         gene_names.append(gene_name)
 
         hgvs_nucleotide = "-"
         # gather HGVS info from gene transcripts
-        transcripts_list = gene_obj.get("transcripts")
+        transcripts_list = gene_obj.get("transcripts") or []
         for transcript_obj in transcripts_list:
-            if (
-                transcript_obj.get("is_canonical") is not None
-                and transcript_obj.get("is_canonical") is True
-            ):
+            if transcript_obj.get("is_canonical") is True:
                 hgvs_nucleotide = str(transcript_obj.get("coding_sequence_name"))
         hgvs_c.append(hgvs_nucleotide)
 
@@ -488,24 +743,23 @@ def get_variant_info(genes):
     return data
 
 
-def cancer_variants(store, institute_id, case_name, variants_query, form, page=1):
+def cancer_variants(store, institute_id, case_name, variants_query, form, page=1, page_token=None):
     """Fetch data related to cancer variants for a case."""
 
     institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
     per_page = 50
-    skip_count = per_page * max(page - 1, 0)
 
-    variant_count = variants_query.count()
+    variant_count = filtered_variants_count(variants_query, page_token)
 
     # Setup variant count session with variant count by category
     variant_count_session(store, institute_id, case_obj["_id"], "clinical", "cancer")
     session["filtered_variants"] = variant_count
 
-    more_variants = True if variant_count > (skip_count + per_page) else False
-    variant_res = variants_query.skip(skip_count).limit(per_page)
+    variant_res, more_variants = paginate_variants(variants_query, page, per_page, page_token)
     data = dict(
         page=page,
         more_variants=more_variants,
+        next_page_token=next_page_token(variant_res, more_variants, page, variant_count),
         institute=institute_obj,
         case=case_obj,
         variants=(
@@ -773,6 +1027,8 @@ def verified_excel_file(store, institute_list, temp_excel_dir):
     written_files = 0
     today = datetime.datetime.now().strftime("%Y-%m-%d")
     LOG.info("Creating verified variant document..")
+    # Gene symbols are fetched once for all institutes, with the genome build of each case
+    gene_symbols = {build: GeneSymbolResolver(store, build=build) for build in ["37", "38"]}
 
     for cust in institute_list:
         verif_vars = store.verified(institute_id=cust)
@@ -784,7 +1040,7 @@ def verified_excel_file(store, institute_list, temp_excel_dir):
         for var_type, var_callers in CALLERS.items():
             for caller in var_callers:
                 unique_callers.add(caller.get("id"))
-        cust_verified = export_verified_variants(verif_vars, unique_callers)
+        cust_verified = export_verified_variants(verif_vars, unique_callers, gene_symbols)
 
         document_name = ".".join([cust, "_verified_variants", today]) + ".xlsx"
         workbook = Workbook(os.path.join(temp_excel_dir, document_name))
@@ -1,4 +1,5 @@
 """Views for the variants"""
+
 import datetime
 import io
 import logging
@@ -28,7 +29,7 @@ from scout.constants import (
     DISMISS_VARIANT_OPTIONS,
     CANCER_SPECIFIC_VARIANT_DISMISS_OPTIONS,
 )
-from scout.server.extensions import store
+from scout.server.extensions import loqusdb, store
 from scout.server.utils import institute_and_case, templated
 
 from . import controllers
@@ -49,7 +50,7 @@ variants_bp = Blueprint(
 @templated("variants/variants.html")
 def variants(institute_id, case_name):
     """Display a list of SNV variants."""
-    page = int(request.form.get("page", 1))
+    page, page_token = controllers.variants_page(request.form)
     category = "snv"
     institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
     variant_type = request.args.get("variant_type", "clinical")
@@ -150,16 +151,31 @@ def variants(institute_id, case_name):
 
     cytobands = store.cytoband_by_chrom(case_obj.get("genome_build"))
 
-    variants_query = store.variants(case_obj["_id"], query=form.data, category=category)
+    # Export all variants matching the filters, ignoring pagination
+    if request.form.get("export"):
+        return controllers.download_variants(store, case_obj, form.data, category)
+
+    variants_query = store.variants(
+        case_obj["_id"],
+        query=form.data,
+        category=category,
+        after_variant_rank=page_token["variant_rank"] if page_token else None,
+    )
 
     # Setup variant count session with variant count by category
     controllers.variant_count_session(store, institute_id, case_obj["_id"], variant_type, category)
-    session["filtered_variants"] = variants_query.count()
-
-    if request.form.get("export"):
-        return controllers.download_variants(store, case_obj, variants_query)
-
-    data = controllers.variants(store, institute_obj, case_obj, variants_query, page)
+    session["filtered_variants"] = controllers.filtered_variants_count(variants_query, page_token)
+
+    data = controllers.variants(
+        store,
+        institute_obj,
+        case_obj,
+        variants_query,
+        page,
+        page_token=page_token,
+        filtered_count=session["filtered_variants"],
+        loqusdb=loqusdb if current_app.config.get("LOQUSDB_SETTINGS") else None,
+    )
     return dict(
         institute=institute_obj,
         case=case_obj,
@@ -218,7 +234,7 @@ def str_variants(institute_id, case_name):
 def sv_variants(institute_id, case_name):
     """Display a list of structural variants."""
 
-    page = int(request.form.get("page", 1))
+    page, page_token = controllers.variants_page(request.form)
     variant_type = request.args.get("variant_type", "clinical")
     category = "sv"
 
@@ -232,17 +248,30 @@ def sv_variants(institute_id, case_name):
     form = controllers.populate_sv_filters_form(store, institute_obj, case_obj, category, request)
     cytobands = store.cytoband_by_chrom(case_obj.get("genome_build"))
 
-    variants_query = store.variants(case_obj["_id"], category=category, query=form.data)
+    # Export all variants matching the filters, ignoring pagination
+    if request.form.get("export"):
+        return controllers.download_variants(store, case_obj, form.data, category)
+
+    variants_query = store.variants(
+        case_obj["_id"],
+        category=category,
+        query=form.data,
+        after_variant_rank=page_token["variant_rank"] if page_token else None,
+    )
 
     # Setup variant count session with variant count by category
     controllers.variant_count_session(store, institute_id, case_obj["_id"], variant_type, category)
-    session["filtered_variants"] = variants_query.count()
-
-    # if variants should be exported
-    if request.form.get("export"):
-        return controllers.download_variants(store, case_obj, variants_query)
-
-    data = controllers.sv_variants(store, institute_obj, case_obj, variants_query, page)
+    session["filtered_variants"] = controllers.filtered_variants_count(variants_query, page_token)
+
+    data = controllers.sv_variants(
+        store,
+        institute_obj,
+        case_obj,
+        variants_query,
+        page,
+        page_token=page_token,
+        filtered_count=session["filtered_variants"],
+    )
 
     return dict(
         institute=institute_obj,
@@ -288,10 +317,10 @@ def cancer_variants(institute_id, case_name):
                     expand_search="True",
                 ),
             )
-        page = int(request.form.get("page", 1))
+        page, page_token = controllers.variants_page(request.form)
 
     else:
-        page = int(request.args.get("page", 1))
+        page, page_token = controllers.variants_page(request.args)
         form = CancerFiltersForm(request.args)
         form.chrom.data = request.args.get("chrom", None)
 
@@ -312,13 +341,20 @@ def cancer_variants(institute_id, case_name):
     cytobands = store.cytoband_by_chrom(case_obj.get("genome_build"))
 
     variant_type = request.args.get("variant_type", "clinical")
-    variants_query = store.variants(case_obj["_id"], category="cancer", query=form.data)
 
+    # Export all variants matching the filters, ignoring pagination
     if request.form.get("export"):
-        return controllers.download_variants(store, case_obj, variants_query)
+        return controllers.download_variants(store, case_obj, form.data, "cancer")
+
+    variants_query = store.variants(
+        case_obj["_id"],
+        category="cancer",
+        query=form.data,
+        after_variant_rank=page_token["variant_rank"] if page_token else None,
+    )
 
     data = controllers.cancer_variants(
-        store, institute_id, case_name, variants_query, form, page=page
+        store, institute_id, case_name, variants_query, form, page=page, page_token=page_token
     )
 
     return dict(
@@ -338,7 +374,7 @@ def cancer_variants(institute_id, case_name):
 def cancer_sv_variants(institute_id, case_name):
     """Display a list of cancer structural variants."""
 
-    page = int(request.form.get("page", 1))
+    page, page_token = controllers.variants_page(request.form)
     variant_type = request.args.get("variant_type", "clinical")
     category = "cancer_sv"
 
@@ -354,17 +390,30 @@ def cancer_sv_variants(institute_id, case_name):
 
     cytobands = store.cytoband_by_chrom(case_obj.get("genome_build"))
 
-    variants_query = store.variants(case_obj["_id"], category=category, query=form.data)
+    # Export all variants matching the filters, ignoring pagination
+    if request.form.get("export"):
+        return controllers.download_variants(store, case_obj, form.data, category)
+
+    variants_query = store.variants(
+        case_obj["_id"],
+        category=category,
+        query=form.data,
+        after_variant_rank=page_token["variant_rank"] if page_token else None,
+    )
 
     # Setup variant count session with variant count by category
     controllers.variant_count_session(store, institute_id, case_obj["_id"], variant_type, category)
-    session["filtered_variants"] = variants_query.count()
-
-    # if variants should be exported
-    if request.form.get("export"):
-        return controllers.download_variants(store, case_obj, variants_query)
-
-    data = controllers.sv_variants(store, institute_obj, case_obj, variants_query, page)
+    session["filtered_variants"] = controllers.filtered_variants_count(variants_query, page_token)
+
+    data = controllers.sv_variants(
+        store,
+        institute_obj,
+        case_obj,
+        variants_query,
+        page,
+        page_token=page_token,
+        filtered_count=session["filtered_variants"],
+    )
 
     return dict(
         institute=institute_obj,
@@ -36,6 +36,19 @@ MAIL_USE_SSL = False
 #    uri=("mongodb://{}:{}@localhost:{}/loqusdb".format(MONGO_USERNAME, MONGO_PASSWORD, MONGO_PORT))
 
 
+# Directory where gene reference snapshots used when loading variants are cached
+# GENE_CACHE_DIR = "/path/to/scout/cache"
+
+# Log the number of database queries made for each request
+# LOG_QUERY_COUNTS = True
+
+# Store the dashboard statistics and only recompute them when there are new events
+# DASHBOARD_STATS_COLLECTION = True
+
+# Directory and maximum size in bytes of the cached region VCFs shown in the alignment viewer
+# REGION_VCF_CACHE_DIR = "/path/to/scout/region_vcfs"
+# REGION_VCF_CACHE_SIZE = 500 * 1024 * 1024
+
 # Chanjo-Report
 REPORT_LANGUAGE = "en"
 ACCEPT_LANGUAGES = ["en", "sv"]
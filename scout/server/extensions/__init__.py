@@ -11,6 +11,7 @@ from scout.adapter import MongoAdapter
 
 from .loqus_extension import LoqusDB
 from .mongo_extension import MongoDB
+from .region_vcf_extension import RegionVcf
 
 
 toolbar = DebugToolbarExtension()
@@ -23,3 +24,4 @@ mail = Mail()
 
 loqusdb = LoqusDB()
 mongo = MongoDB()
+region_vcf = RegionVcf()
@@ -2,12 +2,20 @@
 
 * Requires loqusdb version 2.5 or greater.
 * If multiple instances are configured, version will be default's.
+* SNV observations and case counts can be read directly from the loqusdb database, configured with
+  'use_database', instead of running the loqusdb binary for every lookup.
 """
+
 import copy
 import json
 import logging
 import subprocess
+import time
 from subprocess import CalledProcessError
+
+import yaml
+
+from scout.adapter.client import get_connection
 from scout.exceptions.config import ConfigError
 
 LOG = logging.getLogger(__name__)
@@ -16,6 +24,10 @@ LOG = logging.getLogger(__name__)
 BINARY_PATH = "binary_path"
 CONFIG_PATH = "config_path"
 VERSION = "version"
+USE_DATABASE = "use_database"
+
+# Seconds to reuse the number of cases in a loqusdb instance
+CASE_COUNT_TTL = 300
 
 
 def execute_command(cmd):
@@ -54,6 +66,8 @@ class LoqusDB:
             {"id": "default", "binary_path": loqusdb_binary, "config_path": loqusdb_args}
         ]
         self.version = version
+        self.databases = {}
+        self.case_counts = {}
         LOG.info(
             "Initializing loqus extension with config: %s",
             self.loqusdb_settings,
@@ -63,6 +77,8 @@ class LoqusDB:
         """Initialize from Flask."""
         LOG.info("Init loqusdb app")
         self.loqusdb_settings = self.app_config(app)
+        self.databases = {}
+        self.case_counts = {}
         self.version = self.get_configured_version()
         if not self.version:
             self.version = self.get_version()
@@ -127,6 +143,9 @@ class LoqusDB:
             EnvironmentError("Only compatible with loqusdb version >= 2.5")
         """
         loqus_id = variant_info["_id"]
+        if variant_info.get("category", "snv") not in ["sv"] and self.has_database(loqusdb_id):
+            return self.get_variants([loqus_id], loqusdb_id).get(loqus_id, {})
+
         cmd = self.get_command(loqusdb_id)
         cmd.extend(["variants", "--to-json", "--variant-id", loqus_id])
         # If sv we need some more info
@@ -162,6 +181,82 @@ class LoqusDB:
             res = json.loads(output)
         return res
 
+    def get_variants(self, variant_ids, loqusdb_id=None):
+        """Return information for a number of SNVs/INDELs from loqusdb with one query
+
+        Requires that the loqusdb database is configured with 'use_database'.
+
+        Args:
+            variant_ids(iterable(str)): simple ids like "1_169898014_T_C"
+            loqusdb_id(string)
+
+        Returns:
+            loqus_variants(dict): {<variant_id>: loqus_variant}, only for observed variants
+        """
+        database = self.get_database(loqusdb_id)
+        if database is None:
+            raise ConfigError("LoqusDB {} is not configured to use the database".format(loqusdb_id))
+
+        loqus_variants = {}
+        variant_ids = list(set(variant_ids))
+        if not variant_ids:
+            return loqus_variants
+        nr_cases = self.case_count(loqusdb_id)
+        for loqus_variant in database.variant.find({"_id": {"$in": variant_ids}}):
+            loqus_variant["total"] = nr_cases
+            loqus_variants[loqus_variant["_id"]] = loqus_variant
+        return loqus_variants
+
+    def has_database(self, loqusdb_id=None):
+        """Check if the loqusdb database can be queried directly
+
+        Args:
+            loqusdb_id(str)
+
+        Returns:
+            bool: False if the loqusdb id is not configured
+        """
+        if self.search_setting(loqusdb_id or "default") is None:
+            return False
+        return self.get_database(loqusdb_id) is not None
+
+    def get_database(self, loqusdb_id=None):
+        """Return a connection to the loqusdb database, as configured in the loqusdb config file
+
+        The connection is kept for later lookups.
+
+        Args:
+            loqusdb_id(str)
+
+        Returns:
+            database(pymongo.database.Database): None if 'use_database' is not configured
+        """
+        loqusdb_id = loqusdb_id or "default"
+        if loqusdb_id in self.databases:
+            return self.databases[loqusdb_id]
+
+        setting = self.search_setting(loqusdb_id)
+        if setting is None:
+            raise ConfigError("LoqusDB id not found: {}".format(loqusdb_id))
+        database = None
+        if setting.get(USE_DATABASE):
+            db_config = {}
+            if setting.get(CONFIG_PATH):
+                with open(setting[CONFIG_PATH], "r") as config_file:
+                    db_config = yaml.safe_load(config_file) or {}
+            client = get_connection(
+                host=db_config.get("host", "localhost"),
+                port=db_config.get("port", 27017),
+                username=db_config.get("username"),
+                password=db_config.get("password"),
+                uri=db_config.get("uri"),
+                authdb=db_config.get("authdb"),
+            )
+            database = client[db_config.get("db_name", "loqusdb")]
+            LOG.info("Use loqusdb database %s for %s", database.name, loqusdb_id)
+        self.databases[loqusdb_id] = database
+        return database
+
     def search_setting(self, key):
         """Search settings for 'key' and return configuration for matchin 'id'
 
@@ -228,14 +323,30 @@ class LoqusDB:
         except AttributeError:
             raise ConfigError("LoqusDB id not found: {}".format(loqusdb_id))
 
-    def case_count(self):
+    def case_count(self, loqusdb_id=None):
         """Returns number of cases in loqus instance
 
+        The number is reused for CASE_COUNT_TTL seconds.
+
+        Args:
+            loqusdb_id(str)
+
         Returns:
             nr_cases(int)
         """
+        cache_key = loqusdb_id or "default"
+        cached = self.case_counts.get(cache_key)
+        if cached and time.time() - cached[0] < CASE_COUNT_TTL:
+            return cached[1]
+
         nr_cases = 0
-        case_call = self.get_command()
+        database = self.get_database(loqusdb_id)
+        if database is not None:
+            nr_cases = database.case.find({}, {"_id": 1}).count()
+            self.case_counts[cache_key] = (time.time(), nr_cases)
+            return nr_cases
+
+        case_call = self.get_command(loqusdb_id)
         case_call.extend(["cases", "--count"])
         output = ""
         try:
@@ -247,8 +358,9 @@ class LoqusDB:
         try:
             nr_cases = int(output.strip())
         except ValueError:
-            pass
+            return nr_cases
 
+        self.case_counts[cache_key] = (time.time(), nr_cases)
         return nr_cases
 
     def get_version(self):
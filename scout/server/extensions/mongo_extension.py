@@ -1,6 +1,44 @@
 """Code for flask mongodb extension in scout"""
+
+import logging
+import threading
+
+from flask import request
+from pymongo import monitoring
+
 from scout.adapter.client import get_connection
 
+LOG = logging.getLogger(__name__)
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Count the database commands sent from each thread
+
+    pymongo calls the listener from the thread that sends the command, so the count of a thread
+    is the number of queries made while serving its current request.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def count(self):
+        """Return the number of commands sent by this thread since the last reset"""
+        return getattr(self._local, "count", 0)
+
+    def reset(self):
+        """Start counting from zero in this thread"""
+        self._local.count = 0
+
+    def started(self, event):
+        self._local.count = self.count + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
 
 class MongoDB:
     """Flask interface to mongodb"""
@@ -12,6 +50,12 @@ class MongoDB:
 
         db_name = app.config.get("MONGO_DBNAME", "scout")
 
+        event_listeners = []
+        if app.config.get("LOG_QUERY_COUNTS"):
+            query_counter = QueryCounter()
+            event_listeners.append(query_counter)
+            MongoDB.log_query_counts(app, query_counter)
+
         client = get_connection(
             host=app.config.get("MONGO_HOST", "localhost"),
             port=app.config.get("MONGO_PORT", 27017),
@@ -19,10 +63,24 @@ class MongoDB:
             password=app.config.get("MONGO_PASSWORD", None),
             uri=uri,
             mongodb=db_name,
+            event_listeners=event_listeners,
         )
 
         app.config["MONGO_DATABASE"] = client[db_name]
         app.config["MONGO_CLIENT"] = client
 
+    @staticmethod
+    def log_query_counts(app, query_counter):
+        """Log the number of database queries made for each request"""
+
+        @app.before_request
+        def reset_query_count():
+            query_counter.reset()
+
+        @app.after_request
+        def log_query_count(response):
+            LOG.info("%s: %s database queries", request.path, query_counter.count)
+            return response
+
     def __repr__(self):
         return f"{self.__class__.__name__}"
@@ -0,0 +1,48 @@
+"""Code for the region VCF flask extension
+
+The variants around a variant are written once per region and case VCF to a cache directory,
+configured with REGION_VCF_CACHE_DIR and REGION_VCF_CACHE_SIZE (bytes), and served to the
+alignment viewer.
+"""
+
+import logging
+
+from scout.utils.region_vcf import DEFAULT_CACHE_SIZE, RegionVcfCache
+
+LOG = logging.getLogger(__name__)
+
+
+class RegionVcf:
+    """Region VCF cache shared by the requests of a Flask app"""
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_CACHE_SIZE):
+        """Initialise from args"""
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._cache = None
+
+    def init_app(self, app):
+        """Initialize from Flask."""
+        self.cache_dir = app.config.get("REGION_VCF_CACHE_DIR", self.cache_dir)
+        self.max_size = app.config.get("REGION_VCF_CACHE_SIZE", self.max_size)
+        self._cache = None
+
+    @property
+    def cache(self):
+        """The cache is opened when it is first used"""
+        if self._cache is None:
+            self._cache = RegionVcfCache(cache_dir=self.cache_dir, max_size=self.max_size)
+            LOG.info("Region VCF cache in %s", self._cache.cache_dir)
+        return self._cache
+
+    def region_vcf(self, vcf_path, region):
+        """Return the path to a bgzipped VCF with the variants of a region
+
+        Args:
+            vcf_path(str): path to an indexed VCF file
+            region(str): like '1:1000-2000'
+
+        Returns:
+            path(str)
+        """
+        return self.cache.region_vcf(vcf_path, region)
@@ -6,6 +6,8 @@ from functools import wraps
 from flask import abort, flash, render_template, request
 from flask_login import current_user
 
+from scout.server.extensions import region_vcf
+
 LOG = logging.getLogger(__name__)
 
 
@@ -105,9 +107,10 @@ def variant_case(store, case_obj, variant_obj):
         return
 
     try:
-        vcf_path = store.get_region_vcf(case_obj, chrom=chrom, start=min(starts), end=max(ends))
-
-        # Create a reduced VCF with variants in the region
+        # Reuse a reduced VCF with variants in the region, written on the first view
+        vcf_path = store.get_region_vcf(
+            case_obj, chrom=chrom, start=min(starts), end=max(ends), cache=region_vcf
+        )
         case_obj["region_vcf_file"] = vcf_path
     except FileNotFoundError as err:
         LOG.warning(err)
@@ -0,0 +1,99 @@
+"""Read and write gene reference snapshots in a local cache directory
+
+A snapshot holds the gene information that is needed when loading variants for one genome
+build. It is identified by the build and a checksum of the hgnc_gene collection so that a
+snapshot from an old gene collection is never used.
+"""
+import glob
+import logging
+import os
+import pickle
+import tempfile
+
+LOG = logging.getLogger(__name__)
+
+# Increase when the content of a snapshot changes
+SNAPSHOT_VERSION = 2
+SNAPSHOT_PREFIX = "gene_snapshot"
+
+
+def snapshot_path(cache_dir, build, checksum):
+    """Return the path to the snapshot file of a build and gene collection checksum
+
+    Args:
+        cache_dir(str)
+        build(str)
+        checksum(str)
+
+    Returns:
+        path(str)
+    """
+    file_name = "{0}_v{1}_{2}_{3}.pickle".format(SNAPSHOT_PREFIX, SNAPSHOT_VERSION, build, checksum)
+    return os.path.join(cache_dir, file_name)
+
+
+def read_snapshot(path):
+    """Read a snapshot from a file
+
+    Args:
+        path(str)
+
+    Returns:
+        snapshot(dict): None if the file is missing, broken or of another version
+    """
+    try:
+        with open(path, "rb") as handle:
+            snapshot = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as err:
+        LOG.warning("Could not read gene snapshot %s: %s", path, err)
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def write_snapshot(snapshot, path):
+    """Write a snapshot to a file
+
+    The snapshot is first written to a temporary file that is then moved in place, so other
+    processes never read a partly written snapshot.
+
+    Args:
+        snapshot(dict)
+        path(str)
+    """
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as handle:
+            pickle.dump(snapshot, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as err:
+        LOG.warning("Could not write gene snapshot %s: %s", path, err)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def clear_snapshots(cache_dir, build=None):
+    """Delete snapshot files from a cache directory
+
+    Args:
+        cache_dir(str)
+        build(str): Only delete snapshots of this build
+
+    Returns:
+        nr_deleted(int)
+    """
+    pattern = "{0}_v*_{1}_*.pickle".format(SNAPSHOT_PREFIX, build or "*")
+    nr_deleted = 0
+    for path in glob.glob(os.path.join(cache_dir, pattern)):
+        try:
+            os.remove(path)
+            nr_deleted += 1
+        except FileNotFoundError:
+            continue
+    return nr_deleted
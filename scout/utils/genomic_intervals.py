@@ -0,0 +1,191 @@
+"""Index for sorted, non overlapping genomic intervals
+
+Since the intervals of a chromosome do not overlap they can be stored as sorted arrays of
+starts and ends, and searched with binary search. This is much more compact and faster to build
+than an interval tree.
+"""
+
+import logging
+from array import array
+from bisect import bisect_right
+
+LOG = logging.getLogger(__name__)
+
+
+class GenomicIntervalIndex(object):
+    """Sorted, non overlapping intervals for each chromosome
+
+    Intervals are half open, [start, end), like in intervaltree.
+    Each interval carries a data value, e.g. an id or a name.
+    """
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+        self._data = {}
+
+    @classmethod
+    def merged(cls, intervals):
+        """Build an index where overlapping intervals are merged into one
+
+        Each merged interval gets a unique integer id, starting at 1, as data.
+
+        Args:
+            intervals(iterable(tuple)): (<chrom>, <start>, <end>)
+
+        Returns:
+            index(GenomicIntervalIndex)
+        """
+        by_chrom = {}
+        for chrom, start, end in intervals:
+            by_chrom.setdefault(chrom, []).append((start, end))
+
+        index = cls()
+        interval_id = 0
+        for chrom, chrom_intervals in by_chrom.items():
+            chrom_intervals.sort()
+            starts = array("q")
+            ends = array("q")
+            for start, end in chrom_intervals:
+                # Intervals are half open so touching intervals are not merged
+                if ends and start < ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                    continue
+                starts.append(start)
+                ends.append(end)
+            index._starts[chrom] = starts
+            index._ends[chrom] = ends
+            index._data[chrom] = list(range(interval_id + 1, interval_id + len(starts) + 1))
+            interval_id += len(starts)
+        return index
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """Build an index from intervals that do not overlap
+
+        Args:
+            intervals(iterable(tuple)): (<chrom>, <start>, <end>, <data>)
+
+        Returns:
+            index(GenomicIntervalIndex)
+
+        Raises:
+            ValueError: If two intervals on the same chromosome overlap
+        """
+        by_chrom = {}
+        for chrom, start, end, data in intervals:
+            by_chrom.setdefault(chrom, []).append((start, end, data))
+
+        index = cls()
+        for chrom, chrom_intervals in by_chrom.items():
+            chrom_intervals.sort(key=lambda interval: interval[0])
+            starts = array("q")
+            ends = array("q")
+            data_values = []
+            for start, end, data in chrom_intervals:
+                if ends and start < ends[-1]:
+                    raise ValueError(
+                        "Overlapping intervals on chromosome {0} at {1}".format(chrom, start)
+                    )
+                starts.append(start)
+                ends.append(end)
+                data_values.append(data)
+            index._starts[chrom] = starts
+            index._ends[chrom] = ends
+            index._data[chrom] = data_values
+        return index
+
+    def chromosomes(self):
+        """Return the chromosomes that have intervals"""
+        return list(self._starts)
+
+    def nr_intervals(self, chrom=None):
+        """Return the number of intervals, for one chromosome or in total"""
+        if chrom is not None:
+            return len(self._starts.get(chrom, []))
+        return sum(len(starts) for starts in self._starts.values())
+
+    def intervals(self, chrom):
+        """Yield all intervals of a chromosome
+
+        Yields:
+            interval(tuple): (<start>, <end>, <data>)
+        """
+        if chrom not in self._starts:
+            return
+        for interval in zip(self._starts[chrom], self._ends[chrom], self._data[chrom]):
+            yield interval
+
+    def find(self, chrom, start, end=None):
+        """Return the data of the first interval that overlaps [start, end)
+
+        Args:
+            chrom(str)
+            start(int)
+            end(int): Defaults to start + 1, i.e. a single position
+
+        Returns:
+            data: None if no interval overlaps
+        """
+        ends = self._ends.get(chrom)
+        if not ends:
+            return None
+        if end is None:
+            end = start + 1
+        # The first interval that ends after start, ends are sorted since intervals do not overlap
+        idx = bisect_right(ends, start)
+        if idx < len(ends) and self._starts[chrom][idx] < end:
+            return self._data[chrom][idx]
+        return None
+
+    def overlapping(self, chrom, start, end):
+        """Return all intervals that overlap [start, end)
+
+        Args:
+            chrom(str)
+            start(int)
+            end(int)
+
+        Returns:
+            intervals(list(tuple)): (<start>, <end>, <data>), sorted by position
+        """
+        ends = self._ends.get(chrom)
+        if not ends:
+            return []
+        starts = self._starts[chrom]
+        idx = bisect_right(ends, start)
+        intervals = []
+        while idx < len(ends) and starts[idx] < end:
+            intervals.append((starts[idx], ends[idx], self._data[chrom][idx]))
+            idx += 1
+        return intervals
+
+    def locate(self, chrom, positions, ends=None):
+        """Find the intervals for a batch of positions on one chromosome
+
+        Args:
+            chrom(str)
+            positions(iterable(int)): Start positions
+            ends(iterable(int)): Optional end positions, half open, one per start position
+
+        Returns:
+            result(list): The data of the first overlapping interval, or None, per position
+        """
+        positions = list(positions)
+        chrom_ends = self._ends.get(chrom)
+        if not chrom_ends:
+            return [None] * len(positions)
+        if ends is None:
+            ends = (position + 1 for position in positions)
+        chrom_starts = self._starts[chrom]
+        chrom_data = self._data[chrom]
+        nr_intervals = len(chrom_ends)
+
+        result = []
+        for start, end in zip(positions, ends):
+            idx = bisect_right(chrom_ends, start)
+            if idx < nr_intervals and chrom_starts[idx] < end:
+                result.append(chrom_data[idx])
+            else:
+                result.append(None)
+        return result
@@ -0,0 +1,118 @@
+"""Index with the ancestors of HPO terms for fast phenotype similarity
+
+Every term in the ontology gets an integer id and the ancestors of a term are stored as a bitset,
+a python integer with the bits of all ancestors set. The ancestors of a group of terms is then the
+bitwise or of their bitsets, and the UI score of two groups of terms can be computed from bit
+counts, without any database queries or set operations.
+"""
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+def count_bits(bitset):
+    """Return the number of set bits in a bitset"""
+    return bin(bitset).count("1")
+
+
+def ui_score_bits(bitset_1, bitset_2):
+    """Get the ui score of two bitsets
+
+    Same as scout.utils.algorithms.ui_score, for sets of terms encoded as bitsets
+
+    Args:
+        bitset_1, bitset_2 (int)
+
+    Returns:
+        ui_score (float)
+    """
+    if not (bitset_1 and bitset_2):
+        return 0
+    return count_bits(bitset_1 & bitset_2) / count_bits(bitset_1 | bitset_2)
+
+
+class HpoAncestorIndex(object):
+    """Ancestors of all HPO terms, as bitsets
+
+    The ancestor bitsets of cases are cached together with the terms they were computed from,
+    and recomputed when the phenotype terms of a case change.
+    """
+
+    def __init__(self, hpo_terms):
+        """Build the index
+
+        Args:
+            hpo_terms(iterable(dict)): HPO term objects with '_id' and 'all_ancestors'
+        """
+        self._bit_ids = {}
+        self._ancestors = {}
+        self._case_bitsets = {}
+        for hpo_term in hpo_terms:
+            bitset = 0
+            for ancestor_id in hpo_term.get("all_ancestors", []):
+                bitset |= 1 << self._bit_id(ancestor_id)
+            self._ancestors[hpo_term["_id"]] = bitset
+        LOG.info("Built HPO ancestor index with %s terms", len(self._ancestors))
+
+    def _bit_id(self, term_id):
+        """Return the integer id of a term, adding new terms to the index"""
+        bit_id = self._bit_ids.get(term_id)
+        if bit_id is None:
+            bit_id = self._bit_ids[term_id] = len(self._bit_ids)
+        return bit_id
+
+    def __len__(self):
+        return len(self._ancestors)
+
+    def __contains__(self, term_id):
+        return term_id in self._ancestors
+
+    def ancestors(self, term_ids):
+        """Return the bitset of all ancestors of some terms
+
+        Terms that are not in the index are skipped.
+
+        Args:
+            term_ids(iterable(str)): HPO ids, like "HP:0001250"
+
+        Returns:
+            bitset(int)
+        """
+        bitset = 0
+        for term_id in term_ids:
+            bitset |= self._ancestors.get(term_id, 0)
+        return bitset
+
+    def case_ancestors(self, case_id, term_ids):
+        """Return the bitset of all ancestors of the phenotype terms of a case
+
+        Args:
+            case_id(str)
+            term_ids(iterable(str)): the HPO ids of the case phenotype terms
+
+        Returns:
+            bitset(int)
+        """
+        term_ids = tuple(sorted(term_ids))
+        cached = self._case_bitsets.get(case_id)
+        if cached and cached[0] == term_ids:
+            return cached[1]
+        bitset = self.ancestors(term_ids)
+        self._case_bitsets[case_id] = (term_ids, bitset)
+        return bitset
+
+    def similarity_scores(self, term_ids, case_terms):
+        """Return the UI score between some terms and the terms of a number of cases
+
+        Args:
+            term_ids(iterable(str))
+            case_terms(iterable(tuple)): (<case_id>, <list of HPO ids>)
+
+        Returns:
+            scores(dict): {<case_id>: <ui_score>}
+        """
+        query_bitset = self.ancestors(term_ids)
+        return {
+            case_id: ui_score_bits(query_bitset, self.case_ancestors(case_id, case_term_ids))
+            for case_id, case_term_ids in case_terms
+        }
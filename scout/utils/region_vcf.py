@@ -0,0 +1,209 @@
+"""Cache of bgzipped VCF files with the variants of a region
+
+The variant page shows the variants close to a variant in the alignment viewer. The region VCFs
+are written once to a cache directory, keyed by the path and modification time of the case VCF
+and by the region, and reused until they are evicted. The least recently used files are removed
+when the cache grows above its maximum size.
+"""
+import collections
+import glob
+import hashlib
+import itertools
+import logging
+import os
+import tempfile
+
+from cyvcf2 import VCF, Writer
+from pysam import tabix_index
+
+LOG = logging.getLogger(__name__)
+
+REGION_VCF_SUFFIX = ".vcf.gz"
+INDEX_SUFFIX = ".tbi"
+# Default maximum size of the cache directory, in bytes
+DEFAULT_CACHE_SIZE = 500 * 1024 * 1024
+
+
+def region_key(vcf_path, region):
+    """Return the cache key of a region in a VCF file
+
+    The modification time of the file is part of the key, so a changed file is never served from
+    the cache.
+
+    Args:
+        vcf_path(str)
+        region(str): like '1:1000-2000'
+
+    Returns:
+        key(str)
+    """
+    mtime = os.stat(vcf_path).st_mtime_ns
+    key = "{0}|{1}|{2}".format(os.path.abspath(vcf_path), mtime, region)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def write_region_vcf(vcf_path, region, out_path):
+    """Write the variants in a region of an indexed VCF file to a bgzipped VCF
+
+    The records are copied by htslib as they are read from the tabix index. The written file is
+    indexed with pysam.
+
+    Args:
+        vcf_path(str): path to an indexed VCF file
+        region(str): like '1:1000-2000', the whole file if empty
+        out_path(str): path to the bgzipped VCF file
+
+    Returns:
+        nr_variants(int)
+    """
+    try:
+        vcf_obj = VCF(vcf_path)
+    except Exception:
+        raise FileNotFoundError(
+            "Could not access {}. The file is missing or malformed".format(vcf_path)
+        )
+
+    records = vcf_obj(region) if region else iter(vcf_obj)
+    try:
+        # The index is loaded by cyvcf2 when the first record of the region is read
+        first_record = next(records, None)
+    except Exception:
+        vcf_obj.close()
+        raise FileNotFoundError("Could not find index for {}".format(vcf_path))
+
+    nr_variants = 0
+    writer = Writer(out_path, vcf_obj, mode="wz")
+    try:
+        if first_record is not None:
+            for variant in itertools.chain([first_record], records):
+                writer.write_record(variant)
+                nr_variants += 1
+    finally:
+        writer.close()
+        vcf_obj.close()
+
+    tabix_index(out_path, preset="vcf", force=True, keep_original=True)
+    return nr_variants
+
+
+class RegionVcfCache(object):
+    """Bgzipped region VCFs in a cache directory, evicted in least recently used order"""
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_CACHE_SIZE):
+        """Open a cache directory
+
+        Args:
+            cache_dir(str): defaults to a directory in the system temporary directory
+            max_size(int): the maximum number of bytes of all region VCFs in the directory
+        """
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "scout_region_vcfs")
+        self.max_size = max_size
+        # {<key>: <size>}, the most recently used last
+        self._files = collections.OrderedDict()
+        self._read_cache_dir()
+
+    def _read_cache_dir(self):
+        """Add the region VCFs that are already in the cache directory, oldest first"""
+        paths = glob.glob(os.path.join(self.cache_dir, "*" + REGION_VCF_SUFFIX))
+        files = []
+        for path in paths:
+            try:
+                files.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+        for _, path in sorted(files):
+            key = os.path.basename(path)[: -len(REGION_VCF_SUFFIX)]
+            self._files[key] = self._file_size(path)
+
+    def path(self, key):
+        """Return the path to the region VCF of a key"""
+        return os.path.join(self.cache_dir, key + REGION_VCF_SUFFIX)
+
+    @staticmethod
+    def _file_size(path):
+        """Return the size of a region VCF and its index"""
+        size = 0
+        for file_path in [path, path + INDEX_SUFFIX]:
+            try:
+                size += os.path.getsize(file_path)
+            except FileNotFoundError:
+                continue
+        return size
+
+    def size(self):
+        """Return the number of bytes of all region VCFs in the cache"""
+        return sum(self._files.values())
+
+    def __len__(self):
+        return len(self._files)
+
+    def region_vcf(self, vcf_path, region):
+        """Return the path to a bgzipped VCF with the variants of a region
+
+        The file is only written if it is not in the cache already.
+
+        Args:
+            vcf_path(str): path to an indexed VCF file
+            region(str): like '1:1000-2000'
+
+        Returns:
+            path(str)
+        """
+        if not (vcf_path and os.path.exists(vcf_path)):
+            raise FileNotFoundError("Could not access {}. The file is missing".format(vcf_path))
+
+        key = region_key(vcf_path, region)
+        path = self.path(key)
+        if key in self._files and os.path.exists(path):
+            self._files.move_to_end(key)
+            return path
+
+        # The file might have been written by another process that shares the cache directory
+        if not os.path.exists(path):
+            self._write(vcf_path, region, path)
+        self._files[key] = self._file_size(path)
+        self._files.move_to_end(key)
+        self.evict(keep=key)
+        return path
+
+    def _write(self, vcf_path, region, path):
+        """Write a region VCF to a temporary file that is then moved in place"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(file_descriptor)
+        try:
+            nr_variants = write_region_vcf(vcf_path, region, tmp_path)
+            if os.path.exists(tmp_path + INDEX_SUFFIX):
+                os.replace(tmp_path + INDEX_SUFFIX, path + INDEX_SUFFIX)
+            os.replace(tmp_path, path)
+        finally:
+            for tmp_file in [tmp_path, tmp_path + INDEX_SUFFIX]:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+        LOG.debug("Wrote %s variants in region %s of %s", nr_variants, region, vcf_path)
+
+    def evict(self, keep=None):
+        """Remove the least recently used region VCFs until the cache is below its maximum size
+
+        Args:
+            keep(str): key of a file that should not be removed
+
+        Returns:
+            nr_evicted(int)
+        """
+        nr_evicted = 0
+        total_size = self.size()
+        for key in list(self._files):
+            if total_size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            total_size -= self._files.pop(key)
+            path = self.path(key)
+            for file_path in [path, path + INDEX_SUFFIX]:
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    continue
+            nr_evicted += 1
+        return nr_evicted
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Compare the coding interval index with the interval trees it replaced
+
+Builds the merged coding intervals from random genes, with the old interval tree approach and
+with GenomicIntervalIndex, and times how long it takes to build them and to look up positions.
+No database is needed.
+"""
+import logging
+import random
+import time
+
+import click
+import coloredlogs
+
+from intervaltree import IntervalTree
+
+from scout.utils.genomic_intervals import GenomicIntervalIndex
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LOG = logging.getLogger(__name__)
+
+CHROMOSOMES = [str(i) for i in range(1, 23)] + ["X", "Y"]
+CHROM_SIZE = 150000000
+
+
+def random_genes(nr_genes, seed):
+    """Return random genes spread over the chromosomes"""
+    rand = random.Random(seed)
+    genes = []
+    for _ in range(nr_genes):
+        start = rand.randint(1, CHROM_SIZE)
+        genes.append(
+            {
+                "chromosome": rand.choice(CHROMOSOMES),
+                "start": start,
+                "end": start + rand.randint(1000, 100000),
+            }
+        )
+    return genes
+
+
+def build_trees(genes):
+    """Build merged intervals in the same way as the interval tree implementation did"""
+    intervals = {chrom: IntervalTree() for chrom in CHROMOSOMES}
+    for i, hgnc_obj in enumerate(genes):
+        chrom = hgnc_obj["chromosome"]
+        start = max((hgnc_obj["start"] - 5000), 1)
+        end = hgnc_obj["end"] + 5000
+
+        # If we have already seen this range
+        if intervals[chrom].overlaps(start, end):
+            # Merge with the overlapping intervals
+            for res in intervals[chrom][start:end]:
+                intervals[chrom].remove(res)
+                start = min(start, res.begin)
+                end = max(end, res.end)
+        intervals[chrom].addi(start, end, i)
+    return intervals
+
+
+def build_index(genes):
+    """Build merged intervals with GenomicIntervalIndex"""
+    return GenomicIntervalIndex.merged(
+        (
+            hgnc_obj["chromosome"],
+            max((hgnc_obj["start"] - 5000), 1),
+            hgnc_obj["end"] + 5000,
+        )
+        for hgnc_obj in genes
+    )
+
+
+def timed(function, *args):
+    """Return the result of a function and the number of seconds it took"""
+    start = time.time()
+    result = function(*args)
+    return result, time.time() - start
+
+
+@click.command()
+@click.option("-g", "--genes", "nr_genes", default=20000, show_default=True, help="Number of genes")
+@click.option(
+    "-p",
+    "--positions",
+    "nr_positions",
+    default=500000,
+    show_default=True,
+    help="Number of positions to look up",
+)
+@click.option("--seed", default=1, show_default=True)
+@click.option(
+    "--loglevel",
+    default="WARNING",
+    type=click.Choice(LOG_LEVELS),
+    help="Set the level of log output.",
+    show_default=True,
+)
+def benchmark(nr_genes, nr_positions, seed, loglevel):
+    """Print build and lookup times for interval trees and the interval index"""
+    coloredlogs.install(level=loglevel)
+    genes = random_genes(nr_genes, seed)
+    rand = random.Random(seed)
+    positions = sorted(
+        (rand.choice(CHROMOSOMES), rand.randint(1, CHROM_SIZE)) for _ in range(nr_positions)
+    )
+    positions_by_chrom = {}
+    for chrom, pos in positions:
+        positions_by_chrom.setdefault(chrom, []).append(pos)
+
+    trees, tree_build = timed(build_trees, genes)
+    index, index_build = timed(build_index, genes)
+
+    def tree_lookup():
+        hits = 0
+        for chrom, pos in positions:
+            if trees[chrom].overlap(pos, pos + 1):
+                hits += 1
+        return hits
+
+    def find_lookup():
+        return sum(1 for chrom, pos in positions if index.find(chrom, pos) is not None)
+
+    def locate_lookup():
+        return sum(
+            1
+            for chrom, chrom_positions in positions_by_chrom.items()
+            for res in index.locate(chrom, chrom_positions)
+            if res is not None
+        )
+
+    tree_hits, tree_seconds = timed(tree_lookup)
+    find_hits, find_seconds = timed(find_lookup)
+    locate_hits, locate_seconds = timed(locate_lookup)
+    if not tree_hits == find_hits == locate_hits:
+        LOG.warning("Lookups differ: %s, %s, %s", tree_hits, find_hits, locate_hits)
+
+    click.echo("intervals\t{0}".format(index.nr_intervals()))
+    click.echo("method\tbuild(s)\tlookup(s)\thits")
+    click.echo("IntervalTree\t{0:.3f}\t{1:.3f}\t{2}".format(tree_build, tree_seconds, tree_hits))
+    click.echo("find\t{0:.3f}\t{1:.3f}\t{2}".format(index_build, find_seconds, find_hits))
+    click.echo("locate\t{0:.3f}\t{1:.3f}\t{2}".format(index_build, locate_seconds, locate_hits))
+
+
+if __name__ == "__main__":
+    benchmark()
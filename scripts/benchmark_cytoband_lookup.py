@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Compare cytoband lookups with the cytoband index and with interval trees
+
+Collects the start and end positions of all variants in the demo vcf files and looks up their
+cytobands with interval trees, as done before, with scalar lookups in the cytoband index and with
+batched lookups per chromosome. No database is needed.
+"""
+import glob
+import logging
+import os
+import time
+
+import click
+import coloredlogs
+import intervaltree
+
+from cyvcf2 import VCF
+from pkg_resources import resource_filename
+
+from scout.constants import CHR_PATTERN
+from scout.parse.variant.coordinates import (
+    get_cytoband_coordinates,
+    get_cytoband_coordinates_batch,
+)
+from scout.resources import cytoband_files
+from scout.utils.handle import get_file_handle
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LOG = logging.getLogger(__name__)
+
+DEMO_DIR = resource_filename("scout", "demo")
+
+
+def cytoband_trees(build):
+    """Parse the cytoband resource of a build into interval trees"""
+    trees = {}
+    for line in get_file_handle(cytoband_files[build]):
+        if line.startswith("#"):
+            continue
+        splitted_line = line.rstrip().split("\t")
+        chrom = splitted_line[0].lstrip("chr")
+        trees.setdefault(chrom, intervaltree.IntervalTree())[
+            int(splitted_line[1]) : int(splitted_line[2])
+        ] = splitted_line[3]
+    return trees
+
+
+def tree_lookup(trees, chrom, pos):
+    """Look up a cytoband in interval trees"""
+    coordinate = ""
+    if chrom not in trees:
+        return coordinate
+    for interval in trees[chrom][pos]:
+        coordinate = interval.data
+    return coordinate
+
+
+def variant_positions(vcf_files):
+    """Return the start and end position of all variants, grouped by chromosome"""
+    positions = {}
+    for vcf_file in vcf_files:
+        for variant in VCF(vcf_file):
+            chrom_match = CHR_PATTERN.match(variant.CHROM)
+            chrom_positions = positions.setdefault(chrom_match.group(2), [])
+            chrom_positions.append(int(variant.POS))
+            chrom_positions.append(int(variant.end))
+    return positions
+
+
+@click.command()
+@click.option(
+    "--vcf",
+    "vcf_files",
+    type=click.Path(exists=True),
+    multiple=True,
+    help="Vcf files to collect positions from. Defaults to all demo vcf files",
+)
+@click.option("-b", "--build", type=click.Choice(["37", "38"]), default="37", show_default=True)
+@click.option(
+    "-r", "--repeats", default=3, show_default=True, help="Number of times to look up positions"
+)
+@click.option(
+    "--loglevel",
+    default="WARNING",
+    type=click.Choice(LOG_LEVELS),
+    help="Set the level of log output.",
+    show_default=True,
+)
+def benchmark(vcf_files, build, repeats, loglevel):
+    """Print the time to look up the cytobands of variant positions"""
+    coloredlogs.install(level=loglevel)
+    if not vcf_files:
+        vcf_files = sorted(glob.glob(os.path.join(DEMO_DIR, "*.vcf.gz")))
+    positions = variant_positions(vcf_files)
+    nr_positions = sum(len(chrom_positions) for chrom_positions in positions.values())
+    trees = cytoband_trees(build)
+
+    def lookup_trees():
+        return [
+            tree_lookup(trees, chrom, pos)
+            for chrom, chrom_positions in positions.items()
+            for pos in chrom_positions
+        ]
+
+    def lookup_scalar():
+        return [
+            get_cytoband_coordinates(chrom, pos, build)
+            for chrom, chrom_positions in positions.items()
+            for pos in chrom_positions
+        ]
+
+    def lookup_batch():
+        coordinates = []
+        for chrom, chrom_positions in positions.items():
+            coordinates.extend(get_cytoband_coordinates_batch(chrom, chrom_positions, build))
+        return coordinates
+
+    click.echo("files\t{0}\npositions\t{1}".format(len(vcf_files), nr_positions))
+    click.echo("method\tseconds\tpositions/s")
+    results = []
+    for name, lookup in [
+        ("IntervalTree", lookup_trees),
+        ("scalar", lookup_scalar),
+        ("batch", lookup_batch),
+    ]:
+        start = time.time()
+        for _ in range(repeats):
+            result = lookup()
+        seconds = (time.time() - start) / repeats
+        results.append(result)
+        click.echo("{0}\t{1:.4f}\t{2:.0f}".format(name, seconds, nr_positions / seconds))
+
+    if not results[0] == results[1] == results[2]:
+        LOG.warning("Cytoband lookups differ between methods")
+
+
+if __name__ == "__main__":
+    benchmark()
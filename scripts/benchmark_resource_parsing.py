@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Measure how many lines per second the Ensembl, HGNC and OMIM resource parsers handle
+
+The Ensembl and HGNC files are parsed line by line against the header, as parse_ensembl_line and
+parse_hgnc_line do, and with the header resolved once per file, as the file parsers do. The lines
+are read into memory before timing, no database is needed.
+"""
+import logging
+import time
+
+import click
+import coloredlogs
+
+from scout.demo.resources import (
+    exons37_reduced_path,
+    genemap2_reduced_path,
+    genes37_reduced_path,
+    hgnc_reduced_path,
+    mim2gene_reduced_path,
+    transcripts37_reduced_path,
+)
+from scout.parse.ensembl import (
+    parse_ensembl_exons,
+    parse_ensembl_genes,
+    parse_ensembl_line,
+    parse_ensembl_transcripts,
+)
+from scout.parse.hgnc import parse_hgnc_genes, parse_hgnc_line
+from scout.parse.omim import parse_genemap2, parse_mim2gene
+from scout.utils.handle import get_file_handle
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LOG = logging.getLogger(__name__)
+
+
+def parse_by_line(line_parser):
+    """Return a file parser that parses each line against the header with a line parser"""
+
+    def parse_lines(lines):
+        header = lines[0].rstrip().split("\t")
+        return [line_parser(line, header) for line in lines[1:]]
+
+    return parse_lines
+
+
+@click.command()
+@click.option("--ensembl-genes", type=click.Path(exists=True), default=genes37_reduced_path)
+@click.option(
+    "--ensembl-transcripts", type=click.Path(exists=True), default=transcripts37_reduced_path
+)
+@click.option("--ensembl-exons", type=click.Path(exists=True), default=exons37_reduced_path)
+@click.option("--hgnc", type=click.Path(exists=True), default=hgnc_reduced_path)
+@click.option("--genemap2", type=click.Path(exists=True), default=genemap2_reduced_path)
+@click.option("--mim2gene", type=click.Path(exists=True), default=mim2gene_reduced_path)
+@click.option(
+    "-r", "--repeats", default=5, show_default=True, help="Number of times to parse each file"
+)
+@click.option(
+    "--loglevel",
+    default="WARNING",
+    type=click.Choice(LOG_LEVELS),
+    help="Set the level of log output.",
+    show_default=True,
+)
+def benchmark(
+    ensembl_genes, ensembl_transcripts, ensembl_exons, hgnc, genemap2, mim2gene, repeats, loglevel
+):
+    """Print lines per second for each resource parser"""
+    coloredlogs.install(level=loglevel)
+
+    parsers = [
+        ("ensembl genes", ensembl_genes, "line", parse_by_line(parse_ensembl_line)),
+        ("ensembl genes", ensembl_genes, "file", parse_ensembl_genes),
+        ("ensembl transcripts", ensembl_transcripts, "line", parse_by_line(parse_ensembl_line)),
+        ("ensembl transcripts", ensembl_transcripts, "file", parse_ensembl_transcripts),
+        ("ensembl exons", ensembl_exons, "line", parse_by_line(parse_ensembl_line)),
+        ("ensembl exons", ensembl_exons, "file", parse_ensembl_exons),
+        ("hgnc", hgnc, "line", parse_by_line(parse_hgnc_line)),
+        ("hgnc", hgnc, "file", parse_hgnc_genes),
+        ("genemap2", genemap2, "file", parse_genemap2),
+        ("mim2gene", mim2gene, "file", parse_mim2gene),
+    ]
+
+    click.echo("resource\tparser\tlines\tseconds\tlines/s")
+    file_lines = {}
+    for name, path, parser_type, parser in parsers:
+        if path not in file_lines:
+            file_lines[path] = list(get_file_handle(path))
+        lines = file_lines[path]
+
+        start = time.time()
+        for _ in range(repeats):
+            nr_parsed = sum(1 for _ in parser(lines))
+        seconds = (time.time() - start) / repeats
+        LOG.info("Parsed %s entries from %s", nr_parsed, path)
+        click.echo(
+            "{0}\t{1}\t{2}\t{3:.4f}\t{4:.0f}".format(
+                name, parser_type, len(lines), seconds, len(lines) / seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
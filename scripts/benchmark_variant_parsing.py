@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Measure how many vcf records per second the variant loader parses and builds
+
+The benchmark runs the parse and build stage of the variant loader for a number of worker
+counts. No database is needed, variants are built without gene and panel information.
+"""
+import logging
+import time
+
+import click
+import coloredlogs
+
+from cyvcf2 import VCF
+from pkg_resources import resource_filename
+
+from scout.adapter.mongo.variant_loader import (
+    VariantLoader,
+    indexed_contigs,
+    parse_regions,
+    parse_stats_template,
+)
+from scout.parse.variant.headers import parse_rank_results_header, parse_vep_header
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LOG = logging.getLogger(__name__)
+
+DEMO_VCF = resource_filename("scout", "demo/643594.research.vcf.gz")
+
+
+@click.command()
+@click.option(
+    "--vcf",
+    type=click.Path(exists=True),
+    default=DEMO_VCF,
+    help="An indexed vcf file to parse",
+    show_default=True,
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=int,
+    multiple=True,
+    default=[1, 2, 4, 8],
+    help="Worker counts to benchmark",
+    show_default=True,
+)
+@click.option("--rank-treshold", default=-1000, help="Only build variants above this rank score")
+@click.option(
+    "--loglevel",
+    default="WARNING",
+    type=click.Choice(LOG_LEVELS),
+    help="Set the level of log output.",
+    show_default=True,
+)
+def benchmark(vcf, workers, rank_treshold, loglevel):
+    """Print records per second for the parse and build stage against worker count"""
+    coloredlogs.install(level=loglevel)
+
+    vcf_obj = VCF(vcf)
+    case_obj = {"_id": "benchmark", "individuals": []}
+    parse_context = {
+        "variant_file": vcf,
+        "variant_type": "clinical",
+        "case_obj": case_obj,
+        "individual_positions": {ind: i for i, ind in enumerate(vcf_obj.samples)},
+        "rank_threshold": rank_treshold,
+        "institute_id": "benchmark",
+        "rank_results_header": parse_rank_results_header(vcf_obj),
+        "vep_header": parse_vep_header(vcf_obj),
+        "category": "snv",
+        "sample_info": {},
+        "gene_to_panels": {},
+        "hgncid_to_gene": {},
+    }
+    regions = parse_regions(vcf_obj, contigs=indexed_contigs(vcf))
+    loader = VariantLoader()
+
+    click.echo("workers\trecords\tbuilt\tseconds\trecords/s")
+    for nr_workers in workers:
+        parse_stats = parse_stats_template()
+        start = time.time()
+        nr_built = sum(
+            1
+            for _ in loader._variant_objs(
+                iter(VCF(vcf)), parse_context, parse_stats, regions=regions, workers=nr_workers
+            )
+        )
+        seconds = time.time() - start
+        click.echo(
+            "{0}\t{1}\t{2}\t{3:.2f}\t{4:.0f}".format(
+                nr_workers,
+                parse_stats["parsed"],
+                nr_built,
+                seconds,
+                parse_stats["parsed"] / seconds,
+            )
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
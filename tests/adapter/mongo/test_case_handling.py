@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
+import datetime
 import pytest
 import copy
 import pymongo
 import logging
 from pprint import pprint as pp
 
+from scout.adapter.mongo.case import CASE_OVERVIEW_PROJECTION
 from scout.constants import INDEXES, REV_ACMG_MAP
 from scout.exceptions import IntegrityError
 
@@ -81,6 +83,44 @@ def test_nr_cases(adapter, case_obj):
     assert result == 1
 
 
+def test_cases_overview(real_adapter, case_obj):
+    adapter = real_adapter
+    ## GIVEN a database with two cases, updated at different times
+    case_obj["updated_at"] = datetime.datetime(2020, 1, 1)
+    adapter.case_collection.insert_one(case_obj)
+    other_case = copy.deepcopy(case_obj)
+    other_case["_id"] = other_case["display_name"] = "other_case"
+    other_case["updated_at"] = datetime.datetime(2020, 2, 1)
+    adapter.case_collection.insert_one(other_case)
+
+    ## WHEN fetching the last updated case for the case list
+    query = adapter.cases(collaborator=case_obj["owner"], yield_query=True)
+    res = list(adapter.cases_overview(query, sort={"updated_at": pymongo.DESCENDING}, limit=1))
+
+    ## THEN only the fields shown in case lists should be returned for the last updated case
+    assert [case["_id"] for case in res] == ["other_case"]
+    assert set(res[0]) <= {field.split(".")[0] for field in CASE_OVERVIEW_PROJECTION} | {"_id"}
+    assert [ind["analysis_type"] for ind in res[0]["individuals"]] == [
+        ind["analysis_type"] for ind in case_obj["individuals"]
+    ]
+    assert "phenotype" not in res[0]["individuals"][0]
+
+
+def test_cases_by_ids(adapter, case_obj):
+    ## GIVEN a database with a case
+    adapter.case_collection.insert_one(case_obj)
+
+    ## WHEN fetching the case and a case that does not exist, with a projection
+    res = adapter.cases_by_ids(
+        [case_obj["_id"], "missing_case"], projection={"display_name": 1, "owner": 1}
+    )
+
+    ## THEN only the existing case should be returned, with the projected fields
+    assert list(res) == [case_obj["_id"]]
+    assert set(res[case_obj["_id"]]) == {"_id", "display_name", "owner"}
+    assert adapter.cases_by_ids([]) == {}
+
+
 def test_search_active_case(real_adapter, case_obj, institute_obj, user_obj):
     adapter = real_adapter
 
@@ -642,9 +682,10 @@ def test_get_cases_solved_since(real_adapter, case_obj, user_obj, institute_obj,
 
 
 def test_keep_manual_rank_tag_after_reupload(
-    adapter, case_obj, variant_obj, user_obj, institute_obj
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
 ):
     """Test the code that updates custom tags (manual_rank) of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -688,9 +729,10 @@ def test_keep_manual_rank_tag_after_reupload(
 
 
 def test_keep_dismiss_variant_tag_after_reupload(
-    adapter, case_obj, variant_obj, user_obj, institute_obj
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
 ):
     """Test the code that updates custom tags (dismiss_variant) of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -733,8 +775,11 @@ def test_keep_dismiss_variant_tag_after_reupload(
     assert test_variant["dismiss_variant"] == [2, 11]
 
 
-def test_keep_mosaic_tags_after_reupload(adapter, case_obj, variant_obj, user_obj, institute_obj):
+def test_keep_mosaic_tags_after_reupload(
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
+):
     """Test the code that updates custom tags (mosaic tags) of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -777,8 +822,11 @@ def test_keep_mosaic_tags_after_reupload(adapter, case_obj, variant_obj, user_ob
     assert test_variant["mosaic_tags"] == [1, 3]
 
 
-def test_keep_cancer_tier_after_reupload(adapter, case_obj, variant_obj, user_obj, institute_obj):
+def test_keep_cancer_tier_after_reupload(
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
+):
     """Test the code that updates cancer tier of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -821,8 +869,11 @@ def test_keep_cancer_tier_after_reupload(adapter, case_obj, variant_obj, user_ob
     assert test_variant["cancer_tier"] == "2C"
 
 
-def test_keep_manual_acmg_after_reupload(adapter, case_obj, variant_obj, user_obj, institute_obj):
+def test_keep_manual_acmg_after_reupload(
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
+):
     """Test the code that updates acmg classification of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -866,9 +917,10 @@ def test_keep_manual_acmg_after_reupload(adapter, case_obj, variant_obj, user_ob
 
 
 def test_keep_variant_comments_after_reupload(
-    adapter, case_obj, variant_obj, user_obj, institute_obj
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
 ):
     """Test the code that updates comments of new variants according to the old."""
+    adapter = real_adapter
 
     old_variant = copy.deepcopy(variant_obj)
     old_variant["_id"] = "old_id"
@@ -921,3 +973,118 @@ def test_keep_variant_comments_after_reupload(
 
     # and 2 new comments should be created in the database
     assert sum(1 for i in adapter.event_collection.find()) == 4
+
+
+def test_keep_actions_of_many_variants_after_reupload(
+    real_adapter, case_obj, variant_obj, user_obj, institute_obj
+):
+    """Test updating the actions of several variants, of which one is not re-uploaded"""
+    adapter = real_adapter
+
+    ## GIVEN a database with a user and a case
+    adapter.user_collection.insert_one(user_obj)
+    adapter.case_collection.insert_one(case_obj)
+
+    ## AND two variants with a manual rank and a cancer tier, and one with a manual rank only
+    old_variants = []
+    for nr in range(3):
+        old_variant = copy.deepcopy(variant_obj)
+        old_variant["_id"] = "old_id_{}".format(nr)
+        old_variant["variant_id"] = "variant_id_{}".format(nr)
+        old_variant["display_name"] = "display_name_{}".format(nr)
+        adapter.variant_collection.insert_one(old_variant)
+        old_variant = adapter.update_manual_rank(
+            institute_obj, case_obj, user_obj, "variant_link", old_variant, manual_rank=nr + 1
+        )
+        if nr < 2:
+            old_variant = adapter.update_cancer_tier(
+                institute_obj, case_obj, user_obj, "variant_link", old_variant, cancer_tier="2C"
+            )
+        old_variants.append(old_variant)
+    nr_events = adapter.event_collection.find().count()
+
+    ## WHEN only the first two variants are re-uploaded
+    adapter.variant_collection.delete_many({})
+    for old_variant in old_variants[:2]:
+        new_variant = copy.deepcopy(old_variant)
+        new_variant["_id"] = old_variant["_id"].replace("old", "new")
+        new_variant.pop("manual_rank")
+        new_variant.pop("cancer_tier")
+        adapter.variant_collection.insert_one(new_variant)
+
+    updated_new_vars = adapter.update_variant_actions(
+        institute_obj=institute_obj,
+        case_obj=case_obj,
+        old_eval_variants=old_variants,
+    )
+
+    ## THEN the actions of the re-uploaded variants should be updated
+    assert updated_new_vars["manual_rank"] == ["new_id_0", "new_id_1"]
+    assert updated_new_vars["cancer_tier"] == ["new_id_0", "new_id_1"]
+    for nr in range(2):
+        new_variant = adapter.variant_collection.find_one({"_id": "new_id_{}".format(nr)})
+        assert new_variant["manual_rank"] == nr + 1
+        assert new_variant["cancer_tier"] == "2C"
+
+    ## AND one event should be created for each updated action
+    assert adapter.event_collection.find().count() == nr_events + 4
+    event = adapter.event_collection.find_one(
+        {"link": {"$regex": "new_id_0"}, "verb": "cancer_tier"}
+    )
+    assert event["user_id"] == user_obj["_id"]
+    assert event["variant_id"] == "variant_id_0"
+
+
+def test_update_case_sanger_variants(real_adapter, case_obj, variant_obj, user_obj, institute_obj):
+    """Test transferring the Sanger status of variants to the re-uploaded variants"""
+    adapter = real_adapter
+
+    ## GIVEN a database with a user and a case
+    adapter.user_collection.insert_one(user_obj)
+    adapter.case_collection.insert_one(case_obj)
+
+    ## AND a variant with Sanger ordered and a validated variant
+    ordered_variant = copy.deepcopy(variant_obj)
+    ordered_variant["_id"] = "ordered"
+    adapter.variant_collection.insert_one(ordered_variant)
+    ordered_variant = adapter.order_verification(
+        institute_obj, case_obj, user_obj, "variant_link", ordered_variant
+    )
+
+    validated_variant = copy.deepcopy(variant_obj)
+    validated_variant["_id"] = "validated"
+    validated_variant["variant_id"] = "validated_variant_id"
+    validated_variant["display_name"] = "validated_display_name"
+    adapter.variant_collection.insert_one(validated_variant)
+    validated_variant = adapter.validate(
+        institute_obj, case_obj, user_obj, "variant_link", validated_variant, "True positive"
+    )
+    nr_events = adapter.event_collection.find().count()
+
+    ## WHEN the variants are re-uploaded
+    adapter.variant_collection.delete_many({})
+    for old_variant in [ordered_variant, validated_variant]:
+        new_variant = copy.deepcopy(old_variant)
+        new_variant["_id"] = "new_" + old_variant["_id"]
+        new_variant.pop("sanger_ordered", None)
+        new_variant.pop("validation", None)
+        adapter.variant_collection.insert_one(new_variant)
+
+    updated_new_vars = adapter.update_case_sanger_variants(
+        institute_obj,
+        case_obj,
+        {"sanger_verified": [validated_variant], "sanger_ordered": [ordered_variant]},
+    )
+
+    ## THEN the new variants should get the same Sanger status
+    assert updated_new_vars == {
+        "updated_verified": ["new_validated"],
+        "updated_ordered": ["new_ordered"],
+    }
+    assert adapter.variant_collection.find_one({"_id": "new_ordered"})["sanger_ordered"] is True
+    assert adapter.variant_collection.find_one({"_id": "new_validated"})["validation"] == (
+        "True positive"
+    )
+
+    ## AND events should be created for the variants, and for the case when Sanger is ordered
+    assert adapter.event_collection.find().count() == nr_events + 3
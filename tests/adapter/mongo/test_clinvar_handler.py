@@ -200,3 +200,22 @@ def test_add_remove_subm_objects(adapter, institute_obj, case_obj):
     # assert that there are no objects left in clinvar collection
     submission_objects = list(adapter.clinvar_collection.find())
     assert len(submission_objects) == 0
+
+
+def test_cases_to_clinVars(real_adapter, institute_obj, case_obj):
+    """Test collecting the submission variants of a group of cases"""
+    adapter = real_adapter
+    # GIVEN a submission with a variant and its casedata for a case
+    submission_id = get_new_submission(adapter, institute_obj)
+    subm_objs = ([get_test_submission_variant(case_obj)], [get_test_submission_case(case_obj)])
+    adapter.add_to_submission(submission_id, subm_objs)
+
+    # WHEN collecting the submission variants of the case and of a case without submissions
+    res = adapter.cases_to_clinVars([case_obj["_id"], "other_case"])
+
+    # THEN the variants of each case should be the same as when collected one case at a time
+    assert res == {
+        case_obj["_id"]: adapter.case_to_clinVars(case_obj["_id"]),
+        "other_case": {},
+    }
+    assert list(res[case_obj["_id"]]) == ["a99ab86f2cb3bc18b993d740303ba27f"]
@@ -137,6 +137,33 @@ def test_fetch_disease_term_by_hgnc_id_again(adapter):
     assert len([term for term in res]) == 1
 
 
+def test_disease_terms_by_genes(adapter):
+    ## GIVEN a adapter loaded with two disease terms, one of them in two genes
+    disease_term = dict(
+        _id="OMIM:1",
+        disease_id="OMIM:1",
+        disease_nr=1,
+        source="OMIM",
+        description="First disease",
+        genes=[1, 2],
+    )
+    adapter.load_disease_term(disease_term)
+
+    disease_term["_id"] = "OMIM:2"
+    disease_term["disease_id"] = "OMIM:2"
+    disease_term["disease_nr"] = "2"
+    disease_term["genes"] = [2]
+    adapter.load_disease_term(disease_term)
+
+    ## WHEN fetching the disease terms for some genes
+    res = adapter.disease_terms_by_genes([1, 2, 3])
+
+    ## THEN assert the terms are grouped by gene
+    assert [term["_id"] for term in res[1]] == ["OMIM:1"]
+    assert {term["_id"] for term in res[2]} == {"OMIM:1", "OMIM:2"}
+    assert res[3] == []
+
+
 def test_case_omim_diagnoses(adapter, case_obj, test_omim_term):
     """Test search for all complete diagnoses for a case"""
 
@@ -169,3 +196,47 @@ def test_omim_genes(adapter, test_omim_term):
 
     # THEN it should return the right gene
     assert result[0]["hgnc_id"] == omim_gene_id
+
+
+def test_load_disease_term_bulk(adapter):
+    ## GIVEN a empty adapter
+    assert len(adapter.disease_terms()) == 0
+    disease_terms = [
+        dict(_id="OMIM:{}".format(nr), disease_nr=nr, description="Disease", genes=[1])
+        for nr in [1, 2]
+    ]
+
+    ## WHEN loading a bulk of terms
+    adapter.load_disease_term_bulk(disease_terms)
+
+    ## THEN assert that the terms were loaded
+    assert len(adapter.disease_terms()) == 2
+
+    ## THEN assert that loading them again raises an IntegrityError
+    with pytest.raises(IntegrityError):
+        adapter.load_disease_term_bulk(disease_terms)
+
+
+def test_upsert_disease_term_bulk(real_adapter):
+    adapter = real_adapter
+    ## GIVEN a database with a disease term
+    adapter.load_disease_term_bulk([dict(_id="OMIM:1", disease_nr=1, description="First")])
+
+    ## WHEN upserting a changed and a new term
+    nr_written = adapter.upsert_disease_term_bulk(
+        [
+            dict(_id="OMIM:1", disease_nr=1, description="Changed"),
+            dict(_id="OMIM:2", disease_nr=2, description="Second"),
+        ]
+    )
+
+    ## THEN assert that both terms were written
+    assert nr_written == 2
+    assert adapter.disease_term("OMIM:1")["description"] == "Changed"
+    assert adapter.disease_term(2)
+
+    ## WHEN deleting a term
+    assert adapter.delete_disease_terms(["OMIM:1"]) == 1
+
+    ## THEN assert that only the other term is left
+    assert [term["_id"] for term in adapter.disease_terms()] == ["OMIM:2"]
@@ -2,8 +2,10 @@ import pytest
 
 from scout.models.hgnc_map import HgncGene
 
+from scout.constants import INDEXES
 from scout.exceptions import IntegrityError
 
+
 #################### HGNC gene tests ####################
 def test_insert_gene(adapter, parsed_gene):
     ##GIVEN a empty adapter
@@ -91,6 +93,230 @@ def test_get_gene(adapter):
     assert res is None
 
 
+def test_hgnc_genes_by_ids(adapter):
+    ##GIVEN an adapter with two genes, one of them with a transcript
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.load_hgnc_transcript(
+        {"ensembl_transcript_id": "ENST01", "hgnc_id": 1, "start": 1, "end": 10, "build": "37"}
+    )
+
+    ##WHEN fetching the genes and a gene that does not exist
+    res = adapter.hgnc_genes_by_ids([1, 2, 3], build="37")
+
+    ##THEN assert that the existing genes are returned with their transcripts
+    assert set(res) == {1, 2}
+    assert [tx["ensembl_transcript_id"] for tx in res[1]["transcripts"]] == ["ENST01"]
+    assert res[2]["transcripts"] == []
+    ##THEN assert that there are no genes in the 38 build
+    assert adapter.hgnc_genes_by_ids([1, 2], build="38") == {}
+
+
+def test_hgnc_genes_by_ids_without_transcripts(adapter):
+    ##GIVEN an adapter with a gene with a transcript
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_transcript(
+        {"ensembl_transcript_id": "ENST01", "hgnc_id": 1, "start": 1, "end": 10, "build": "37"}
+    )
+
+    ##WHEN fetching the gene without transcripts
+    res = adapter.hgnc_genes_by_ids([1, 2], build="37", add_transcripts=False)
+
+    ##THEN assert that the gene is returned without transcripts
+    assert list(res) == [1]
+    assert res[1]["hgnc_symbol"] == "AAA"
+    assert "transcripts" not in res[1]
+
+
+def test_get_gene_transcripts(adapter):
+    ##GIVEN an adapter with a gene with transcripts in both builds
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST02", "hgnc_id": 1, "build": "38"})
+
+    ##WHEN fetching the gene by symbol
+    res = adapter.hgnc_gene(hgnc_identifier="AAA", build="37")
+
+    ##THEN assert that only the transcripts of the build are added
+    assert [tx["transcript_id"] for tx in res["transcripts"]] == ["ENST01"]
+    assert "transcript_objs" not in res
+
+
+def test_get_gene_transcripts_of_build(adapter):
+    ##GIVEN an adapter with a gene and a transcript in both builds, without $lookup pipelines
+    assert adapter.supports_pipeline_lookup() is False
+    for build in ["37", "38"]:
+        adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": build})
+        adapter.load_hgnc_transcript(
+            {"transcript_id": "ENST" + build, "hgnc_id": 1, "build": build}
+        )
+
+    ##WHEN fetching the gene of one build
+    res = adapter.hgnc_gene(hgnc_identifier="AAA", build="38")
+
+    ##THEN assert that only the transcripts of that build were fetched
+    assert [tx["transcript_id"] for tx in res["transcripts"]] == ["ENST38"]
+
+
+def test_get_gene_transcripts_of_build_lookup(real_adapter):
+    adapter = real_adapter
+    ##GIVEN an adapter with a gene and a transcript in both builds
+    assert adapter.supports_pipeline_lookup() is True
+    for build in ["37", "38"]:
+        adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": build})
+        adapter.load_hgnc_transcript(
+            {"transcript_id": "ENST" + build, "hgnc_id": 1, "build": build}
+        )
+
+    ##WHEN fetching the gene of one build with its transcripts in one aggregation
+    res = adapter.hgnc_gene(hgnc_identifier=1, build="38")
+
+    ##THEN assert that only the transcripts of that build were looked up
+    assert [tx["transcript_id"] for tx in res["transcripts"]] == ["ENST38"]
+
+
+def test_embed_transcripts(real_adapter):
+    adapter = real_adapter
+    ##GIVEN an adapter with two genes, one of them with a transcript with an exon
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "37"})
+    adapter.load_exon({"exon_id": "1-1-10", "transcript": "ENST01", "hgnc_id": 1, "build": "37"})
+    assert adapter.transcripts_embedded(build="37") is False
+
+    ##WHEN embedding the transcripts and exons in the genes
+    nr_updated = adapter.embed_transcripts(build="37", add_exons=True)
+
+    ##THEN assert that all genes were updated
+    assert nr_updated == 2
+    assert adapter.transcripts_embedded(build="37") is True
+    ##THEN assert that the genes are fetched with their embedded transcripts
+    res = adapter.hgnc_gene(hgnc_identifier=1, build="37")
+    assert [tx["transcript_id"] for tx in res["transcripts"]] == ["ENST01"]
+    assert [exon["exon_id"] for exon in res["transcripts"][0]["exons"]] == ["1-1-10"]
+    genes = adapter.hgnc_genes_by_ids([1, 2], build="37")
+    assert genes[2]["transcripts"] == []
+
+    ##WHEN removing the embedded transcripts
+    assert adapter.remove_embedded_transcripts(build="37") == 2
+
+    ##THEN assert that the transcripts are fetched from the transcript collection again
+    assert adapter.transcripts_embedded(build="37") is False
+    res = adapter.hgnc_gene(hgnc_identifier=1, build="37")
+    assert [tx["transcript_id"] for tx in res["transcripts"]] == ["ENST01"]
+
+
+def test_gene_reload(adapter):
+    ##GIVEN an adapter with a gene and a transcript in each build
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "38"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "38"})
+
+    ##WHEN reloading the genes of build 37
+    adapter.prepare_gene_reload(build="37")
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST02", "hgnc_id": 2, "build": "37"})
+
+    ##THEN assert that the live collections are unchanged during the reload
+    assert adapter.db.hgnc_gene.find({"build": "37"}).count() == 1
+    assert adapter.db.hgnc_gene.find_one({"hgnc_id": 2}) is None
+
+    ##WHEN swapping in the reloaded genes
+    adapter.swap_gene_reload()
+
+    ##THEN assert that the new genes of build 37 and the genes of build 38 are used
+    assert [gene["hgnc_id"] for gene in adapter.all_genes(build="37")] == [2]
+    assert [gene["hgnc_id"] for gene in adapter.all_genes(build="38")] == [1]
+    assert adapter.hgnc_gene(2, build="37")["transcripts"][0]["transcript_id"] == "ENST02"
+    ##THEN assert that the indexes were built and the previous genes kept
+    assert len(adapter.indexes("hgnc_gene")) == len(INDEXES["hgnc_gene"])
+    assert "hgnc_gene_shadow" not in adapter.collections()
+    assert adapter.db.hgnc_gene_previous.find({"build": "37"}).count() == 1
+
+
+def test_gene_reload_discard(adapter):
+    ##GIVEN an adapter with a gene
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+
+    ##WHEN a reload fails after some genes were loaded
+    adapter.prepare_gene_reload()
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.discard_gene_reload()
+
+    ##THEN assert that the previous genes are still used
+    assert [gene["hgnc_id"] for gene in adapter.all_genes(build="37")] == [1]
+    assert "hgnc_gene_shadow" not in adapter.collections()
+
+
+def test_gene_reload_rollback(adapter):
+    ##GIVEN an adapter without a previous generation of genes
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "37"})
+    assert adapter.rollback_gene_reload() is False
+
+    ##GIVEN that the genes have been reloaded
+    adapter.prepare_gene_reload()
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.swap_gene_reload()
+
+    ##WHEN rolling back the reload
+    assert adapter.rollback_gene_reload() is True
+
+    ##THEN assert that the previous genes and transcripts are used again
+    assert [gene["hgnc_id"] for gene in adapter.all_genes(build="37")] == [1]
+    assert adapter.hgnc_gene(1, build="37")["transcripts"][0]["transcript_id"] == "ENST01"
+
+
+def test_gene_reload_interrupted_swap(adapter, monkeypatch):
+    ##GIVEN an adapter with a gene and a transcript, that are being reloaded
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST01", "hgnc_id": 1, "build": "37"})
+    adapter.prepare_gene_reload()
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.load_hgnc_transcript({"transcript_id": "ENST02", "hgnc_id": 2, "build": "37"})
+
+    ##WHEN the swap is interrupted after the genes were swapped in, but not the transcripts
+    collection_class = type(adapter.transcript_collection)
+    rename = collection_class.rename
+
+    def interrupted_rename(collection, new_name, **kwargs):
+        if collection.name == "transcript_shadow":
+            raise RuntimeError("Interrupted")
+        return rename(collection, new_name, **kwargs)
+
+    monkeypatch.setattr(collection_class, "rename", interrupted_rename)
+    with pytest.raises(RuntimeError):
+        adapter.swap_gene_reload()
+    monkeypatch.setattr(collection_class, "rename", rename)
+    assert [gene["hgnc_id"] for gene in adapter.db.hgnc_gene.find()] == [2]
+
+    ##THEN assert the interrupted swap is recovered to the genes from before the reload
+    assert adapter.recover_gene_reload() is True
+    assert [gene["hgnc_id"] for gene in adapter.all_genes(build="37")] == [1]
+    assert [tx["transcript_id"] for tx in adapter.db.transcript.find()] == ["ENST01"]
+    assert not {"hgnc_gene_shadow", "transcript_shadow", "hgnc_gene_previous"}.intersection(
+        adapter.collections()
+    )
+    ##THEN assert there is nothing left to recover
+    assert adapter.recover_gene_reload() is False
+
+
+def test_hgncid_to_symbol(adapter):
+    ##GIVEN an adapter with two genes in build 37 and one in build 38
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 3, "hgnc_symbol": "CCC", "build": "38"})
+
+    ##WHEN fetching the symbols of build 37
+    res = adapter.hgncid_to_symbol(build="37")
+
+    ##THEN assert that all genes of the build are returned
+    assert res == {1: "AAA", 2: "BBB"}
+    ##THEN assert that the genes can be limited to some ids
+    assert adapter.hgncid_to_symbol(build="37", hgnc_ids=[2, 3]) == {2: "BBB"}
+
+
 def test_get_genes(adapter):
     ##GIVEN a empty adapter
     assert sum(1 for i in adapter.all_genes()) == 0
@@ -463,3 +689,54 @@ def test_insert_transcript(adapter):
     assert gene_res["hgnc_id"] == hgnc_id
     assert len(gene_res["transcripts"]) == 1
     assert gene_res["transcripts"][0]["refseq_id"] == refseq_id
+
+
+def test_gene_snapshot(adapter, tmpdir):
+    ## GIVEN an adapter with a gene and a gene cache directory
+    adapter.gene_cache_dir = str(tmpdir)
+    gene_obj = {
+        "hgnc_id": 1,
+        "hgnc_symbol": "AAA",
+        "build": "37",
+        "chromosome": "1",
+        "start": 10000,
+        "end": 20000,
+        "aliases": ["AAA", "AAB"],
+    }
+    adapter.load_hgnc_gene(gene_obj)
+
+    ## WHEN fetching the gene snapshot
+    snapshot = adapter.gene_snapshot(build="37")
+
+    ## THEN assert the gene and its coding interval is in the snapshot
+    assert snapshot["hgncid_to_gene"][1]["hgnc_symbol"] == "AAA"
+    assert "aliases" not in snapshot["hgncid_to_gene"][1]
+    assert snapshot["coding_intervals"].find("1", 15000)
+    ## THEN assert the snapshot is reused from memory
+    assert adapter.gene_snapshot(build="37") is snapshot
+    ## THEN assert the snapshot was cached on disk
+    assert len(tmpdir.listdir()) == 1
+
+
+def test_gene_snapshot_invalidated(adapter, tmpdir):
+    ## GIVEN an adapter with a gene snapshot
+    adapter.gene_cache_dir = str(tmpdir)
+    gene_obj = {"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37", "chromosome": "1"}
+    gene_obj.update({"start": 10000, "end": 20000})
+    adapter.load_hgnc_gene(gene_obj)
+    snapshot = adapter.gene_snapshot(build="37")
+    assert len(snapshot["hgncid_to_gene"]) == 1
+
+    ## WHEN the genes are updated
+    gene_obj = {"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37", "chromosome": "2"}
+    gene_obj.update({"start": 10000, "end": 20000})
+    adapter.load_hgnc_gene(gene_obj)
+
+    ## THEN assert a new snapshot is built
+    assert len(adapter.gene_snapshot(build="37")["hgncid_to_gene"]) == 2
+
+    ## WHEN clearing the snapshots
+    adapter.clear_gene_snapshots()
+
+    ## THEN assert the cache directory is empty
+    assert tmpdir.listdir() == []
@@ -181,3 +181,36 @@ def test_fetch_all_hpo_terms_query_description_term(real_adapter):
 
     ## THEN assert only one term was matched
     assert len([term for term in res]) == 2
+
+
+def test_hpo_ancestor_index_reloaded(adapter):
+    ## GIVEN an adapter with two hpo terms and their ancestor index
+    adapter.load_hpo_bulk(
+        [{"_id": "HP:1", "all_ancestors": []}, {"_id": "HP:2", "all_ancestors": []}]
+    )
+    assert adapter.hpo_ancestor_index().ancestors(["HP:2"]) == 0
+
+    ## WHEN the terms are reloaded with the same number of terms but other ancestors
+    adapter.hpo_term_collection.drop()
+    adapter.load_hpo_bulk(
+        [{"_id": "HP:1", "all_ancestors": []}, {"_id": "HP:2", "all_ancestors": ["HP:1"]}]
+    )
+
+    ## THEN assert the index is rebuilt with the new ancestors
+    hpo_index = adapter.hpo_ancestor_index()
+    assert hpo_index.ancestors(["HP:2"]) == hpo_index.ancestors(["HP:1", "HP:2"]) != 0
+
+
+def test_hpo_term_collection_checksum(real_adapter):
+    ## GIVEN a database with hpo terms
+    adapter = real_adapter
+    adapter.load_hpo_bulk([{"_id": "HP:1", "all_ancestors": []}])
+    checksum = adapter.hpo_term_collection_checksum()
+    assert adapter.hpo_term_collection_checksum() == checksum
+
+    ## WHEN the terms are dropped and reloaded, with the same number of terms
+    adapter.hpo_term_collection.drop()
+    adapter.load_hpo_bulk([{"_id": "HP:1", "all_ancestors": ["HP:2"]}])
+
+    ## THEN assert the checksum has changed
+    assert adapter.hpo_term_collection_checksum() != checksum
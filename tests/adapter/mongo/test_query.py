@@ -1,3 +1,5 @@
+import copy
+
 from scout.constants import CLINSIG_MAP, TRUSTED_REVSTAT_LEVEL
 import re
 from pymongo import ReturnDocument
@@ -20,6 +22,26 @@ def test_build_gene_variant_query(adapter):
     assert gene_variant_query["hgnc_symbols"] == {"$in": hgnc_symbols}  # given
 
 
+def test_build_similar_case_variant_query(hpo_database, test_hpo_terms, case_obj):
+    adapter = hpo_database
+
+    # GIVEN a case with phenotype terms and a case with part of the terms
+    case_obj["phenotype_terms"] = test_hpo_terms
+    adapter.case_collection.insert_one(case_obj)
+    case_2 = copy.deepcopy(case_obj)
+    case_2["_id"] = "case_2"
+    case_2["display_name"] = "case_2"
+    case_2["phenotype_terms"] = test_hpo_terms[:-1]
+    adapter.case_collection.insert_one(case_2)
+
+    # WHEN building a query for variants in cases similar to the first case
+    query = {"similar_case": [case_obj["display_name"]]}
+    gene_variant_query = adapter.build_variant_query(query=query, institute_id=case_obj["owner"])
+
+    # THEN the variants should be searched in the similar case
+    assert gene_variant_query["case_id"] == {"$in": ["case_2"]}
+
+
 def test_build_query(adapter):
     case_id = "cust000"
 
@@ -712,6 +734,49 @@ def test_query_svs_by_coordinates(real_populated_database, sv_variant_objs, case
     assert list(results)[0] == updated_variant
 
 
+def test_overlapping_by_variants(adapter, case_obj):
+    """Test finding the overlapping SVs of a group of SNVs"""
+    ## GIVEN a database with more SVs in one gene than are shown, and a few SVs in another gene
+    for index in range(40):
+        hgnc_ids = [1] if index % 4 else [1, 2]
+        adapter.variant_collection.insert_one(
+            {
+                "_id": "sv_{}".format(index),
+                "case_id": case_obj["_id"],
+                "category": "sv",
+                "variant_type": "clinical",
+                "hgnc_ids": hgnc_ids,
+                "rank_score": index,
+                "genes": [{"hgnc_id": hgnc_id} for hgnc_id in hgnc_ids],
+            }
+        )
+    ## GIVEN SNVs in one or both genes
+    snvs = [
+        {
+            "_id": "snv_{}".format(hgnc_id),
+            "case_id": case_obj["_id"],
+            "category": "snv",
+            "variant_type": "clinical",
+            "hgnc_ids": [hgnc_id],
+        }
+        for hgnc_id in [1, 2, 3]
+    ]
+
+    ## WHEN fetching the overlapping variants of all SNVs at once
+    overlapping = adapter.overlapping_by_variants(snvs)
+
+    ## THEN the result is the same as when fetched one SNV at a time
+    for snv in snvs:
+        assert [ovl["_id"] for ovl in overlapping[snv["_id"]]] == [
+            ovl["_id"] for ovl in adapter.overlapping(snv)
+        ]
+    assert len(overlapping["snv_1"]) == 30
+    assert len(overlapping["snv_2"]) == 10
+    assert overlapping["snv_3"] == []
+    ## THEN only the fields shown in variant lists are returned
+    assert "genes" not in overlapping["snv_1"][0]
+
+
 def test_get_overlapping_variant(real_variant_database, case_obj, variant_objs):
     """Test function that finds SVs overlapping to a given SNV"""
 
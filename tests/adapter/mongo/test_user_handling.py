@@ -144,3 +144,21 @@ def test_get_nonexisting_user(adapter):
     user_obj = adapter.user(email="john.doe@mail.com")
     ## THEN assert the user is None
     assert user_obj is None
+
+
+def test_users_by_emails(adapter):
+    ## GIVEN an adapter with two users
+    for i in range(1, 3):
+        user_info = {
+            "email": "clark.kent{}@mail.com".format(i),
+            "location": "here",
+            "name": "Clark Kent",
+            "institutes": ["test-1"],
+        }
+        adapter.add_user(build_user(user_info))
+    ## WHEN fetching one of the users and a user that does not exist
+    res = adapter.users_by_emails(["clark.kent1@mail.com", "lois.lane@mail.com"])
+
+    ## THEN assert that only the existing user is returned
+    assert list(res) == ["clark.kent1@mail.com"]
+    assert res["clark.kent1@mail.com"] == adapter.user(email="clark.kent1@mail.com")
@@ -386,3 +386,80 @@ def test_sanger_ordered(adapter, institute_obj, case_obj, user_obj, variant_obj)
     sanger_results = adapter.sanger_ordered(case_id=case_obj["_id"])
     assert sanger_results[0]["_id"] == case_obj["_id"]
     assert [var for var in sanger_results[0]["vars"]] == [updated_variant["variant_id"]]
+
+
+def test_sanger_unevaluated(real_adapter, institute_obj, case_obj, user_obj, variant_obj):
+    """Test fetching the variants with Sanger ordered but not evaluated, with their cases"""
+    adapter = real_adapter
+    # GIVEN a database with a case and two variants
+    adapter.case_collection.insert_one(case_obj)
+    adapter.institute_collection.insert_one(institute_obj)
+    adapter.user_collection.insert_one(user_obj)
+    adapter.variant_collection.insert_one(variant_obj)
+    other_variant = dict(variant_obj, _id="other_variant", variant_id="other_variant_id")
+    adapter.variant_collection.insert_one(other_variant)
+
+    # WHEN ordering sanger for both variants and validating one of them
+    for variant in [variant_obj, other_variant]:
+        adapter.order_verification(
+            institute=institute_obj,
+            case=case_obj,
+            user=user_obj,
+            link="orderSangerlink",
+            variant=variant,
+        )
+    adapter.validate(
+        institute=institute_obj,
+        case=case_obj,
+        user=user_obj,
+        link="validateLink",
+        variant=other_variant,
+        validate_type="True positive",
+    )
+
+    # THEN only the variant that is not evaluated should be returned, with the case display name
+    res = list(adapter.sanger_unevaluated(institute_obj["_id"], user_obj["_id"]))
+    assert len(res) == 1
+    assert res[0]["_id"] == case_obj["_id"]
+    assert res[0]["display_name"] == case_obj["display_name"]
+    assert res[0]["vars"] == [variant_obj["_id"]]
+
+    # THEN no variants should be returned for a user that did not order Sanger
+    assert list(adapter.sanger_unevaluated(institute_obj["_id"], "other_user")) == []
+    # THEN no variants should be returned for another institute
+    assert list(adapter.sanger_unevaluated("other_institute")) == []
+
+    # WHEN the case is removed
+    adapter.case_collection.delete_one({"_id": case_obj["_id"]})
+
+    # THEN its variants should not be returned
+    assert list(adapter.sanger_unevaluated(institute_obj["_id"], user_obj["_id"])) == []
+
+
+def test_sanger_unevaluated_collaborator(
+    real_adapter, institute_obj, case_obj, user_obj, variant_obj
+):
+    """Test fetching the variants with Sanger ordered by an institute that collaborates on a case"""
+    adapter = real_adapter
+    # GIVEN a case shared with a collaborating institute, and a variant of the case
+    collaborator_obj = dict(institute_obj, _id="cust002", internal_id="cust002")
+    adapter.case_collection.insert_one(dict(case_obj, collaborators=[case_obj["owner"], "cust002"]))
+    adapter.institute_collection.insert_many([institute_obj, collaborator_obj])
+    adapter.user_collection.insert_one(user_obj)
+    adapter.variant_collection.insert_one(variant_obj)
+
+    # WHEN the collaborating institute orders Sanger for the variant
+    adapter.order_verification(
+        institute=collaborator_obj,
+        case=case_obj,
+        user=user_obj,
+        link="orderSangerlink",
+        variant=variant_obj,
+    )
+
+    # THEN the variant should be returned for the collaborating institute
+    res = list(adapter.sanger_unevaluated("cust002"))
+    assert len(res) == 1
+    assert res[0]["vars"] == [variant_obj["_id"]]
+    # THEN the variant should not be returned for the owner, which did not order Sanger
+    assert list(adapter.sanger_unevaluated(case_obj["owner"])) == []
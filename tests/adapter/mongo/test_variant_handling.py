@@ -1,4 +1,5 @@
 """Tests for variant handling"""
+
 import logging
 import os
 
@@ -306,6 +307,92 @@ def test_variant_non_existing(adapter):
     assert res is None
 
 
+def test_variants_after_variant_rank(real_variant_database, case_obj):
+    """Test to fetch a page of variants after the last rank of the previous page"""
+    adapter = real_variant_database
+    # GIVEN a database with ranked variants
+    all_variants = list(adapter.variants(case_obj["_id"], nr_of_variants=-1))
+    assert len(all_variants) > 10
+
+    # WHEN fetching the variants after the fifth variant
+    res = list(
+        adapter.variants(
+            case_obj["_id"], nr_of_variants=5, after_variant_rank=all_variants[4]["variant_rank"]
+        )
+    )
+
+    # THEN assert the same variants are returned as when skipping the first five
+    assert [var["_id"] for var in res] == [var["_id"] for var in all_variants[5:10]]
+
+
+def test_variants_after_variant_rank_wrong_sort(real_variant_database, case_obj):
+    """Test that pages after a variant rank requires sorting on variant rank"""
+    adapter = real_variant_database
+    # WHEN fetching variants after a rank, sorted on position
+    # THEN assert that an error is raised
+    with pytest.raises(ValueError):
+        adapter.variants(case_obj["_id"], sort_key="position", after_variant_rank=5)
+
+
+def test_add_gene_info_batch(adapter):
+    """Test to add gene information to many variants at once"""
+    # GIVEN an adapter with a gene, its transcript and a disease term
+    adapter.load_hgnc_gene(
+        {"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37", "incomplete_penetrance": True}
+    )
+    adapter.load_hgnc_transcript(
+        {
+            "ensembl_transcript_id": "ENST01",
+            "hgnc_id": 1,
+            "refseq_id": "NM_1",
+            "start": 1,
+            "end": 10,
+            "build": "37",
+        }
+    )
+    adapter.load_disease_term(
+        dict(_id="OMIM:1", disease_id="OMIM:1", disease_nr=1, source="OMIM", genes=[1])
+    )
+    # GIVEN some variants in the gene and a variant in a gene that is not in the database
+    variants = [
+        {"genes": [{"hgnc_id": 1, "transcripts": [{"transcript_id": "ENST01"}]}]} for _ in range(3)
+    ]
+    variants.append({"genes": [{"hgnc_id": 2}]})
+
+    # WHEN adding gene information to the variants
+    res = adapter.add_gene_info_batch(variants, build="37")
+
+    # THEN assert the variants got the same information as when adding it one by one
+    for variant_obj in res[:3]:
+        variant_gene = variant_obj["genes"][0]
+        assert variant_obj["has_refseq"] is True
+        assert variant_gene["omim_penetrance"] is True
+        assert variant_gene["common"]["hgnc_symbol"] == "AAA"
+        assert variant_gene["transcripts"][0]["refseq_id"] == "NM_1"
+        assert [term["_id"] for term in variant_gene["disease_terms"]] == ["OMIM:1"]
+        assert variant_obj == adapter.add_gene_info(
+            {"genes": [{"hgnc_id": 1, "transcripts": [{"transcript_id": "ENST01"}]}]}, build="37"
+        )
+    # THEN assert that the gene that is missing is skipped
+    assert "common" not in res[3]["genes"][0]
+
+
+def test_variants_by_document_ids(real_variant_database, case_obj):
+    """Test to fetch a group of variants with one query"""
+    adapter = real_variant_database
+    # GIVEN a database with variants
+    variants = list(adapter.variants(case_obj["_id"], nr_of_variants=5))
+    document_ids = [var["_id"] for var in variants]
+
+    # WHEN fetching the variants and a variant that does not exist
+    res = adapter.variants_by_document_ids(document_ids + ["nonexisting"])
+
+    # THEN assert the existing variants are returned, as when they are fetched one by one
+    assert set(res) == set(document_ids)
+    for document_id in document_ids:
+        assert res[document_id] == adapter.variant(document_id=document_id)
+
+
 def test_case_variants_count(real_populated_database, case_obj, institute_obj, variant_objs):
     """Test the functions that counts the variants by category for a case"""
 
@@ -1,5 +1,18 @@
+import gzip
 from pprint import pprint as pp
+
 from cyvcf2 import VCF
+from pysam import tabix_index
+
+import scout.adapter.mongo.variant_loader as variant_loader
+from scout.adapter.mongo.variant_loader import (
+    _init_parse_worker,
+    _parse_region,
+    build_variant_obj,
+    indexed_contigs,
+    parse_regions,
+    VariantBulkWriter,
+)
 
 
 def test_update_variant_rank_no_variants(real_populated_database):
@@ -25,3 +38,175 @@ def test_load_variants_high_treshold(real_populated_database, case_obj):
         vcf, "clinical", case_obj, individual_positions, rankscore_treshold, "cut000"
     )
     assert nr_inserted == 0
+
+
+def test_build_variant_obj_high_treshold(one_variant, case_obj):
+    ## GIVEN a parse context with a rank score treshold that no variant passes
+    parse_context = {
+        "variant_type": "clinical",
+        "case_obj": case_obj,
+        "individual_positions": {"ADM1059A2": 0, "ADM1059A1": 1, "ADM1059A3": 2},
+        "rank_threshold": 1000000,
+        "institute_id": "cust000",
+        "rank_results_header": None,
+        "vep_header": None,
+        "category": "snv",
+        "sample_info": None,
+        "gene_to_panels": {},
+        "hgncid_to_gene": {},
+    }
+    ## WHEN building the variant object
+    variant_obj = build_variant_obj(one_variant, parse_context)
+    ## THEN assert that the variant is skipped
+    assert variant_obj is None
+
+    ## WHEN lowering the treshold
+    parse_context["rank_threshold"] = -1000
+    variant_obj = build_variant_obj(one_variant, parse_context)
+    ## THEN assert that a variant object is built
+    assert variant_obj["case_id"] == case_obj["_id"]
+
+
+def test_load_variants_parallel(real_populated_database, case_obj):
+    adapter = real_populated_database
+    ## GIVEN a database with the variants of a case loaded with one process
+    adapter.load_variants(case_obj=case_obj, category="snv", rank_threshold=-1000)
+    serial_variants = {var["_id"]: var for var in adapter.variant_collection.find()}
+    assert serial_variants
+    adapter.delete_variants(case_obj["_id"], "clinical")
+
+    ## WHEN loading the same variants with several processes
+    nr_inserted = adapter.load_variants(
+        case_obj=case_obj, category="snv", rank_threshold=-1000, workers=2
+    )
+
+    ## THEN assert that the same variants with the same compounds are loaded
+    parallel_variants = {var["_id"]: var for var in adapter.variant_collection.find()}
+    assert nr_inserted == len(serial_variants)
+    assert set(parallel_variants) == set(serial_variants)
+    for var_id, variant in parallel_variants.items():
+        assert variant.get("compounds") == serial_variants[var_id].get("compounds")
+        assert variant["variant_rank"] == serial_variants[var_id]["variant_rank"]
+
+
+def test_parse_regions(case_obj, monkeypatch):
+    ## GIVEN a vcf with structural variants, and variants that only record their position
+    vcf_file = case_obj["vcf_files"]["vcf_sv"]
+    monkeypatch.setattr(
+        variant_loader,
+        "build_variant_obj",
+        lambda variant, parse_context, parse_stats=None: (variant.CHROM, variant.POS, variant.end),
+    )
+    serial_variants = [(var.CHROM, var.POS, var.end) for var in VCF(vcf_file)]
+
+    ## WHEN splitting the chromosomes into small regions
+    regions = parse_regions(VCF(vcf_file), region_size=1000000)
+
+    ## THEN assert that the regions of a chromosome follow each other
+    chrom_regions = [region for region in regions if region[0] == regions[0][0]]
+    assert chrom_regions[0][1] == 1
+    assert chrom_regions[1][1] == chrom_regions[0][2] + 1
+    assert chrom_regions[-1][2] is None
+
+    ## WHEN parsing the regions one by one
+    _init_parse_worker({"variant_file": vcf_file})
+    region_variants = []
+    for region in regions:
+        region_stats, variant_objs = _parse_region(region)
+        assert region_stats["parsed"] == len(variant_objs)
+        region_variants.extend(variant_objs)
+
+    ## THEN assert each variant is parsed once, in the order of the vcf
+    assert region_variants == serial_variants
+
+    ## WHEN splitting a chromosome inside a structural variant
+    chrom, pos, end = next(var for var in serial_variants if var[2] > var[1] + 1)
+    split = (pos + end) // 2
+    region_variants = []
+    for region in [(chrom, 1, split), (chrom, split + 1, None)]:
+        region_variants.extend(_parse_region(region)[1])
+
+    ## THEN assert the variant is only parsed in the region where it starts
+    assert region_variants == [var for var in serial_variants if var[0] == chrom]
+
+
+def test_parse_regions_contig_missing_from_header(case_obj, tmpdir, monkeypatch):
+    ## GIVEN an indexed vcf where the first chromosome is missing from the header
+    monkeypatch.setattr(
+        variant_loader,
+        "build_variant_obj",
+        lambda variant, parse_context, parse_stats=None: (variant.CHROM, variant.POS),
+    )
+    serial_variants = [(var.CHROM, var.POS) for var in VCF(case_obj["vcf_files"]["vcf_sv"])]
+    chrom = serial_variants[0][0]
+    vcf_file = str(tmpdir.join("missing_contig.vcf"))
+    with gzip.open(case_obj["vcf_files"]["vcf_sv"], "rt") as vcf_lines:
+        with open(vcf_file, "w") as out_file:
+            for line in vcf_lines:
+                if not line.startswith("##contig=<ID={},".format(chrom)):
+                    out_file.write(line)
+    vcf_file = tabix_index(vcf_file, preset="vcf")
+    assert "##contig=<ID={},".format(chrom) not in VCF(vcf_file).raw_header
+
+    ## WHEN splitting the chromosomes in the index into regions
+    regions = parse_regions(VCF(vcf_file), contigs=indexed_contigs(vcf_file))
+
+    ## THEN assert the chromosome is parsed as one region
+    assert (chrom, 1, None) in regions
+
+    ## THEN assert all variants are parsed, in the order of the vcf
+    _init_parse_worker({"variant_file": vcf_file})
+    region_variants = []
+    for region in regions:
+        region_variants.extend(_parse_region(region)[1])
+    assert region_variants == serial_variants
+
+
+def test_variant_bulk_writer(adapter):
+    ## GIVEN an empty database and a bulk writer with a small queue
+    assert sum(1 for i in adapter.variant_collection.find()) == 0
+    bulk_writer = VariantBulkWriter(adapter, max_bulks=1)
+
+    ## WHEN putting bulks of variants on the queue, with one variant twice
+    for i in range(5):
+        bulk_writer.put([{"_id": "{}_{}".format(i, j)} for j in range(10)])
+    bulk_writer.put([{"_id": "0_0"}, {"_id": "extra"}])
+    bulk_writer.close()
+
+    ## THEN assert that all bulks are written and duplicates are handled
+    assert bulk_writer.nr_bulks == 6
+    assert sum(1 for i in adapter.variant_collection.find()) == 51
+
+
+def test_update_variant_rank(real_adapter, case_obj):
+    adapter = real_adapter
+    ## GIVEN variants with rank scores, one of them with the correct variant rank
+    adapter.variant_collection.insert_many(
+        [
+            {
+                "_id": str(rank_score),
+                "case_id": case_obj["_id"],
+                "category": "snv",
+                "variant_type": "clinical",
+                "rank_score": rank_score,
+                "variant_rank": 1 if rank_score == 30 else None,
+            }
+            for rank_score in [10, 30, 20]
+        ]
+    )
+
+    ## WHEN updating the variant ranks
+    adapter.update_variant_rank(case_obj, "clinical", category="snv")
+
+    ## THEN assert that the variants are ranked by rank score
+    ranks = {var["_id"]: var["variant_rank"] for var in adapter.variant_collection.find()}
+    assert ranks == {"30": 1, "20": 2, "10": 3}
+
+
+def test_supports_window_fields(adapter):
+    ## GIVEN an adapter without a server that supports $setWindowFields
+    ## WHEN checking if window fields are supported
+    ## THEN assert that the ranks are not set with an aggregation
+    assert adapter.supports_window_fields() is False
+    ## THEN assert that the result is cached
+    assert adapter._supports_window_fields is False
@@ -25,3 +25,22 @@ def test_update_compounds(mock_app, case_obj):
     # command should work
     assert result.exit_code == 0
     assert "All compounds updated" in result.output
+
+
+def test_update_compounds_region(mock_app, case_obj):
+    """Tests the CLI that updates the compounds of a region"""
+
+    runner = mock_app.test_cli_runner()
+
+    # Provide a malformed region
+    result = runner.invoke(cli, ["update", "compounds", case_obj["_id"], "--region", "1:1000"])
+    # it should return error message
+    assert result.exit_code != 0
+    assert "Region should be formatted like 1:1000-2000" in result.output
+
+    # Provide a region
+    result = runner.invoke(
+        cli, ["update", "compounds", case_obj["_id"], "--region", "1:1-249250621"]
+    )
+    # command should work
+    assert result.exit_code == 0
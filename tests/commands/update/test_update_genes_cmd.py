@@ -12,3 +12,17 @@ def test_update_genes_wrong_omim_key(mock_app):
     # Test CLI base, provide non-valid API key
     result = runner.invoke(cli, ["update", "genes", "--api-key", "not_a_valid_key"])
     assert result.exit_code != 0
+
+
+def test_update_genes_rollback(mock_app):
+    """Tests the CLI that swaps back the genes from before the last update"""
+
+    runner = mock_app.test_cli_runner()
+    assert runner
+
+    # GIVEN a database where the genes have not been updated
+    # WHEN rolling back the genes
+    result = runner.invoke(cli, ["update", "genes", "--rollback"])
+
+    # THEN the command should fail since there is no previous generation of genes
+    assert result.exit_code != 0
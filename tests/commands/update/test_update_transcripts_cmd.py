@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from scout.commands import cli
+from scout.server.extensions import store
+
+
+def test_update_embed_transcripts(mock_app):
+    """Tests the CLI that embeds the transcripts in the genes"""
+
+    runner = mock_app.test_cli_runner()
+    assert runner
+
+    # GIVEN a database with genes and transcripts
+    gene_obj = store.hgnc_collection.find_one({"build": "37"})
+    assert gene_obj
+    assert "transcripts" not in gene_obj
+    nr_transcripts = sum(1 for _ in store.transcripts(build="37", hgnc_id=gene_obj["hgnc_id"]))
+
+    # WHEN embedding the transcripts of build 37
+    result = runner.invoke(cli, ["update", "embed-transcripts", "--build", "37"])
+
+    # THEN the command should work
+    assert result.exit_code == 0
+    # THEN the transcripts should be embedded in the genes
+    gene_obj = store.hgnc_collection.find_one({"_id": gene_obj["_id"]})
+    assert len(gene_obj["transcripts"]) == nr_transcripts
+
+    # WHEN removing the embedded transcripts
+    result = runner.invoke(cli, ["update", "embed-transcripts", "--build", "37", "--remove"])
+
+    # THEN the transcripts should be removed from the genes
+    assert result.exit_code == 0
+    assert "transcripts" not in store.hgnc_collection.find_one({"_id": gene_obj["_id"]})
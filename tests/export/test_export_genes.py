@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+from scout.export.gene import GeneSymbolResolver
+from scout.export.variant import export_mt_variants, export_verified_variants
+
+
+def test_gene_symbol_resolver(adapter):
+    ## GIVEN an adapter with two genes
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB", "build": "37"})
+    ## AND variants with genes with outdated, missing and unknown symbols
+    variants = [
+        {"genes": [{"hgnc_id": 1, "hgnc_symbol": "OLD"}, {"hgnc_id": 2, "hgnc_symbol": None}]},
+        {"genes": [{"hgnc_id": 3, "hgnc_symbol": "CCC"}, {"hgnc_id": 4}]},
+    ]
+
+    ## WHEN prefetching the symbols of the variant genes
+    gene_symbols = GeneSymbolResolver(adapter)
+    gene_symbols.prefetch(variants)
+
+    ## THEN assert the symbols from the database are used
+    assert gene_symbols.symbol(variants[0]["genes"][0]) == "AAA"
+    assert gene_symbols.symbol(variants[0]["genes"][1]) == "BBB"
+    ## THEN assert the variant symbol is used for genes missing in the database
+    assert gene_symbols.symbol(variants[1]["genes"][0]) == "CCC"
+    assert gene_symbols.symbol(variants[1]["genes"][1], default="") == ""
+    ## THEN assert the fetched genes are not fetched again
+    assert gene_symbols.fetched_ids == {1, 2, 3, 4}
+
+
+def test_export_mt_variants_gene_symbols(adapter):
+    ## GIVEN a MT variant with a gene without symbol
+    adapter.load_hgnc_gene({"hgnc_id": 7421, "hgnc_symbol": "MT-ND1", "build": "37"})
+    variant = {
+        "chromosome": "MT",
+        "position": 3307,
+        "reference": "A",
+        "alternative": "G",
+        "genes": [{"hgnc_id": 7421, "hgnc_symbol": None, "transcripts": []}],
+        "samples": [{"sample_id": "ADM1059A2", "allele_depths": [10, 20]}],
+    }
+
+    ## WHEN exporting the variant with a gene symbol resolver
+    gene_symbols = GeneSymbolResolver(adapter)
+    lines = export_mt_variants([variant], "ADM1059A2", gene_symbols=gene_symbols)
+
+    ## THEN assert the gene symbol from the database is exported
+    assert lines[0][3] == "MT-ND1"
+
+
+def test_export_verified_variants_gene_symbols(adapter):
+    ## GIVEN a gene with different symbols in build 37 and 38, and a gene only in build 38
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "37"})
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA38", "build": "38"})
+    adapter.load_hgnc_gene({"hgnc_id": 2, "hgnc_symbol": "BBB38", "build": "38"})
+    ## AND a verified variant in a build 38 case, with a stored symbol for one of its genes
+    variant = {
+        "_id": "a_variant",
+        "institute": "cust000",
+        "category": "snv",
+        "variant_type": "clinical",
+        "display_name": "1_10_A_C",
+        "validation": "True positive",
+        "chromosome": "1",
+        "position": 10,
+        "reference": "A",
+        "alternative": "C",
+        "genes": [
+            {
+                "hgnc_id": 1,
+                "hgnc_symbol": "OWN",
+                "functional_annotation": "missense_variant",
+                "transcripts": [],
+            },
+            {"hgnc_id": 2, "functional_annotation": "intron_variant", "transcripts": []},
+        ],
+        "samples": [
+            {
+                "sample_id": "ADM1059A2",
+                "display_name": "NA12882",
+                "allele_depths": [10, 20],
+                "genotype_quality": 99,
+            }
+        ],
+        "case_obj": {
+            "display_name": "643594",
+            "genome_build": "38",
+            "individuals": [{"individual_id": "ADM1059A2", "phenotype": 2}],
+        },
+    }
+
+    ## WHEN exporting the variant with gene symbol resolvers for both builds
+    gene_symbols = {build: GeneSymbolResolver(adapter, build=build) for build in ["37", "38"]}
+    lines = export_verified_variants([variant], set(), gene_symbols=gene_symbols)
+
+    ## THEN assert the stored symbol is kept and the missing one is resolved in build 38
+    assert "OWN,BBB38" in lines[0]
+    ## THEN assert only the gene without a stored symbol was fetched
+    assert gene_symbols["38"].fetched_ids == {2}
+    assert gene_symbols["37"].fetched_ids == set()
@@ -71,3 +71,40 @@ def test_load_hpo(
 
     assert len([term for term in hpo_terms_objs]) > 0
     assert len([disease for disease in disease_objs]) > 0
+
+
+def test_load_disease_terms_diff(real_gene_database, genemap_file, hpo_disease_handle):
+    adapter = real_gene_database
+    alias_genes = adapter.genes_by_alias()
+    hpo_disease_lines = list(hpo_disease_handle)
+
+    # GIVEN a database with the disease terms loaded
+    load_disease_terms(
+        adapter=adapter,
+        genemap_lines=get_file_handle(genemap_file),
+        genes=alias_genes,
+        hpo_disease_lines=hpo_disease_lines,
+    )
+    disease_objs = adapter.disease_terms()
+    # AND one changed and one removed term
+    changed_term, removed_id = disease_objs[0], disease_objs[1]["_id"]
+    adapter.disease_term_collection.update_one(
+        {"_id": changed_term["_id"]}, {"$set": {"description": "Outdated"}}
+    )
+    adapter.disease_term_collection.insert_one(dict(_id="OMIM:1", disease_nr=1))
+    adapter.disease_term_collection.delete_one({"_id": removed_id})
+
+    # WHEN loading the disease terms in diff mode
+    load_disease_terms(
+        adapter=adapter,
+        genemap_lines=get_file_handle(genemap_file),
+        genes=alias_genes,
+        hpo_disease_lines=hpo_disease_lines,
+        diff=True,
+    )
+
+    # THEN make sure that the terms are the same as after a full load
+    def by_id(disease_obj):
+        return disease_obj["_id"]
+
+    assert sorted(adapter.disease_terms(), key=by_id) == sorted(disease_objs, key=by_id)
@@ -1,4 +1,13 @@
-from scout.load.setup import setup_scout
+import time
+
+from scout.demo.resources import demo_files
+from scout.load.bulk import load_bulks
+from scout.load.setup import (
+    PhaseTimer,
+    build_genes_and_transcripts,
+    load_reference_genes,
+    setup_scout,
+)
 
 
 def test_setup_scout(real_adapter):
@@ -12,3 +21,62 @@ def test_setup_scout(real_adapter):
 
     ## THEN make sure that stuff has been added
     assert adapter.hgnc_collection.find_one()
+
+
+def test_build_genes_and_transcripts(
+    genes37_handle, transcripts_handle, hgnc_handle, exac_handle, hpo_genes_handle
+):
+    ## GIVEN the demo gene resources of build 37
+
+    ## WHEN building the genes and transcripts, without a database
+    gene_objs, transcript_objs = build_genes_and_transcripts(
+        "37",
+        ensembl_lines=genes37_handle,
+        transcripts_lines=transcripts_handle,
+        hgnc_lines=hgnc_handle,
+        exac_lines=exac_handle,
+        hpo_lines=hpo_genes_handle,
+    )
+
+    ## THEN assert that all genes have coordinates
+    assert gene_objs
+    assert all(gene_obj["chromosome"] for gene_obj in gene_objs)
+    ## THEN assert that all transcripts belong to one of the genes
+    hgnc_ids = set(gene_obj["hgnc_id"] for gene_obj in gene_objs)
+    assert transcript_objs
+    assert all(tx_obj["hgnc_id"] in hgnc_ids for tx_obj in transcript_objs)
+
+
+def test_load_reference_genes(adapter):
+    ## GIVEN an empty database
+    assert adapter.hgnc_collection.find_one() is None
+    timer = PhaseTimer()
+
+    ## WHEN loading the genes of the demo resources in the current process
+    start = time.time()
+    load_reference_genes(adapter, demo_files, processes=1, timer=timer)
+    seconds = time.time() - start
+
+    ## THEN assert that the genes and transcripts of both builds were loaded
+    for build in ["37", "38"]:
+        assert adapter.hgnc_collection.find_one({"build": build})
+        assert adapter.transcript_collection.find_one({"build": build})
+    ## THEN assert that the phases were timed
+    assert "read resources" in timer.timings
+    assert "build genes" in timer.timings
+    assert "insert genes" in timer.timings
+    ## THEN assert that no time was counted in more than one phase
+    assert sum(timer.timings.values()) <= seconds
+
+
+def test_load_bulks():
+    ## GIVEN a generator of documents
+    objs = ({"_id": i} for i in range(5))
+    bulks = []
+
+    ## WHEN loading them in bulks of two
+    nr_loaded = load_bulks(bulks.append, objs, bulk_size=2)
+
+    ## THEN assert that all documents were loaded in three bulks
+    assert nr_loaded == 5
+    assert [len(bulk) for bulk in bulks] == [2, 2, 1]
@@ -2,6 +2,7 @@
 
 from scout.parse.variant.coordinates import (
     get_cytoband_coordinates,
+    get_cytoband_coordinates_batch,
     parse_coordinates,
     sv_end,
     sv_length,
@@ -249,3 +250,17 @@ def test_get_end_deletion():
 
     # THEN assert that the end is the same as en coordinate described in alt field
     assert end == svend
+
+
+def test_get_cytoband_coordinates_batch():
+    """Test to get the cytobands for a block of positions"""
+    # GIVEN some positions on a chromosome, one outside of the chromosome
+    positions = [1000, 60000000, 10 ** 10]
+
+    # WHEN getting the cytobands in one batch
+    coordinates = get_cytoband_coordinates_batch("1", positions, "37")
+
+    # THEN assert the same cytobands as for single positions are returned
+    assert coordinates == [get_cytoband_coordinates("1", pos, "37") for pos in positions]
+    assert coordinates[0] == "p36.33"
+    assert coordinates[2] == ""
@@ -0,0 +1,20 @@
+from scout.parse.cytoband import parse_cytoband
+
+
+def test_parse_cytoband():
+    ## GIVEN some lines from a cytoband file
+    lines = [
+        "#chrom\tchromStart\tchromEnd\tname\tgieStain",
+        "chr1\t0\t2300000\tp36.33\tgneg",
+        "chr1\t2300000\t5400000\tp36.32\tgpos25",
+        "chrX\t0\t4300000\tp22.33\tgneg",
+    ]
+
+    ## WHEN parsing the lines
+    cytobands = parse_cytoband(lines)
+
+    ## THEN assert the cytobands are found by position, without 'chr' in the chromosome names
+    assert cytobands.nr_intervals() == 3
+    assert cytobands.find("1", 2300000) == "p36.32"
+    assert cytobands.find("X", 1) == "p22.33"
+    assert cytobands.find("1", 5400000) is None
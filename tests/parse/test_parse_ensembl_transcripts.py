@@ -1,5 +1,7 @@
 from scout.parse.ensembl import (
+    ensembl_field_parsers,
     parse_ensembl_line,
+    parse_ensembl_row,
     parse_ensembl_transcripts,
     parse_transcripts,
 )
@@ -44,6 +46,29 @@ def test_parse_ensembl_line(unparsed_transcript):
     assert "refseq_ncrna" not in parsed_transcript
 
 
+def test_ensembl_field_parsers():
+    """Test to resolve the fields of an ensembl header once"""
+    ## GIVEN a header with an exon rank column, a hgnc id column and an unknown column
+    header = ["Gene stable ID", "Exon rank in transcript", "HGNC ID", "Unknown"]
+
+    ## WHEN resolving the fields of the columns
+    field_parsers = ensembl_field_parsers(header)
+
+    ## THEN assert that each known column is parsed into one field
+    assert [(index, field) for index, field, _ in field_parsers] == [
+        (0, "ensembl_gene_id"),
+        (1, "exon_rank"),
+        (2, "hgnc_id"),
+    ]
+
+    ## WHEN parsing a row, with the last columns missing
+    res = parse_ensembl_row(["ENSG01", "2"], field_parsers)
+
+    ## THEN assert the values are converted and the missing columns are skipped
+    assert res == {"ensembl_gene_id": "ENSG01", "exon_rank": 2}
+    assert parse_ensembl_row(["ENSG01", "2", "HGNC:5"], field_parsers)["hgnc_id"] == 5
+
+
 def test_parse_ensembl_transcripts(transcripts_handle):
     """Test to parse all ensembl transcripts"""
     transcripts = parse_ensembl_transcripts(transcripts_handle)
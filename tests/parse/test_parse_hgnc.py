@@ -1,4 +1,9 @@
-from scout.parse.hgnc import parse_hgnc_line, parse_hgnc_genes
+from scout.parse.hgnc import (
+    hgnc_column_indexes,
+    parse_hgnc_genes,
+    parse_hgnc_line,
+    parse_hgnc_row,
+)
 
 
 def test_parse_hgnc_line(hgnc_handle):
@@ -15,3 +20,25 @@ def test_parse_hgnc_genes(hgnc_handle):
     for gene in genes:
         if gene:
             assert gene["hgnc_id"]
+
+
+def test_parse_hgnc_row():
+    """Test to parse a hgnc row with the column indexes resolved from the header"""
+    ## GIVEN a header without some of the optional columns, and a gene with two aliases
+    header = ["hgnc_id", "symbol", "name", "status", "alias_symbol", "omim_id", "entrez_id"]
+    row = ["HGNC:5", "A1BG", "alpha-1-B glycoprotein", "Approved", '"ABG|GAB"', "", "1"]
+
+    ## WHEN parsing the row
+    gene_info = parse_hgnc_row(row, hgnc_column_indexes(header))
+
+    ## THEN assert the gene is parsed, without values for the missing columns
+    assert gene_info["hgnc_id"] == 5
+    assert set(gene_info["previous_symbols"]) == {"A1BG", "ABG", "GAB"}
+    assert gene_info["omim_id"] is None
+    assert gene_info["entrez_id"] == 1
+    assert gene_info["ref_seq"] == []
+    assert gene_info["vega_id"] is None
+
+    ## THEN assert that withdrawn genes are skipped
+    withdrawn_row = ["HGNC:6", "A1BG", "withdrawn", "Entry Withdrawn"]
+    assert parse_hgnc_row(withdrawn_row, hgnc_column_indexes(header)) == {}
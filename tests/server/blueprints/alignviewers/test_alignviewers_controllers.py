@@ -110,3 +110,25 @@ def test_genes_track_build_38():
     assert track["sourceType"] == "file"
     assert "hg38" in track["url"]
     assert "hg38" in track["indexURL"]
+
+
+def test_region_vcf_track(tmpdir):
+    """Test function that returns the track of a region vcf"""
+
+    # GIVEN a region vcf without index
+    vcf_path = str(tmpdir.join("region.vcf.gz"))
+    tmpdir.join("region.vcf.gz").write("")
+
+    # WHEN the track controller is invoked
+    track = controllers.region_vcf_track(vcf_path)
+
+    # THEN it should return a variant track that is not indexed
+    assert track["type"] == "variant"
+    assert track["url"] == vcf_path
+    assert track["indexed"] is False
+
+    # GIVEN that the region vcf is indexed
+    tmpdir.join("region.vcf.gz.tbi").write("")
+
+    # THEN the track should have the index
+    assert controllers.region_vcf_track(vcf_path)["indexURL"] == vcf_path + ".tbi"
@@ -33,3 +33,30 @@ def dummy_case():
         "status": "inactive",
     }
     return case_info
+
+
+@pytest.fixture
+def report_database(real_variant_database):
+    """Return an adapter with the demo case, where 200 of its variants have been evaluated
+
+    Used to benchmark the case report, which shows all evaluated variants of a case.
+    """
+    adapter = real_variant_database
+    case_obj = adapter.case_collection.find_one()
+    institute_obj = adapter.institute_collection.find_one()
+    user_obj = adapter.user_collection.find_one()
+
+    variant_objs = list(adapter.variants(case_obj["_id"], nr_of_variants=200))
+    adapter.variant_collection.update_many(
+        {"_id": {"$in": [variant_obj["_id"] for variant_obj in variant_objs]}},
+        {"$set": {"manual_rank": 5}},
+    )
+    # Some of the variants are also commented, and one is the causative of the case
+    for variant_obj in variant_objs[:20]:
+        adapter.comment(
+            institute_obj, case_obj, user_obj, "variant_link", variant_obj, content="A comment"
+        )
+    adapter.case_collection.update_one(
+        {"_id": case_obj["_id"]}, {"$set": {"causatives": [variant_objs[0]["_id"]]}}
+    )
+    return adapter
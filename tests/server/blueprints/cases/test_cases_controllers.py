@@ -1,7 +1,10 @@
 """Tests for the cases controllers"""
+import pymongo
 from flask import Flask
 
+from scout.adapter.mongo import MongoAdapter
 from scout.server.blueprints.cases.controllers import case, case_report_content
+from scout.server.extensions.mongo_extension import QueryCounter
 
 
 def test_case_report_content(adapter, institute_obj, case_obj, variant_obj):
@@ -34,6 +37,75 @@ def test_case_report_content(adapter, institute_obj, case_obj, variant_obj):
         assert len(data[var_type]) == 0
 
 
+def test_case_report_content_evaluated_variants(report_database):
+    """Test the case report of a case with many evaluated variants"""
+    adapter = report_database
+    ## GIVEN a case with 200 evaluated variants, of which 20 are commented and one causative
+    case_obj = adapter.case_collection.find_one()
+    institute_obj = adapter.institute_collection.find_one()
+
+    ## WHEN building the report content
+    data = case_report_content(adapter, institute_obj, case_obj)
+
+    ## THEN assert all evaluated variants are decorated
+    assert len(data["tagged_detailed"]) == 200
+    assert len(data["commented_detailed"]) == 0
+    assert len(data["causatives_detailed"]) == 1
+    assert sum(len(var["comments"]) for var in data["tagged_detailed"]) == 20
+    for var in data["tagged_detailed"]:
+        assert "end_position" in var
+        assert "all_models" in var
+    ## THEN assert the causative is decorated as the same variant in the tagged variants
+    causative = data["causatives_detailed"][0]
+    tagged = {var["_id"]: var for var in data["tagged_detailed"]}[causative["_id"]]
+    assert causative["genes"] == tagged["genes"]
+    assert causative["comments"] == tagged["comments"]
+
+
+def test_case_report_content_variant_in_several_categories(report_database):
+    """Test the case report of a case where tagged variants are also causatives"""
+    adapter = report_database
+    ## GIVEN a case where a tagged variant is the causative and another is a partial causative
+    case_obj = adapter.case_collection.find_one()
+    institute_obj = adapter.institute_collection.find_one()
+    causative_id = case_obj["causatives"][0]
+    partial_id = adapter.variant_collection.find_one(
+        {"case_id": case_obj["_id"], "manual_rank": 5, "_id": {"$ne": causative_id}}
+    )["_id"]
+    case_obj["partial_causatives"] = {partial_id: ["HP:0001250"]}
+
+    ## WHEN building the report content
+    data = case_report_content(adapter, institute_obj, case_obj)
+
+    ## THEN assert the causative is decorated once and shown as both causative and tagged
+    tagged = {var["_id"]: var for var in data["tagged_detailed"]}
+    assert data["causatives_detailed"][0] is tagged[causative_id]
+    ## THEN assert the phenotypes are only shown for the partial causative
+    partial = data["partial_causatives_detailed"][0]
+    assert partial["_id"] == partial_id
+    assert partial["phenotypes"] == ["HP:0001250"]
+    assert "phenotypes" not in tagged[partial_id]
+
+
+def test_case_report_content_query_count(report_database):
+    """Test that the case report is built with a few bulk queries, not queries per variant"""
+    ## GIVEN a case with 200 evaluated variants and an adapter that counts its queries
+    query_counter = QueryCounter()
+    client = pymongo.MongoClient(event_listeners=[query_counter])
+    adapter = MongoAdapter(client[report_database.db.name])
+    case_obj = adapter.case_collection.find_one()
+    institute_obj = adapter.institute_collection.find_one()
+
+    ## WHEN building the report content
+    query_counter.reset()
+    data = case_report_content(adapter, institute_obj, case_obj)
+    assert len(data["tagged_detailed"]) == 200
+
+    ## THEN assert that far fewer queries than variants were made
+    assert query_counter.count < 50
+    client.close()
+
+
 def test_case_controller_rank_model_link(adapter, institute_obj, dummy_case):
     # GIVEN an adapter with a case
     dummy_case["rank_model_version"] = "1.3"
@@ -387,6 +387,43 @@ def test_case_report(app, institute_obj, case_obj):
         assert resp.status_code == 200
 
 
+def test_case_report_commented_variants(app, institute_obj, case_obj, user_obj):
+    # GIVEN a case with a tagged and commented variant, that is also the causative of the case
+    variant_obj = store.variant_collection.find_one_and_update(
+        {"case_id": case_obj["_id"]},
+        {"$set": {"manual_rank": 5}},
+        return_document=ReturnDocument.AFTER,
+    )
+    store.case_collection.update_one(
+        {"_id": case_obj["_id"]}, {"$set": {"causatives": [variant_obj["_id"]]}}
+    )
+    store.comment(
+        institute_obj,
+        case_obj,
+        user_obj,
+        "variant_link",
+        variant_obj,
+        content="A variant comment",
+    )
+
+    with app.test_client() as client:
+        # GIVEN that the user could be logged in
+        resp = client.get(url_for("auto_login"))
+        assert resp.status_code == 200
+
+        # WHEN showing the case report
+        resp = client.get(
+            url_for(
+                "cases.case_report",
+                institute_id=institute_obj["internal_id"],
+                case_name=case_obj["display_name"],
+            )
+        )
+        # THEN the report should be shown with the variant comment
+        assert resp.status_code == 200
+        assert "A variant comment" in resp.data.decode()
+
+
 def test_case_diagnosis(app, institute_obj, case_obj):
     # Test the web page containing the general case report
 
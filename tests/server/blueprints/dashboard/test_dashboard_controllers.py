@@ -1,3 +1,4 @@
+import datetime
 from pprint import pprint as pp
 
 from scout.server.blueprints.dashboard.controllers import get_dashboard_info
@@ -110,3 +111,35 @@ def test_with_phenotype_group_query(real_adapter, case_obj):
             assert group["count"] == 1
         elif group["status"] == case_obj["status"]:
             assert group["count"] == 1
+
+
+def test_stored_dashboard_info(real_adapter, case_obj):
+    ## GIVEN an database with one case
+    adapter = real_adapter
+    adapter._add_case(case_obj)
+    institute_id = case_obj["owner"]
+
+    ## WHEN asking for data from the stats collection
+    data = get_dashboard_info(adapter, institute_id=institute_id, use_stats_collection=True)
+
+    ## THEN assert the data was stored
+    stats_obj = adapter.dashboard_stats_collection.find_one({"_id": institute_id})
+    assert stats_obj["data"]["total_cases"] == data["total_cases"] == 1
+
+    ## WHEN a new case is added without any new events
+    case_obj["_id"] = "test1"
+    case_obj["updated_at"] = stats_obj["updated_at"]
+    adapter._add_case(case_obj)
+
+    ## THEN assert the stored data is returned
+    data = get_dashboard_info(adapter, institute_id=institute_id, use_stats_collection=True)
+    assert data["total_cases"] == 1
+
+    ## WHEN an event is created for the institute
+    adapter.event_collection.insert_one(
+        {"institute": institute_id, "verb": "status", "created_at": datetime.datetime.now()}
+    )
+
+    ## THEN assert the data is recomputed
+    data = get_dashboard_info(adapter, institute_id=institute_id, use_stats_collection=True)
+    assert data["total_cases"] == 2
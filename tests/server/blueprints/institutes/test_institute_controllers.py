@@ -1,5 +1,9 @@
 import copy
-from scout.server.blueprints.institutes.controllers import cases
+from scout.server.blueprints.institutes.controllers import (
+    LookupMemo,
+    cases,
+    get_sanger_unevaluated,
+)
 
 
 def test_cases(adapter, case_obj, institute_obj):
@@ -48,3 +52,65 @@ def test_controller_cases(adapter):
     # THEN
     assert isinstance(data, dict)
     assert data["found_cases"] == 1
+
+
+def test_cases_assignees_and_clinvars(real_adapter, case_obj, user_obj):
+    adapter = real_adapter
+    # GIVEN a case assigned to a user and to a user that does not exist
+    case_obj["assignees"] = [user_obj["email"], "removed@mail.com"]
+    adapter.case_collection.insert_one(case_obj)
+    adapter.user_collection.insert_one(user_obj)
+    # GIVEN a variant of the case in a clinvar submission
+    adapter.clinvar_collection.insert_one(
+        {"_id": "clinvar_1", "csv_type": "variant", "case_id": case_obj["_id"], "local_id": "var1"}
+    )
+
+    # WHEN the cases controller is invoked with the cases for the case list
+    query = adapter.cases(collaborator=case_obj["owner"], yield_query=True)
+    data = cases(adapter, adapter.cases_overview(query))
+
+    # THEN the assignees and clinvar variants should be added to the case
+    case = [case for _, group in data["cases"] for case in group][0]
+    assert [user and user["_id"] for user in case["assignees"]] == [user_obj["_id"], None]
+    assert list(case["clinvar_variants"]) == ["var1"]
+    assert case["analysis_types"]
+
+
+def test_get_sanger_unevaluated(real_adapter, institute_obj, case_obj, user_obj, variant_obj):
+    adapter = real_adapter
+    # GIVEN a case with a variant with Sanger ordered by a user
+    adapter.case_collection.insert_one(case_obj)
+    adapter.user_collection.insert_one(user_obj)
+    adapter.variant_collection.insert_one(variant_obj)
+    adapter.order_verification(
+        institute=institute_obj,
+        case=case_obj,
+        user=user_obj,
+        link="orderSangerlink",
+        variant=variant_obj,
+    )
+
+    # WHEN collecting the unevaluated Sanger variants of the user
+    unevaluated = get_sanger_unevaluated(adapter, institute_obj["_id"], user_obj["_id"])
+
+    # THEN the variant should be returned under the case display name
+    assert unevaluated == [{case_obj["display_name"]: [variant_obj["_id"]]}]
+
+
+def test_lookup_memo(adapter, case_obj):
+    # GIVEN a database with a case and a gene in build 38 only
+    adapter.case_collection.insert_one(case_obj)
+    adapter.load_hgnc_gene({"hgnc_id": 1, "hgnc_symbol": "AAA", "build": "38"})
+
+    # WHEN looking up the case, a missing case and the gene in a memo
+    memo = LookupMemo(adapter, case_projection={"display_name": 1})
+    assert list(memo.cases([case_obj["_id"], "missing_case"])) == [case_obj["_id"]]
+    assert memo.gene_symbol(1, build="37") == "AAA"
+
+    # THEN the case and gene should be returned from the memo when they are looked up again
+    adapter.case_collection.delete_one({"_id": case_obj["_id"]})
+    adapter.hgnc_collection.delete_many({})
+    assert memo.case(case_obj["_id"])["display_name"] == case_obj["display_name"]
+    assert memo.case("missing_case") is None
+    assert memo.gene(1, build="38")["hgnc_symbol"] == "AAA"
+    assert memo.gene(1, build="37") is None
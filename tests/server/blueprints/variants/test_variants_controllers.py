@@ -1,7 +1,16 @@
 import copy
 import logging
 
+from pymongo.errors import ServerSelectionTimeoutError
+from werkzeug.datastructures import MultiDict
+
 from scout.server.blueprints.variants.controllers import (
+    decode_page_token,
+    download_variants,
+    encode_page_token,
+    paginate_variants,
+    prefetch_page_data,
+    variants_page,
     variants_export_header,
     variant_export_lines,
     variants,
@@ -147,6 +156,117 @@ def test_sv_variants_research_shadow_clinical_assessments(
     assert any([variant.get("clinical_assessments") for variant in res_variants])
 
 
+def test_prefetch_page_data(real_variant_database, institute_obj, case_obj):
+    # GIVEN a db with variants
+    adapter = real_variant_database
+    variant_objs = list(adapter.variant_collection.find({"case_id": case_obj["_id"]}).limit(10))
+    variant_obj = variant_objs[0]
+
+    # GIVEN a comment on one of the variants
+    adapter.event_collection.insert_one(
+        dict(
+            institute=institute_obj["_id"],
+            case=case_obj["_id"],
+            category="variant",
+            verb="comment",
+            level="specific",
+            variant_id=variant_obj["variant_id"],
+            content="a comment",
+        )
+    )
+
+    # WHEN prefetching the data for a page with the variants
+    page_data = prefetch_page_data(adapter, institute_obj, case_obj, variant_objs, overlapping=True)
+
+    # THEN the data is the same as when fetched for one variant at a time
+    for var in variant_objs:
+        assert [event["_id"] for event in page_data["comments"][var["variant_id"]]] == [
+            event["_id"]
+            for event in adapter.events(
+                institute_obj, case=case_obj, variant_id=var["variant_id"], comments=True
+            )
+        ]
+        assert [ovl["_id"] for ovl in page_data["overlapping"][var["_id"]]] == [
+            ovl["_id"] for ovl in adapter.overlapping(var)
+        ]
+    assert len(page_data["comments"][variant_obj["variant_id"]]) == 1
+
+
+def test_prefetch_page_data_observations(real_variant_database, institute_obj, case_obj, loqusdb):
+    # GIVEN a db with variants
+    adapter = real_variant_database
+    variant_objs = list(adapter.variant_collection.find({"case_id": case_obj["_id"]}).limit(10))
+
+    # GIVEN a loqusdb where one of the variants is observed
+    loqusdb._add_variant(variant_objs[0])
+
+    # WHEN prefetching the data for a page with the variants
+    page_data = prefetch_page_data(adapter, institute_obj, case_obj, variant_objs, loqusdb=loqusdb)
+
+    # THEN the observations are fetched for the observed variant
+    assert set(page_data["observations"]) == {variant_objs[0]["simple_id"]}
+
+
+def test_prefetch_page_data_observations_unavailable(
+    real_variant_database, institute_obj, case_obj, loqusdb, mocker
+):
+    # GIVEN a db with variants
+    adapter = real_variant_database
+    variant_objs = list(adapter.variant_collection.find({"case_id": case_obj["_id"]}).limit(10))
+
+    # GIVEN a loqusdb that can not be reached
+    mocker.patch.object(
+        loqusdb, "get_variants", side_effect=ServerSelectionTimeoutError("No servers found")
+    )
+
+    # WHEN prefetching the data for a page with the variants
+    page_data = prefetch_page_data(adapter, institute_obj, case_obj, variant_objs, loqusdb=loqusdb)
+
+    # THEN the page data is returned without observations
+    assert page_data["observations"] is None
+
+
+def test_page_token():
+    # GIVEN the last variant on a page
+    variant_obj = {"_id": "a_variant", "variant_rank": 50}
+
+    # WHEN creating the token for the next page
+    token = encode_page_token(2, variant_obj, filtered_count=1000)
+
+    # THEN the token can be used to request that page
+    page, page_token = variants_page(MultiDict({"page_token": token}))
+    assert page == 2
+    assert page_token == {"page": 2, "variant_rank": 50, "count": 1000}
+
+
+def test_page_token_invalid():
+    # GIVEN a request with a broken page token and a page number
+    request_values = MultiDict({"page_token": "not a token", "page": "3"})
+
+    # THEN the token is not used
+    assert decode_page_token("not a token") is None
+    assert variants_page(request_values) == (3, None)
+
+
+def test_paginate_variants_with_page_token(real_variant_database, case_obj):
+    # GIVEN a db with variants
+    adapter = real_variant_database
+    case_id = case_obj["_id"]
+
+    # GIVEN the first page of variants
+    first_page, more_variants = paginate_variants(adapter.variants(case_id), per_page=5)
+    assert more_variants
+
+    # WHEN fetching the next page after the last variant rank of the first page
+    page_token = decode_page_token(encode_page_token(2, first_page[-1]))
+    variants_query = adapter.variants(case_id, after_variant_rank=page_token["variant_rank"])
+    second_page, _ = paginate_variants(variants_query, 2, per_page=5, page_token=page_token)
+
+    # THEN the page has the same variants as when skipping the first page
+    skip_page, _ = paginate_variants(adapter.variants(case_id), 2, per_page=5)
+    assert [var["_id"] for var in second_page] == [var["_id"] for var in skip_page]
+
+
 def test_variant_csv_export(real_variant_database, case_obj):
     adapter = real_variant_database
     case_id = case_obj["_id"]
@@ -179,3 +299,24 @@ def test_variant_csv_export(real_variant_database, case_obj):
     for export_line in export_lines:
         export_cols = export_line.split(",")
         assert len(export_cols) == len(export_header)
+
+
+def test_download_variants(real_variant_database, case_obj):
+    adapter = real_variant_database
+    case_id = case_obj["_id"]
+
+    # GIVEN a database with clinical snv variants from a case
+    nr_variants = adapter.variant_collection.count_documents(
+        {"case_id": case_id, "category": "snv", "variant_type": "clinical"}
+    )
+    assert nr_variants > 0
+
+    # WHEN exporting the variants matching an empty filter
+    response = download_variants(adapter, case_obj, {}, "snv")
+    lines = response.get_data(as_text=True).splitlines()
+
+    # THEN assert that the header and one line per variant are streamed
+    assert lines[0] == ",".join(variants_export_header(case_obj))
+    assert len(lines) == nr_variants + 1
+    for line in lines[1:]:
+        assert len(line.split(",")) == len(lines[0].split(","))
@@ -23,9 +23,19 @@ class LoqusdbMock:
         self.nr_cases = 130
         self.variants = {"1_169898014_T_C": {"families": ["vitalmouse"]}}
 
-    def case_count(self):
+    def case_count(self, loqusdb_id=None):
         return self.nr_cases
 
+    def has_database(self, loqusdb_id=None):
+        return True
+
+    def get_variants(self, variant_ids, loqusdb_id=None):
+        return {
+            variant_id: self.get_variant({"_id": variant_id})
+            for variant_id in variant_ids
+            if variant_id in self.variants
+        }
+
     def get_variant(self, var_dict, loqusdb_id=None):
         var = self.variants.get(var_dict["_id"], {})
         var["total"] = self.nr_cases
@@ -2,6 +2,8 @@
 
 import subprocess
 from subprocess import CalledProcessError
+
+import mongomock
 import pytest
 
 from scout.server.extensions.loqus_extension import LoqusDB
@@ -113,6 +115,49 @@ def test_loqusdb_cases(mocker, loqus_extension):
     assert res == nr_cases
 
 
+def test_loqusdb_cases_cached(mocker, loqus_extension):
+    """Test that the case count is reused"""
+    # GIVEN a return value from loqusdb
+    mocker.patch.object(subprocess, "check_output")
+    subprocess.check_output.return_value = b"15"
+    # WHEN fetching the number of cases twice
+    assert loqus_extension.case_count() == 15
+    assert loqus_extension.case_count() == 15
+    # THEN assert loqusdb was only called once
+    assert subprocess.check_output.call_count == 1
+
+
+def test_loqusdb_get_variants_database(mocker, loqus_extension):
+    """Test to fetch a number of variants directly from the loqusdb database"""
+    # GIVEN a loqusdb database with two cases and one variant
+    database = mongomock.MongoClient().loqusdb
+    database.case.insert_many([{"case_id": "1"}, {"case_id": "2"}])
+    database.variant.insert_one({"_id": "1_10_A_C", "observations": 2, "families": ["1", "2"]})
+    loqus_extension.databases["default"] = database
+    mocker.patch.object(subprocess, "check_output")
+
+    # WHEN fetching a batch of variants
+    res = loqus_extension.get_variants(["1_10_A_C", "1_20_A_C"])
+
+    # THEN assert the observed variant is returned with the number of cases
+    assert set(res) == {"1_10_A_C"}
+    assert res["1_10_A_C"]["observations"] == 2
+    assert res["1_10_A_C"]["total"] == 2
+    # THEN assert a single variant is also fetched from the database
+    assert loqus_extension.get_variant({"_id": "1_20_A_C"}) == {}
+    # THEN assert the loqusdb binary was never called
+    assert subprocess.check_output.call_count == 0
+
+
+def test_loqusdb_has_database_unknown_id(loqus_extension):
+    """Test that a loqusdb id which is not configured has no database"""
+    # GIVEN a loqus extension without a setting for the id "unknown"
+    assert loqus_extension.search_setting("unknown") is None
+
+    # THEN assert the database can not be queried, without raising an error
+    assert loqus_extension.has_database("unknown") is False
+
+
 def test_loqusdb_cases_ValueError(mocker, loqus_extension):
     """Test the case count function in loqus extension"""
     # GIVEN a return value from loqusdb which is not an int
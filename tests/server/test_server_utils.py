@@ -1,4 +1,6 @@
 """Tests for server utils"""
+
+import os
 import tempfile
 import pytest
 from scout.server.links import get_variant_links
@@ -127,3 +129,20 @@ def test_variant_case(adapter, case_obj, variant_obj):
     variant_case(adapter, case_obj, variant_obj)
     # THEN assert that the region VCF was created
     assert case_obj.get("region_vcf_file") is not None
+
+
+def test_variant_case_region_vcf_reused(adapter, case_obj, variant_obj):
+    """Test that the region VCF of a variant is reused on the next view"""
+    # GIVEN a variant with gene info that has been viewed once
+    variant_obj["genes"] = [{"hgnc_id": 2, "common": {"chromosome": "1", "start": 10, "end": 100}}]
+    variant_case(adapter, case_obj, variant_obj)
+    region_vcf_file = case_obj["region_vcf_file"]
+    mtime = os.path.getmtime(region_vcf_file)
+
+    # WHEN viewing the variant again
+    case_obj.pop("region_vcf_file")
+    variant_case(adapter, case_obj, variant_obj)
+
+    # THEN assert the same region VCF was used without writing it again
+    assert case_obj["region_vcf_file"] == region_vcf_file
+    assert os.path.getmtime(region_vcf_file) == mtime
@@ -14,34 +14,20 @@ from scout.build import build_variant
 from cyvcf2 import VCF
 
 
-def test_compounds_region(real_populated_database, case_obj, variant_clinical_file):
-    """When loading the variants not all variants will be loaded, only the ones that
-    have a rank score above a treshold.
-    This implies that some compounds will have the status 'not_loaded'=True.
-    When loading all variants for a region then all variants should
-    have status 'not_loaded'=False.
-    """
-    adapter = real_populated_database
-    variant_type = "clinical"
-    category = "snv"
-    ## GIVEN a database without any variants
-    assert adapter.variant_collection.find_one() is None
-
-    institute_obj = adapter.institute_collection.find_one()
-    institute_id = institute_obj["_id"]
-
-    ## WHEN loading variants into the database without updating compound information
+def insert_clinical_variants(adapter, case_obj, variant_file):
+    """Insert the variants of a vcf, without updating their compound information
 
-    vcf_obj = VCF(variant_clinical_file)
+    Returns:
+        variant_objs(list(dict)): the inserted variants
+    """
+    institute_id = adapter.institute_collection.find_one()["_id"]
+    vcf_obj = VCF(variant_file)
     rank_results_header = parse_rank_results_header(vcf_obj)
     vep_header = parse_vep_header(vcf_obj)
+    individual_positions = {ind: i for i, ind in enumerate(vcf_obj.samples)}
 
-    individual_positions = {}
-    for i, ind in enumerate(vcf_obj.samples):
-        individual_positions[ind] = i
-
-    variants = []
-    for i, variant in enumerate(vcf_obj):
+    variant_objs = []
+    for variant in vcf_obj:
         parsed_variant = parse_variant(
             variant=variant,
             case=case_obj,
@@ -51,14 +37,26 @@ def test_compounds_region(real_populated_database, case_obj, variant_clinical_fi
             individual_positions=individual_positions,
             category="snv",
         )
+        variant_objs.append(build_variant(variant=parsed_variant, institute_id=institute_id))
+    adapter.variant_collection.insert_many(variant_objs)
+    return variant_objs
 
-        variant_obj = build_variant(variant=parsed_variant, institute_id=institute_id)
-        variants.append(variant_obj)
 
-    # Load all variants
-    adapter.variant_collection.insert_many(variants)
+def test_compounds_region(real_populated_database, case_obj, variant_clinical_file):
+    """When loading the variants not all variants will be loaded, only the ones that
+    have a rank score above a treshold.
+    This implies that some compounds will have the status 'not_loaded'=True.
+    When loading all variants for a region then all variants should
+    have status 'not_loaded'=False.
+    """
+    adapter = real_populated_database
+    ## GIVEN a database without any variants
+    assert adapter.variant_collection.find_one() is None
+
+    ## WHEN loading variants into the database without updating compound information
+    variant_objs = insert_clinical_variants(adapter, case_obj, variant_clinical_file)
 
-    print("Nr variants: {0}".format(len(variants)))
+    print("Nr variants: {0}".format(len(variant_objs)))
 
     ## THEN assert that the variants does not have updated compound information
     nr_compounds = 0
@@ -97,3 +95,41 @@ def test_compounds_region(real_populated_database, case_obj, variant_clinical_fi
             if not "not_loaded" in comp:
                 assert False
     assert nr_compounds > 0
+
+
+def test_update_region_compounds(real_populated_database, case_obj, variant_clinical_file):
+    """Only the compounds of the variants in the coding intervals of a region are updated"""
+    adapter = real_populated_database
+    ## GIVEN a database with variants without updated compound information
+    variant_objs = insert_clinical_variants(adapter, case_obj, variant_clinical_file)
+    compound_variants = [var for var in variant_objs if var.get("compounds")]
+    assert compound_variants
+
+    ## WHEN updating the compounds of the region of one variant with compounds
+    region_variant = compound_variants[0]
+    nr_updated = adapter.update_region_compounds(
+        case_obj,
+        region_variant["chromosome"],
+        region_variant["position"],
+        region_variant["end"] + 1,
+    )
+
+    ## THEN assert that the compounds of the variant were updated
+    assert nr_updated > 0
+    var_obj = adapter.variant_collection.find_one({"_id": region_variant["_id"]})
+    for comp in var_obj["compounds"]:
+        assert "not_loaded" in comp
+
+    ## THEN assert that variants in other coding intervals were not updated
+    coding_intervals = adapter.gene_snapshot(build="37")["coding_intervals"]
+    region = coding_intervals.find(
+        region_variant["chromosome"], region_variant["position"], region_variant["end"] + 1
+    )
+    nr_not_updated = 0
+    for var in adapter.variant_collection.find({"compounds": {"$ne": []}}):
+        if coding_intervals.find(var["chromosome"], var["position"], var["end"] + 1) == region:
+            continue
+        for comp in var.get("compounds", []):
+            assert "not_loaded" not in comp
+            nr_not_updated += 1
+    assert nr_not_updated > 0
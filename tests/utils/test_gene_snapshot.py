@@ -0,0 +1,47 @@
+from scout.utils.gene_snapshot import (
+    SNAPSHOT_VERSION,
+    clear_snapshots,
+    read_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+
+
+def test_write_and_read_snapshot(tmpdir):
+    ## GIVEN a snapshot and a path in a cache directory
+    snapshot = {"version": SNAPSHOT_VERSION, "build": "37", "hgncid_to_gene": {1: {"hgnc_id": 1}}}
+    path = snapshot_path(str(tmpdir.join("cache")), "37", "abc")
+
+    ## WHEN writing and reading the snapshot
+    write_snapshot(snapshot, path)
+    res = read_snapshot(path)
+
+    ## THEN assert the same snapshot is returned
+    assert res == snapshot
+
+
+def test_read_snapshot_old_version(tmpdir):
+    ## GIVEN a snapshot written by another snapshot version
+    path = snapshot_path(str(tmpdir), "37", "abc")
+    write_snapshot({"version": SNAPSHOT_VERSION - 1}, path)
+
+    ## THEN assert it is not used
+    assert read_snapshot(path) is None
+
+
+def test_read_missing_snapshot(tmpdir):
+    ## THEN assert that a missing snapshot returns None
+    assert read_snapshot(snapshot_path(str(tmpdir), "37", "abc")) is None
+
+
+def test_clear_snapshots(tmpdir):
+    ## GIVEN snapshots for two builds
+    for build in ["37", "38"]:
+        write_snapshot({"version": SNAPSHOT_VERSION}, snapshot_path(str(tmpdir), build, "abc"))
+
+    ## WHEN clearing the snapshots of one build
+    nr_deleted = clear_snapshots(str(tmpdir), build="37")
+
+    ## THEN assert only that snapshot is deleted
+    assert nr_deleted == 1
+    assert read_snapshot(snapshot_path(str(tmpdir), "38", "abc"))
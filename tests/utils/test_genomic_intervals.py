@@ -0,0 +1,92 @@
+import pytest
+
+from scout.utils.genomic_intervals import GenomicIntervalIndex
+
+
+def test_merged_intervals():
+    ## GIVEN some overlapping and some separate intervals on two chromosomes
+    intervals = [("1", 100, 200), ("1", 150, 300), ("1", 500, 600), ("2", 100, 200)]
+
+    ## WHEN building a merged index
+    index = GenomicIntervalIndex.merged(intervals)
+
+    ## THEN assert the overlapping intervals where merged
+    assert index.nr_intervals("1") == 2
+    assert index.nr_intervals() == 3
+    assert list(index.intervals("1")) == [(100, 300, 1), (500, 600, 2)]
+    ## THEN assert that the ids are unique over all chromosomes
+    assert list(index.intervals("2")) == [(100, 200, 3)]
+
+
+def test_merged_touching_intervals():
+    ## GIVEN two intervals where one ends where the next one starts
+    intervals = [("1", 100, 200), ("1", 200, 300)]
+
+    ## WHEN building a merged index
+    index = GenomicIntervalIndex.merged(intervals)
+
+    ## THEN assert they are kept apart since intervals are half open
+    assert index.nr_intervals("1") == 2
+
+
+def test_find():
+    ## GIVEN an index with two intervals
+    index = GenomicIntervalIndex.merged([("1", 100, 200), ("1", 500, 600)])
+
+    ## THEN assert positions are found in the correct interval
+    assert index.find("1", 100) == 1
+    assert index.find("1", 199) == 1
+    assert index.find("1", 550) == 2
+    ## THEN assert the end position is not included
+    assert index.find("1", 200) is None
+    ## THEN assert a range overlapping an interval is found
+    assert index.find("1", 450, 501) == 2
+    assert index.find("1", 450, 500) is None
+    ## THEN assert chromosomes without intervals returns None
+    assert index.find("X", 150) is None
+
+
+def test_locate():
+    ## GIVEN an index with two intervals
+    index = GenomicIntervalIndex.merged([("1", 100, 200), ("1", 500, 600)])
+
+    ## WHEN locating a batch of positions
+    res = index.locate("1", [50, 150, 300, 599])
+
+    ## THEN assert the same results as with find are returned
+    assert res == [None, 1, None, 2]
+    assert index.locate("X", [1, 2]) == [None, None]
+
+
+def test_from_intervals():
+    ## GIVEN non overlapping intervals with data
+    intervals = [("1", 200, 300, "b"), ("1", 0, 100, "a")]
+
+    ## WHEN building an index
+    index = GenomicIntervalIndex.from_intervals(intervals)
+
+    ## THEN assert the data is returned
+    assert index.find("1", 50) == "a"
+    assert index.find("1", 250) == "b"
+    assert index.find("1", 150) is None
+
+
+def test_from_intervals_overlapping():
+    ## GIVEN intervals that overlap
+    intervals = [("1", 0, 100, "a"), ("1", 50, 150, "b")]
+
+    ## THEN assert building an index raises an error
+    with pytest.raises(ValueError):
+        GenomicIntervalIndex.from_intervals(intervals)
+
+
+def test_overlapping():
+    ## GIVEN an index with three intervals
+    index = GenomicIntervalIndex.merged([("1", 100, 200), ("1", 300, 400), ("1", 500, 600)])
+
+    ## THEN assert all intervals overlapping a region are returned in order
+    assert index.overlapping("1", 150, 350) == [(100, 200, 1), (300, 400, 2)]
+    assert index.overlapping("1", 0, 1000) == [(100, 200, 1), (300, 400, 2), (500, 600, 3)]
+    ## THEN assert the end of a region is not included
+    assert index.overlapping("1", 200, 300) == []
+    assert index.overlapping("X", 0, 1000) == []
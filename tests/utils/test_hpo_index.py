@@ -0,0 +1,51 @@
+from scout.utils.algorithms import ui_score
+from scout.utils.hpo_index import HpoAncestorIndex, ui_score_bits
+
+HPO_TERMS = [
+    {"_id": "HP:1", "all_ancestors": []},
+    {"_id": "HP:2", "all_ancestors": ["HP:1"]},
+    {"_id": "HP:3", "all_ancestors": ["HP:1", "HP:2"]},
+    {"_id": "HP:4", "all_ancestors": ["HP:1"]},
+]
+
+
+def test_ancestors():
+    ## GIVEN an index with some terms
+    hpo_index = HpoAncestorIndex(HPO_TERMS)
+    assert len(hpo_index) == 4
+
+    ## THEN assert that terms with the same ancestors have the same bitsets
+    assert hpo_index.ancestors(["HP:2"]) == hpo_index.ancestors(["HP:4"])
+    ## THEN assert that unknown terms are skipped
+    assert hpo_index.ancestors(["HP:3", "HP:0"]) == hpo_index.ancestors(["HP:3"])
+    assert hpo_index.ancestors(["HP:0"]) == 0
+
+
+def test_ui_score_bits():
+    ## GIVEN an index with some terms
+    hpo_index = HpoAncestorIndex(HPO_TERMS)
+    ancestors = {term["_id"]: set(term["all_ancestors"]) for term in HPO_TERMS}
+
+    ## THEN assert that the score is the same as the ui score of the ancestor sets
+    for term_1 in ancestors:
+        for term_2 in ancestors:
+            assert ui_score_bits(
+                hpo_index.ancestors([term_1]), hpo_index.ancestors([term_2])
+            ) == ui_score(ancestors[term_1], ancestors[term_2])
+
+
+def test_similarity_scores():
+    ## GIVEN an index with some terms
+    hpo_index = HpoAncestorIndex(HPO_TERMS)
+
+    ## WHEN scoring two cases against a term
+    scores = hpo_index.similarity_scores(["HP:3"], [("case_1", ["HP:3"]), ("case_2", ["HP:4"])])
+
+    ## THEN assert the case with the same term is most similar
+    assert scores == {"case_1": 1, "case_2": 0.5}
+
+    ## WHEN the phenotype terms of a case have changed
+    scores = hpo_index.similarity_scores(["HP:3"], [("case_1", ["HP:4"])])
+
+    ## THEN assert that the case ancestors are recomputed
+    assert scores == {"case_1": 0.5}
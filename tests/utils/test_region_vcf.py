@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import pytest
+from cyvcf2 import VCF
+
+from scout.demo import clinical_snv_path
+from scout.utils.region_vcf import RegionVcfCache
+
+
+def test_region_vcf(tmpdir):
+    ## GIVEN an empty cache
+    cache = RegionVcfCache(cache_dir=str(tmpdir))
+    assert len(cache) == 0
+
+    ## WHEN fetching the variants of a region
+    path = cache.region_vcf(clinical_snv_path, "1")
+
+    ## THEN assert a bgzipped vcf with the variants of the region was written
+    assert path.endswith(".vcf.gz")
+    nr_variants = sum(1 for _ in VCF(path))
+    assert nr_variants > 0
+    assert nr_variants == sum(1 for _ in VCF(clinical_snv_path)("1"))
+    assert len(cache) == 1
+    ## THEN assert the region vcf is indexed
+    assert os.path.exists(path + ".tbi")
+    assert sum(1 for _ in VCF(path)("1")) == nr_variants
+
+
+def test_region_vcf_cached(tmpdir):
+    ## GIVEN a cache with a region vcf
+    cache = RegionVcfCache(cache_dir=str(tmpdir))
+    path = cache.region_vcf(clinical_snv_path, "1")
+    mtime = os.path.getmtime(path)
+
+    ## WHEN fetching the same region again
+    res = cache.region_vcf(clinical_snv_path, "1")
+
+    ## THEN assert the same file is returned without writing it again
+    assert res == path
+    assert os.path.getmtime(res) == mtime
+    ## THEN assert that a new cache on the same directory finds the file
+    assert len(RegionVcfCache(cache_dir=str(tmpdir))) == 1
+
+
+def test_region_vcf_evict(tmpdir):
+    ## GIVEN a cache that only has room for one region vcf
+    cache = RegionVcfCache(cache_dir=str(tmpdir), max_size=1)
+    first_path = cache.region_vcf(clinical_snv_path, "1")
+
+    ## WHEN fetching another region
+    second_path = cache.region_vcf(clinical_snv_path, "2")
+
+    ## THEN assert the least recently used region vcf was removed
+    assert not os.path.exists(first_path)
+    assert os.path.exists(second_path)
+    assert len(cache) == 1
+
+
+def test_region_vcf_missing_file(tmpdir):
+    ## GIVEN a cache
+    cache = RegionVcfCache(cache_dir=str(tmpdir))
+
+    ## WHEN fetching a region of a missing file
+    with pytest.raises(FileNotFoundError):
+        ## THEN assert a file not found error is raised
+        cache.region_vcf(str(tmpdir.join("missing.vcf.gz")), "1")
+
+
+def test_region_vcf_missing_index(tmpdir):
+    ## GIVEN a cache and a vcf without an index
+    cache = RegionVcfCache(cache_dir=str(tmpdir.mkdir("cache")))
+    vcf_path = str(tmpdir.join("no_index.vcf.gz"))
+    shutil.copy(clinical_snv_path, vcf_path)
+
+    ## WHEN fetching a region of the vcf
+    with pytest.raises(FileNotFoundError):
+        ## THEN assert a file not found error is raised
+        cache.region_vcf(vcf_path, "1")
+    ## THEN assert nothing was added to the cache
+    assert len(cache) == 0
+    assert os.listdir(cache.cache_dir) == []